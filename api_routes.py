@@ -3,8 +3,11 @@
 API Routes pour ORACXPRED MÉTAPHORE
 Endpoints sécurisés avec OAuth et gestion des plans
 """
-from flask import Blueprint, request, jsonify, redirect, make_response
+from flask import Blueprint, Response, request, jsonify, redirect, make_response, stream_with_context
 from functools import wraps
+import json
+import math
+import os
 import uuid
 
 from config_oauth import config
@@ -12,6 +15,9 @@ from oauth_service import oauth_service
 from session_manager import session_manager
 from plan_service import plan_service, PlanType
 from models_oauth import db, User, Prediction, AuditLog
+from log_writer import log_writer
+from user_cache import user_cache
+from pagination import keyset_page, parse_limit, cursor_requested, prefix_search
 
 # Import du module ML
 try:
@@ -21,9 +27,30 @@ except ImportError:
     ML_AVAILABLE = False
     ml_integration = None
 
+# Nombre maximal de matchs par appel de /ml/predict/batch
+ML_BATCH_MAX_MATCHES = int(os.getenv('ML_BATCH_MAX_MATCHES', '500'))
+# Lignes Over/Under et handicaps au maximum par appel (coût = matchs × (lignes + handicaps))
+ML_BATCH_MAX_LINES = int(os.getenv('ML_BATCH_MAX_LINES', '16'))
+# Matchs calculés par tranche en NDJSON (chaque tranche est envoyée dès qu'elle est prête)
+ML_BATCH_STREAM_CHUNK = int(os.getenv('ML_BATCH_STREAM_CHUNK', '50'))
+
 # Blueprint API
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+def audit_ml(user_payload, action, meta):
+    """Journal d'audit des prédictions ML, en écriture différée (hors du temps de requête)"""
+    log_writer.enqueue(AuditLog, {
+        'user_id': user_payload['user_id'],
+        'action': action,
+        'ip_address': request.remote_addr,
+        'user_agent': request.headers.get('User-Agent'),
+        'meta': meta
+    }, severity='audit', db=db)
+
+def load_user(user_payload):
+    """Utilisateur du token (cache mémoire à TTL court, invalidé par les routes admin)"""
+    return user_cache.get(db, User, user_payload['user_id'])
+
 def require_auth(f):
     """Décorateur pour exiger l'authentification"""
     @wraps(f)
@@ -133,6 +160,13 @@ def logout():
     """Déconnexion"""
     response = make_response(jsonify({'message': 'Déconnecté'}))
     
+    # Révoque les tokens présentés (le cache de tokens vérifiés ne doit plus les accepter)
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        session_manager.revoke_token(auth_header.split(' ')[1])
+    session_manager.revoke_token(request.cookies.get('access_token'))
+    session_manager.revoke_token(request.cookies.get('refresh_token'))
+    
     # Supprime les cookies
     response.set_cookie('access_token', '', expires=0)
     response.set_cookie('refresh_token', '', expires=0)
@@ -145,7 +179,7 @@ def logout():
 @require_auth
 def get_current_user(user_payload):
     """Retourne les infos de l'utilisateur connecté"""
-    user = User.query.get(user_payload['user_id'])
+    user = load_user(user_payload)
     if not user:
         return jsonify({'error': 'Utilisateur non trouvé'}), 404
     
@@ -196,25 +230,37 @@ def upgrade_plan(user_payload):
 @api_bp.route('/predictions', methods=['GET'])
 @require_auth
 def get_predictions(user_payload):
-    """Retourne les prédictions de l'utilisateur"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    """Retourne les prédictions de l'utilisateur (ancien format paginé ; ?cursor= ou ?limit= pour le mode curseur)"""
+    query = Prediction.query.filter_by(user_id=user_payload['user_id'])
+    if request.args.get('status'):
+        query = query.filter(Prediction.status == request.args['status'])
+    
+    if not cursor_requested(request.args):
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+        predictions = query.order_by(
+            Prediction.created_at.desc()
+        ).paginate(
+            page=page, 
+            per_page=per_page, 
+            error_out=False
+        )
+        return jsonify({
+            'predictions': [pred.to_dict() for pred in predictions.items],
+            'total': predictions.total,
+            'pages': predictions.pages,
+            'current_page': page
+        })
     
-    predictions = Prediction.query.filter_by(
-        user_id=user_payload['user_id']
-    ).order_by(
-        Prediction.created_at.desc()
-    ).paginate(
-        page=page, 
-        per_page=per_page, 
-        error_out=False
-    )
+    try:
+        predictions, next_cursor = keyset_page(query, (Prediction.created_at, Prediction.id), request.args.get('cursor'),
+                                               parse_limit(request.args.get('limit'), 20))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
-        'predictions': [pred.to_dict() for pred in predictions.items],
-        'total': predictions.total,
-        'pages': predictions.pages,
-        'current_page': page
+        'predictions': [pred.to_dict() for pred in predictions],
+        'next_cursor': next_cursor
     })
 
 @api_bp.route('/predictions', methods=['POST'])
@@ -243,6 +289,7 @@ def create_prediction(user_payload):
         
         db.session.add(prediction)
         db.session.commit()
+        plan_service.record_prediction(user_payload['user_id'])
         
         # Log l'action
         audit_log = AuditLog(
@@ -292,30 +339,50 @@ def get_prediction_details(user_payload, prediction_id):
 @require_auth
 def admin_get_users(user_payload):
     """Liste tous les utilisateurs (admin seulement)"""
-    user = User.query.get(user_payload['user_id'])
+    user = load_user(user_payload)
     if user.role != 'admin':
         return jsonify({'error': 'Accès admin requis'}), 403
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    query = User.query
+    for field in ('role', 'plan', 'status'):
+        if request.args.get(field):
+            query = query.filter(getattr(User, field) == request.args[field])
+    search = request.args.get('q', '').strip()
+    if search:
+        # Même recherche que le tableau de bord admin : début du username ou de l'email
+        query = query.filter(prefix_search((User.username, User.email), search))
+    
+    if not cursor_requested(request.args):
+        # Pagination par numéro de page (OFFSET + COUNT), format historique par défaut
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 50, type=int)
+        users = query.order_by(User.created_at.desc()).paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        return jsonify({
+            'users': [user.to_dict() for user in users.items],
+            'total': users.total,
+            'pages': users.pages
+        })
     
-    users = User.query.order_by(User.created_at.desc()).paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    try:
+        users, next_cursor = keyset_page(query, (User.created_at, User.id), request.args.get('cursor'),
+                                         parse_limit(request.args.get('limit'), 50))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
-        'users': [user.to_dict() for user in users.items],
-        'total': users.total,
-        'pages': users.pages
+        'users': [user.to_dict() for user in users],
+        'next_cursor': next_cursor
     })
 
 @api_bp.route('/admin/users/<user_id>', methods=['PATCH'])
 @require_auth
 def admin_update_user(user_payload, user_id):
     """Met à jour un utilisateur (admin seulement)"""
-    current_user = User.query.get(user_payload['user_id'])
+    current_user = load_user(user_payload)
     if current_user.role != 'admin':
         return jsonify({'error': 'Accès admin requis'}), 403
     
@@ -335,11 +402,14 @@ def admin_update_user(user_payload, user_id):
     
     if 'status' in data:
         user.status = data['status']
+        if user.status != 'actif':
+            session_manager.revoke_user(user_id)
     
     if 'role' in data:
         user.role = data['role']
     
     db.session.commit()
+    user_cache.invalidate(User, user_id)
     
     return jsonify({
         'message': 'Utilisateur mis à jour',
@@ -350,7 +420,7 @@ def admin_update_user(user_payload, user_id):
 @require_auth
 def admin_delete_user(user_payload, user_id):
     """Supprime un utilisateur (admin seulement)"""
-    current_user = User.query.get(user_payload['user_id'])
+    current_user = load_user(user_payload)
     if current_user.role != 'admin':
         return jsonify({'error': 'Accès admin requis'}), 403
     
@@ -360,6 +430,8 @@ def admin_delete_user(user_payload, user_id):
     
     db.session.delete(user)
     db.session.commit()
+    user_cache.invalidate(User, user_id)
+    session_manager.revoke_user(user_id)
     
     return jsonify({'message': 'Utilisateur supprimé'})
 
@@ -373,6 +445,32 @@ def ml_status():
     
     return jsonify(ml_integration.get_model_status())
 
+@api_bp.route('/ml/models/reload', methods=['POST'])
+@require_auth
+def ml_reload_models(user_payload):
+    """Recharge les modèles modifiés sur disque après validation (admin seulement)"""
+    user = load_user(user_payload)
+    if user.role != 'admin':
+        return jsonify({'error': 'Accès admin requis'}), 403
+    if not ML_AVAILABLE:
+        return jsonify({'error': 'Module ML non disponible'}), 503
+    
+    report = ml_integration.reload_models(force=request.args.get('force') == '1')
+    return jsonify(report), 409 if report['status'] in ('rejected', 'busy') else 200
+
+@api_bp.route('/ml/models/rollback', methods=['POST'])
+@require_auth
+def ml_rollback_models(user_payload):
+    """Revient à la version précédente des modèles (admin seulement)"""
+    user = load_user(user_payload)
+    if user.role != 'admin':
+        return jsonify({'error': 'Accès admin requis'}), 403
+    if not ML_AVAILABLE:
+        return jsonify({'error': 'Module ML non disponible'}), 503
+    
+    report = ml_integration.rollback()
+    return jsonify(report), 409 if report['status'] == 'unavailable' else 200
+
 @api_bp.route('/ml/predict/1x2', methods=['POST'])
 @require_auth
 def predict_match_1x2(user_payload):
@@ -396,16 +494,10 @@ def predict_match_1x2(user_payload):
         prediction = ml_integration.predict_match_result(match_data)
         
         # Logger la pr??diction
-        audit = AuditLog(
-            user_id=user_payload['user_id'],
-            action='ML_PREDICTION_1X2',
-            details=json.dumps({
-                'match_data': match_data,
-                'prediction': prediction
-            })
-        )
-        db.session.add(audit)
-        db.session.commit()
+        audit_ml(user_payload, 'ML_PREDICTION_1X2', {
+            'match_data': match_data,
+            'prediction': prediction
+        })
         
         return jsonify(prediction)
         
@@ -434,17 +526,11 @@ def predict_over_under(user_payload):
         prediction = ml_integration.predict_over_under(match_data, line)
         
         # Logger la pr??diction
-        audit = AuditLog(
-            user_id=user_payload['user_id'],
-            action='ML_PREDICTION_OVER_UNDER',
-            details=json.dumps({
-                'match_data': match_data,
-                'line': line,
-                'prediction': prediction
-            })
-        )
-        db.session.add(audit)
-        db.session.commit()
+        audit_ml(user_payload, 'ML_PREDICTION_OVER_UNDER', {
+            'match_data': match_data,
+            'line': line,
+            'prediction': prediction
+        })
         
         return jsonify(prediction)
         
@@ -473,17 +559,11 @@ def predict_handicap(user_payload):
         prediction = ml_integration.predict_handicap(match_data, handicap)
         
         # Logger la pr??diction
-        audit = AuditLog(
-            user_id=user_payload['user_id'],
-            action='ML_PREDICTION_HANDICAP',
-            details=json.dumps({
-                'match_data': match_data,
-                'handicap': handicap,
-                'prediction': prediction
-            })
-        )
-        db.session.add(audit)
-        db.session.commit()
+        audit_ml(user_payload, 'ML_PREDICTION_HANDICAP', {
+            'match_data': match_data,
+            'handicap': handicap,
+            'prediction': prediction
+        })
         
         return jsonify(prediction)
         
@@ -513,22 +593,95 @@ def predict_all(user_payload):
         predictions = ml_integration.get_all_predictions(match_data)
         
         # Logger la pr??diction compl??te
-        audit = AuditLog(
-            user_id=user_payload['user_id'],
-            action='ML_PREDICTION_ALL',
-            details=json.dumps({
-                'match_data': match_data,
-                'predictions_count': len(predictions.get('predictions', {}))
-            })
-        )
-        db.session.add(audit)
-        db.session.commit()
+        audit_ml(user_payload, 'ML_PREDICTION_ALL', {
+            'match_data': match_data,
+            'predictions_count': len(predictions.get('predictions', {}))
+        })
         
         return jsonify(predictions)
         
     except Exception as e:
         return jsonify({'error': f'Erreur de pr??diction: {str(e)}'}), 500
 
+def _numeric_list(values, name):
+    """Liste de nombres finis d'au plus ML_BATCH_MAX_LINES éléments (None = valeurs par défaut)"""
+    if values is None:
+        return None
+    if not isinstance(values, list):
+        raise ValueError(f'{name} doit être une liste')
+    if len(values) > ML_BATCH_MAX_LINES:
+        raise ValueError(f'Maximum {ML_BATCH_MAX_LINES} valeurs pour {name}')
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in values):
+        raise ValueError(f'{name} doit contenir uniquement des nombres')
+    return values
+
+def _audit_batch(user_payload, matches_count, errors, predictions_count):
+    # Un seul enregistrement d'audit pour tout le lot
+    audit_ml(user_payload, 'ML_PREDICTION_BATCH', {
+        'matches_count': matches_count,
+        'errors_count': errors,
+        'predictions_count': predictions_count
+    })
+
+@api_bp.route('/ml/predict/batch', methods=['POST'])
+@require_auth
+@require_premium
+def predict_batch(user_payload):
+    """
+    Prédictions ML de plusieurs matchs en un appel
+
+    JSON : réponse unique après calcul de tout le lot.
+    NDJSON (?format=ndjson ou Accept: application/x-ndjson) : le lot est
+    calculé par tranches de ML_BATCH_STREAM_CHUNK matchs, chaque tranche
+    est envoyée dès qu'elle est prête.
+    """
+    if not ML_AVAILABLE:
+        return jsonify({'error': 'Module ML non disponible'}), 503
+    
+    data = request.get_json(silent=True)
+    matches = data.get('matches') if isinstance(data, dict) else data
+    if not isinstance(matches, list) or not matches:
+        return jsonify({'error': 'Liste de matchs requise'}), 400
+    if len(matches) > ML_BATCH_MAX_MATCHES:
+        return jsonify({'error': f'Maximum {ML_BATCH_MAX_MATCHES} matchs par appel'}), 413
+    
+    try:
+        lines = _numeric_list(data.get('lines') if isinstance(data, dict) else None, 'lines')
+        handicaps = _numeric_list(data.get('handicaps') if isinstance(data, dict) else None, 'handicaps')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    wants_ndjson = (
+        request.args.get('format') == 'ndjson'
+        or 'application/x-ndjson' in request.headers.get('Accept', '')
+    )
+    if wants_ndjson:
+        chunk = max(1, ML_BATCH_STREAM_CHUNK)
+        
+        def generate():
+            errors = predictions_count = 0
+            for start in range(0, len(matches), chunk):
+                try:
+                    results = ml_integration.predict_batch(matches[start:start + chunk], lines, handicaps)
+                except Exception as e:
+                    yield json.dumps({'error': f'Erreur de prédiction: {str(e)}', 'index': start}, ensure_ascii=False) + '\n'
+                    break
+                for offset, result in enumerate(results):
+                    errors += 'error' in result
+                    predictions_count += len(result.get('predictions', {}))
+                    yield json.dumps(dict(result, index=start + offset), ensure_ascii=False) + '\n'
+            _audit_batch(user_payload, len(matches), errors, predictions_count)
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    try:
+        results = ml_integration.predict_batch(matches, lines, handicaps)
+    except Exception as e:
+        return jsonify({'error': f'Erreur de prédiction: {str(e)}'}), 500
+    
+    errors = sum(1 for r in results if 'error' in r)
+    _audit_batch(user_payload, len(matches), errors, sum(len(r.get('predictions', {})) for r in results))
+    return jsonify({'count': len(results), 'errors': errors, 'results': results})
+
 def health_check():
     """Vérification de santé de l'API"""
     return jsonify({
@@ -97,6 +97,15 @@ except ImportError:
     SNAKE_WIN_DISPONIBLE = False
     print("❌ Système Snake Win non disponible")
 
+# Registre des moteurs (un singleton par worker, construit à la première requête)
+from engine_registry import engine_registry
+
+# Moteur Monte Carlo vectorisé (NumPy si disponible, sinon Python standard)
+from simulation_monte_carlo import MoteurMonteCarlo, erreur_standard
+
+# Pricer analytique (Poisson) des marchés alternatifs en direct
+from pricer_marches import PricerMarches
+
 # Import optionnel de numpy (désactivé pour Render)
 NUMPY_DISPONIBLE = False
 # Simulation des fonctions NumPy avec Python standard
@@ -155,6 +164,8 @@ except ImportError:
     print("⚠️  Mode démonstration non disponible")
 
 from models import db, User, UserFile, SystemLog, Prediction, Alert, AccessLog
+from user_cache import user_cache
+from pagination import keyset_page, parse_limit, prefix_search
 from prediction_manager import (
     log_action, log_access, create_prediction, get_prediction_by_match,
     invalidate_prediction, lock_prediction, create_alert, check_match_started_alert,
@@ -225,21 +236,26 @@ db.init_app(app)
 try:
     with app.app_context():
         db.create_all()
+        # Index uniques requis par les upserts groupés (bases créées avant leur ajout)
+        from bulk_upsert import ensure_unique_keys
+        ensure_unique_keys(db)
+        db.session.commit()
+        # Index non uniques ajoutés aux modèles après la création des tables
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if not index.unique:
+                    index.create(db.engine, checkfirst=True)
+        # Compteurs de performance : reconstruction unique pour les archives antérieures
+        from models import PerformanceBucket, PredictionArchive
+        if PerformanceBucket.query.first() is None and \
+                PredictionArchive.query.filter(PredictionArchive.finalized_at.isnot(None)).first() is not None:
+            from archive_manager import rebuild_performance_buckets
+            rebuild_performance_buckets()
         print("✅ Base de données initialisée avec succès")
 except Exception as e:
     print(f"⚠️  Erreur initialisation base de données: {e}")
     print("🔄 L'application démarrera en mode dégradé (sans base de données)")
     
-    # Initialiser le système Snake Win
-    snake_win_system = None
-    if SNAKE_WIN_DISPONIBLE:
-        try:
-            snake_win_system = SnakeWinSystem()
-            print("🐍 Système Snake Win initialisé avec succès")
-        except Exception as e:
-            print(f"❌ Erreur initialisation Snake Win: {e}")
-            snake_win_system = None
-    
     # Initialiser automatiquement le compte admin si nécessaire
     try:
         admin = User.query.filter_by(username='ADMIN').first()
@@ -368,9 +384,9 @@ def upload_profile_photo_supabase(file_bytes, filename, content_type):
     return f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/public/{SUPABASE_STORAGE_BUCKET}/{object_path}"
 
 def get_current_user():
-    """Récupère l'utilisateur actuellement connecté"""
+    """Récupère l'utilisateur actuellement connecté (cache mémoire à TTL court)"""
     if session.get('user_id'):
-        return User.query.get(session.get('user_id'))
+        return user_cache.get(db, User, session.get('user_id'))
     return None
 
 def require_login(f):
@@ -675,13 +691,57 @@ def admin_logout():
     return redirect(url_for('home'))
 
 
+def get_user_stats():
+    """Compteurs utilisateurs des tableaux de bord admin, en une requête d'agrégats conditionnels"""
+    def count_if(condition):
+        return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+    
+    total, admins, active, pending = db.session.query(
+        db.func.count(User.id),
+        count_if(User.is_admin.is_(True)),
+        count_if(User.subscription_status == 'active'),
+        count_if(User.is_approved.is_(False))
+    ).one()
+    return {'total': total, 'admins': admins, 'active_subscriptions': active, 'pending_approvals': pending}
+
+
+# Colonnes du tableau de bord admin (le mot de passe n'est jamais chargé)
+ADMIN_USER_COLUMNS = (
+    User.id, User.username, User.email, User.profile_photo, User.is_admin, User.is_approved,
+    User.subscription_plan, User.subscription_status, User.subscription_expires_at,
+    User.created_at, User.last_login_at
+)
+
+# Filtres serveur du tableau de bord admin
+ADMIN_USER_FILTERS = {
+    'pending': User.is_approved.is_(False),
+    'admins': User.is_admin.is_(True),
+    'active': User.subscription_status == 'active',
+}
+
+
 @app.route('/admin/dashboard')
 def admin_dashboard():
     if not is_admin():
         return redirect(url_for('admin_login'))
 
-    users = User.query.order_by(User.created_at.desc()).all()
-    return render_template_string(ADMIN_DASHBOARD_TEMPLATE, users=users)
+    user_filter = request.args.get('filter', '')
+    search = request.args.get('q', '').strip()
+    limit = parse_limit(request.args.get('limit'))
+    
+    query = db.session.query(*ADMIN_USER_COLUMNS)
+    if user_filter in ADMIN_USER_FILTERS:
+        query = query.filter(ADMIN_USER_FILTERS[user_filter])
+    if search:
+        query = query.filter(prefix_search((User.username, User.email), search))
+    try:
+        users, next_cursor = keyset_page(query, (User.created_at, User.id), request.args.get('cursor'), limit)
+    except ValueError:
+        return redirect(url_for('admin_dashboard'))
+    
+    return render_template_string(ADMIN_DASHBOARD_TEMPLATE, users=users, user_stats=get_user_stats(),
+                                  next_cursor=next_cursor, is_first_page=not request.args.get('cursor'),
+                                  user_filter=user_filter, search=search, limit=limit)
 
 
 @app.route('/admin/user/<int:user_id>/delete', methods=['POST'])
@@ -697,6 +757,7 @@ def admin_delete_user(user_id):
     username = user.username
     db.session.delete(user)
     db.session.commit()
+    user_cache.invalidate(User, user_id)
     log_action('admin_action', f"Utilisateur supprimé: {username}", 
                admin_id=admin_user.id if admin_user else None, user_id=user_id, severity='warning')
     return redirect(url_for('admin_dashboard'))
@@ -712,6 +773,7 @@ def admin_toggle_admin(user_id):
     old_status = user.is_admin
     user.is_admin = not user.is_admin
     db.session.commit()
+    user_cache.invalidate(User, user_id)
     log_action('admin_action', f"Changement statut admin pour {user.username}: {'Promu admin' if user.is_admin else 'Rétrogradé'}", 
                admin_id=admin_user.id if admin_user else None, user_id=user_id, severity='warning')
     return redirect(url_for('admin_dashboard'))
@@ -727,6 +789,7 @@ def admin_approve_user(user_id):
     admin_user = User.query.get(session.get('admin_id'))
     user.is_approved = True
     db.session.commit()
+    user_cache.invalidate(User, user_id)
     log_action('admin_action', f"Utilisateur approuvé: {user.username}", 
                admin_id=admin_user.id if admin_user else None, user_id=user_id, severity='info')
     return redirect(url_for('admin_dashboard'))
@@ -750,6 +813,7 @@ def admin_set_plan(user_id):
             # Ajouter 30 jours par défaut
             user.subscription_expires_at = datetime.utcnow() + timedelta(days=30)
         db.session.commit()
+        user_cache.invalidate(User, user_id)
         log_action('admin_action', f"Plan modifié pour {user.username}: {plan} ({status})", 
                    admin_id=admin_user.id if admin_user else None, user_id=user_id, severity='info')
     
@@ -995,9 +1059,10 @@ def oracx_admin():
         return redirect(url_for('admin_login'))
     
     # Récupérer les statistiques
-    total_users = User.query.count()
-    active_subscriptions = User.query.filter_by(subscription_status='active').count()
-    pending_approvals = User.query.filter_by(is_approved=False).count()
+    user_stats = get_user_stats()
+    total_users = user_stats['total']
+    active_subscriptions = user_stats['active_subscriptions']
+    pending_approvals = user_stats['pending_approvals']
     recent_logs = SystemLog.query.order_by(SystemLog.created_at.desc()).limit(50).all()
     
     return render_template_string(ORACX_ADMIN_TEMPLATE,
@@ -1653,42 +1718,37 @@ def match_details(match_id):
 
         print(f"💰 {len(paris_cotes_valides)} paris avec cotes valides (1.399-3.0)")
 
-        # 🎲 BOT 1: SYSTÈME UNIFIÉ ALTERNATIFS UNIQUEMENT
-        bot_unifie = systeme_unifie_alternatifs_only(team1, team2, league, paris_cotes_valides, score1, score2, minute)
-
-        # 🤖 BOT 2: IA SPÉCIALISÉE ALTERNATIFS UNIQUEMENT
-        bot_ia = systeme_ia_alternatifs_only(team1, team2, league, paris_cotes_valides, score1, score2, minute)
-
-        # 📊 BOT 3: PROBABILITÉS ALTERNATIVES UNIQUEMENT
-        bot_probabilites = systeme_probabilites_alternatifs_only(paris_cotes_valides, score1, score2, minute)
-
-        # 💰 BOT 4: VALUE BETTING ALTERNATIFS UNIQUEMENT
-        bot_value = systeme_value_betting_alternatifs_only(paris_cotes_valides, team1, team2, league)
+        # 📐 Matrice des buts restants calculée UNE FOIS pour tout le match (partagée par les bots)
+        pricer_match = PricerMarches.depuis_cotes(odds_data, paris_alternatifs_filtres, score1, score2, minute)
 
-        # 📈 BOT 5: ANALYSE STATISTIQUE ALTERNATIFS UNIQUEMENT
-        bot_stats = systeme_statistique_alternatifs_only(paris_cotes_valides, team1, team2, league, score1, score2, minute)
+        # 🤖 LES 5 BOTS SPÉCIALISÉS (ALTERNATIFS UNIQUEMENT)
+        fournisseurs_bots = {
+            'BOT_UNIFIE': lambda: systeme_unifie_alternatifs_only(team1, team2, league, paris_cotes_valides, score1, score2, minute),
+            'BOT_IA': lambda: systeme_ia_alternatifs_only(team1, team2, league, paris_cotes_valides, score1, score2, minute),
+            'BOT_PROBABILITES': lambda: systeme_probabilites_alternatifs_only(paris_cotes_valides, score1, score2, minute, pricer_match),
+            'BOT_VALUE': lambda: systeme_value_betting_alternatifs_only(paris_cotes_valides, team1, team2, league, pricer_match),
+            'BOT_STATS': lambda: systeme_statistique_alternatifs_only(paris_cotes_valides, team1, team2, league, score1, score2, minute)
+        }
 
         # 🎯 MAÎTRE DES PRONOSTICS - DÉCISION FINALE
         if BOTS_ALTERNATIFS_DISPONIBLES:
-            maitre = MaitreDesPronostics()
-
-            # Compilation des décisions de tous les bots
-            decisions_bots = {
-                'BOT_UNIFIE': bot_unifie,
-                'BOT_IA': bot_ia,
-                'BOT_PROBABILITES': bot_probabilites,
-                'BOT_VALUE': bot_value,
-                'BOT_STATS': bot_stats
-            }
+            maitre = engine_registry.get('maitre')
 
-            # Décision finale du maître
-            contexte_maitre = {'score1': score1, 'score2': score2, 'minute': minute}
-            decision_maitre = maitre.analyser_decisions_bots(decisions_bots, team1, team2, league, contexte_maitre)
+            # Bots exécutés en parallèle, consensus mis à jour à chaque réponse,
+            # décision rendue à l'échéance même si un bot lent n'a pas répondu
+            decision_maitre, decisions_bots = maitre.analyser_decisions_bots_avec_delai(
+                fournisseurs_bots, team1, team2, league
+            )
 
             print(f"🎯 MAÎTRE DES PRONOSTICS - Décision: {decision_maitre.get('decision_finale', {}).get('action', 'AUCUNE')}")
         else:
+            decisions_bots = {nom: fournisseur() for nom, fournisseur in fournisseurs_bots.items()}
             decision_maitre = {'decision_finale': {'action': 'BOTS NON DISPONIBLES'}}
 
+        bot_unifie = decisions_bots.get('BOT_UNIFIE')
+        bot_ia = decisions_bots.get('BOT_IA') or {}
+        bot_value = decisions_bots.get('BOT_VALUE') or {}
+
         # 🔄 COMPATIBILITÉ AVEC L'ANCIEN SYSTÈME
         prediction_alt = bot_unifie
         value_bets = bot_value.get('opportunities', [])
@@ -1697,7 +1757,8 @@ def match_details(match_id):
 
         # 🐍 SYSTÈME SNAKE WIN (si disponible)
         prediction_snake_win = None
-        if SNAKE_WIN_DISPONIBLE and snake_win_system:
+        snake_win_system = engine_registry.get('snake_win') if SNAKE_WIN_DISPONIBLE else None
+        if snake_win_system:
             try:
                 contexte_snake_win = {'score1': score1, 'score2': score2, 'minute': minute}
                 prediction_snake_win = snake_win_system.analyser_match_snake_win(
@@ -1713,11 +1774,12 @@ def match_details(match_id):
 
         # 🎲 SYSTÈME QUANTIQUE SPÉCIALISÉ PARIS ALTERNATIFS (si disponible)
         if QUANTIQUE_DISPONIBLE:
-            systeme_quantique = SystemePredictionQuantique()
+            systeme_quantique = engine_registry.get('quantique')
             contexte_quantique = {'score1': score1, 'score2': score2, 'minute': minute}
-            # Signature: analyser_match_quantique(self, team1, team2, league, odds_data, contexte_temps_reel=None, paris_alternatifs=None)
+            # Signature: analyser_match_quantique(self, team1, team2, league, odds_data, contexte_temps_reel=None, paris_alternatifs=None, pricer=None)
             prediction_quantique = systeme_quantique.analyser_match_quantique(
-                team1, team2, league, odds_data, contexte_quantique, paris_alternatifs_filtres
+                team1, team2, league, odds_data, contexte_quantique, paris_alternatifs_filtres,
+                pricer=pricer_match
             )
         else:
             # Version simplifiée spécialisée paris alternatifs
@@ -4098,20 +4160,30 @@ ADMIN_DASHBOARD_TEMPLATE = """<!DOCTYPE html>
     
     <div class="stats-bar">
         <div class="stat-card">
-            <div class="stat-number">{{ users|length }}</div>
+            <div class="stat-number">{{ user_stats.total }}</div>
             <div class="stat-label">Total Utilisateurs</div>
         </div>
         <div class="stat-card">
-            <div class="stat-number">{{ users|selectattr('is_admin')|list|length }}</div>
+            <div class="stat-number">{{ user_stats.admins }}</div>
             <div class="stat-label">Administrateurs</div>
         </div>
         <div class="stat-card">
-            <div class="stat-number">{{ users|rejectattr('is_admin')|list|length }}</div>
+            <div class="stat-number">{{ user_stats.total - user_stats.admins }}</div>
             <div class="stat-label">Utilisateurs</div>
         </div>
     </div>
     
     <div class="table-container">
+        <form method="get" action="/admin/dashboard" style="margin-bottom:15px;">
+            <input type="text" name="q" value="{{ search }}" placeholder="Username ou email (début)" style="padding:6px; border-radius:6px;">
+            <select name="filter" style="padding:6px; border-radius:6px;">
+                <option value="" {% if not user_filter %}selected{% endif %}>Tous</option>
+                <option value="pending" {% if user_filter=='pending' %}selected{% endif %}>En attente</option>
+                <option value="admins" {% if user_filter=='admins' %}selected{% endif %}>Administrateurs</option>
+                <option value="active" {% if user_filter=='active' %}selected{% endif %}>Abonnement actif</option>
+            </select>
+            <button class="btn" type="submit">🔍 Filtrer</button>
+        </form>
         {% if users %}
         <table>
             <thead>
@@ -4193,6 +4265,14 @@ ADMIN_DASHBOARD_TEMPLATE = """<!DOCTYPE html>
                 {% endfor %}
             </tbody>
         </table>
+        <div style="margin-top:15px; text-align:center;">
+            {% if not is_first_page %}
+            <a class="btn" href="/admin/dashboard?filter={{ user_filter|urlencode }}&q={{ search|urlencode }}&limit={{ limit }}">⏮️ Première page</a>
+            {% endif %}
+            {% if next_cursor %}
+            <a class="btn" href="/admin/dashboard?cursor={{ next_cursor }}&filter={{ user_filter|urlencode }}&q={{ search|urlencode }}&limit={{ limit }}">Page suivante ➡️</a>
+            {% endif %}
+        </div>
         {% else %}
         <div class="empty-state">
             <div class="empty-state-icon">👥</div>
@@ -6893,6 +6973,11 @@ class SystemePredictionParisAlternatifs:
         self.force1 = [20, 35, 30, 15, 0]  # Défaut équilibré
         self.force2 = [20, 35, 30, 15, 0]  # Défaut équilibré
 
+        # Simulations Monte Carlo : tirées une seule fois par match, partagées par toutes les options
+        self.moteur_monte_carlo = MoteurMonteCarlo()
+        self._scores_simules = None
+        self._totaux_simules = None
+
         # Analyser et catégoriser les paris alternatifs
         self.categories_paris = self._categoriser_paris_alternatifs()
 
@@ -7097,19 +7182,10 @@ class SystemePredictionParisAlternatifs:
         else:
             return {'probabilite': 50, 'recommandation': 'neutre', 'details': 'Structure inconnue'}
 
-        # ANALYSE TEMPS RÉEL : Score actuel + prédiction du reste du match
-        buts_restants_team1 = 0
-        buts_restants_team2 = 0
-
-        # Estimer les buts restants selon le temps écoulé
-        if self.minute > 0 and self.minute < 90:
-            temps_restant_ratio = (90 - self.minute) / 90
-            # Prédire les buts restants proportionnellement au temps
-            buts_restants_team1 = random.choices([0, 1, 2], weights=[0.6, 0.3, 0.1])[0] * temps_restant_ratio
-            buts_restants_team2 = random.choices([0, 1, 2], weights=[0.6, 0.3, 0.1])[0] * temps_restant_ratio
-
-        # TOTAL FINAL PRÉDIT = Score actuel + Buts restants estimés
-        total_final_predit = self.total_buts_actuels + buts_restants_team1 + buts_restants_team2
+        # ANALYSE TEMPS RÉEL : Score actuel + distribution simulée du reste du match
+        # (échantillons tirés une seule fois par match, voir _simuler_totaux_finaux)
+        totaux_finaux = self._simuler_totaux_finaux()
+        simulation = None
 
         if 'plus de' in nom:
             # Extraire le seuil (ex: "plus de 2.5")
@@ -7130,12 +7206,10 @@ class SystemePredictionParisAlternatifs:
                 elif self.minute > 80 and (seuil - self.total_buts_actuels) > 1:
                     # Fin de match, seuil loin d'être atteint
                     probabilite = 15
-                elif total_final_predit > seuil:
-                    # Prédiction positive
-                    probabilite = 60
                 else:
-                    # Peu probable
-                    probabilite = 30
+                    # Entre 30 (peu probable) et 60 (prédiction positive) selon P(total final > seuil)
+                    simulation = self.moteur_monte_carlo.probabilite_total(totaux_finaux, seuil, plus_de=True)
+                    probabilite = round(30 + 30 * simulation['probabilite'], 1)
             else:
                 probabilite = 60
 
@@ -7154,23 +7228,38 @@ class SystemePredictionParisAlternatifs:
                 elif self.minute > 70 and self.total_buts_actuels < seuil:
                     # Fin de match approche, seuil pas encore atteint
                     probabilite = 75
-                elif total_final_predit < seuil:
-                    # Prédiction positive
-                    probabilite = 65
                 else:
-                    # Peu probable
-                    probabilite = 35
+                    # Entre 35 (peu probable) et 65 (prédiction positive) selon P(total final < seuil)
+                    simulation = self.moteur_monte_carlo.probabilite_total(totaux_finaux, seuil, plus_de=False)
+                    probabilite = round(35 + 30 * simulation['probabilite'], 1)
             else:
                 probabilite = 40
         else:
             probabilite = 50
 
-        return {
+        resultat = {
             'probabilite': probabilite,
             'confiance': min(95, probabilite * 0.9),
             'recommandation': 'favorable' if probabilite > 65 else 'neutre' if probabilite > 45 else 'defavorable',
             'contexte_temps_reel': f"Score: {self.score1}-{self.score2} ({self.total_buts_actuels} buts) - {self.minute}'"
         }
+        if simulation:
+            resultat['simulation'] = simulation
+        return resultat
+
+    def _simuler_totaux_finaux(self):
+        """Échantillons du total final (score actuel + buts restants), tirés une fois par match"""
+        if self._totaux_simules is None:
+            moteur = self.moteur_monte_carlo
+            if 0 < self.minute < 90:
+                # Buts restants par équipe proportionnels au temps restant
+                temps_restant_ratio = (90 - self.minute) / 90
+                self._totaux_simules = moteur.simuler_totaux_finaux(
+                    self.total_buts_actuels, [0.6, 0.3, 0.1], temps_restant_ratio
+                )
+            else:
+                self._totaux_simules = [self.total_buts_actuels]
+        return self._totaux_simules
 
     def _analyse_handicaps(self, option):
         """Système spécialisé pour l'analyse des handicaps"""
@@ -7585,34 +7674,45 @@ class SystemePredictionParisAlternatifs:
 
     def _simulation_monte_carlo(self, option):
         """Simulation Monte Carlo pour prédire l'issue"""
-        simulations = 1000
-        succes = 0
+        return self._simulations_monte_carlo([option])[0]
 
-        for _ in range(simulations):
-            # Simuler un match
-            buts1 = random.choices([0, 1, 2, 3, 4], weights=self.force1)[0]
-            buts2 = random.choices([0, 1, 2, 3, 4], weights=self.force2)[0]
+    def _simulations_monte_carlo(self, options):
+        """Simulation Monte Carlo vectorisée de toutes les options d'un match en un seul lot"""
+        moteur = self.moteur_monte_carlo
 
-            # Vérifier si l'option est réalisée
-            if option['type'] == 'resultat_1x2':
-                if option['equipe_cible'] == self.team1 and buts1 > buts2:
-                    succes += 1
-                elif option['equipe_cible'] == self.team2 and buts2 > buts1:
-                    succes += 1
-                elif option['equipe_cible'] is None and buts1 == buts2:
-                    succes += 1
-            else:
-                # Pour les paris alternatifs, simulation simplifiée
-                if random.random() < (1 / option['cote']):
-                    succes += 1
+        # Un seul tirage de scores pour tout le match, partagé par les options 1X2
+        if self._scores_simules is None:
+            buts1, buts2 = moteur.simuler_scores(self.force1, self.force2)
+            self._scores_simules = moteur.probabilites_1x2(buts1, buts2)
+        probas_1x2 = self._scores_simules
 
-        probabilite = (succes / simulations) * 100
+        # Paris alternatifs : un seul tirage binomial pour toutes les options
+        alternatives = [o for o in options if o['type'] != 'resultat_1x2']
+        tirages = iter(moteur.bernoulli([1 / o['cote'] for o in alternatives]) if alternatives else [])
 
-        return {
-            'probabilite': probabilite,
-            'confiance': min(80, probabilite * 0.8),
-            'recommandation': 'favorable' if probabilite > 55 else 'neutre' if probabilite > 35 else 'defavorable'
-        }
+        resultats = []
+        for option in options:
+            if option['type'] == 'resultat_1x2':
+                if option['equipe_cible'] == self.team1:
+                    p = probas_1x2['1']
+                elif option['equipe_cible'] == self.team2:
+                    p = probas_1x2['2']
+                else:
+                    p = probas_1x2['X']
+                n = moteur.n_simulations
+                simulation = {'probabilite': p, 'erreur_standard': erreur_standard(p, n), 'simulations': n}
+            else:
+                simulation = next(tirages)
+
+            probabilite = simulation['probabilite'] * 100
+            resultats.append({
+                'probabilite': probabilite,
+                'confiance': min(80, probabilite * 0.8),
+                'recommandation': 'favorable' if probabilite > 55 else 'neutre' if probabilite > 35 else 'defavorable',
+                'erreur_standard': round(simulation['erreur_standard'] * 100, 3),
+                'simulations': simulation['simulations']
+            })
+        return resultats
 
     def _analyse_forme(self, option):
         """Analyse de la forme des équipes"""
@@ -7679,13 +7779,16 @@ class SystemePredictionParisAlternatifs:
             }
         }
 
+        # Simulation Monte Carlo de toutes les options en un seul lot
+        simulations = self._simulations_monte_carlo(self.options_principales)
+
         # Chaque système analyse toutes les options
-        for option in self.options_principales:
+        for option, simulation in zip(self.options_principales, simulations):
             option_id = option['type'] + '_' + str(option['cote'])
 
             donnees['systemes']['statistique'][option_id] = self._analyse_statistique(option)
             donnees['systemes']['cotes'][option_id] = self._analyse_cotes_option(option)
-            donnees['systemes']['simulation'][option_id] = self._simulation_monte_carlo(option)
+            donnees['systemes']['simulation'][option_id] = simulation
             donnees['systemes']['forme'][option_id] = self._analyse_forme(option)
 
         return donnees
@@ -7874,7 +7977,8 @@ class AllianceSystemesPrediction:
         else:
             self.systeme_alternatifs_avance = None
 
-        self.systeme_quantique_alternatifs = SystemePredictionQuantique() if QUANTIQUE_DISPONIBLE else None
+        # Moteur quantique partagé via le registre (aucun état propre au match)
+        self.systeme_quantique_alternatifs = engine_registry.get('quantique') if QUANTIQUE_DISPONIBLE else None
 
     def generer_alliance_complete(self):
         """🎲 ALLIANCE SPÉCIALISÉE PARIS ALTERNATIFS DE TOUS LES SYSTÈMES"""
@@ -5,9 +5,10 @@ Gère la sauvegarde et la mise à jour des données archivées pour la mémoire
 Système de mémoire fiable pour apprentissage supervisé.
 """
 
-from models import db, MatchArchive, PredictionArchive, ModelPerformance, AnomalyLog, Prediction
+from models import db, MatchArchive, PredictionArchive, ModelPerformance, PerformanceBucket, AnomalyLog, Prediction, Alert
 from prediction_manager import log_action, create_alert
-from datetime import datetime
+from bulk_upsert import upsert_rows, load_by_keys, ids_by_keys
+from datetime import datetime, date
 import json
 
 
@@ -171,6 +172,216 @@ def archive_prediction_before(match_id, prediction_id, consensus_type, choix, pr
         raise
 
 
+# ========== SAUVEGARDE AVANT MATCH PAR LOTS ==========
+
+MATCH_ARCHIVE_UPDATE_COLUMNS = (
+    'jeu', 'ligue', 'equipe_1', 'equipe_2', 'date_heure_match',
+    'cote_1', 'cote_X', 'cote_2', 'mode', 'updated_at'
+)
+PREDICTION_ARCHIVE_UPDATE_COLUMNS = (
+    'prediction_id', 'choix', 'probabilite', 'confiance', 'vote_statistique', 'vote_cotes',
+    'vote_simulation', 'vote_forme', 'consensus', 'updated_at'
+)
+
+
+def _match_archive_rows(matches, admin_id, now):
+    return [{
+        'match_id': m['match_id'],
+        'jeu': m['jeu'],
+        'ligue': m['ligue'],
+        'equipe_1': m['equipe_1'],
+        'equipe_2': m['equipe_2'],
+        'date_heure_match': m['date_heure_match'],
+        'cote_1': m.get('cote_1'),
+        'cote_X': m.get('cote_X'),
+        'cote_2': m.get('cote_2'),
+        'mode': m.get('mode'),
+        'statut_final': 'en_cours',
+        'is_locked': False,
+        'archived_by': admin_id,
+        'created_at': now,
+        'updated_at': now,
+        'extra_data': json.dumps(m['extra_data']) if m.get('extra_data') else None
+    } for m in matches]
+
+
+def _prediction_archive_rows(predictions, now):
+    """Lignes PredictionArchive ; les matchs doivent être archivés (vérifié en une requête)"""
+    match_ids = {p['match_id'] for p in predictions}
+    archived = {row[0] for row in db.session.query(MatchArchive.match_id).filter(MatchArchive.match_id.in_(match_ids))}
+    missing = sorted(match_ids - archived)
+    if missing:
+        raise ValueError(f"Matchs {missing} doivent être archivés AVANT d'archiver leurs prédictions")
+    
+    return [{
+        'match_id': p['match_id'],
+        'prediction_id': p.get('prediction_id'),
+        'consensus_type': p['consensus_type'],
+        'choix': p['choix'],
+        'probabilite': p['probabilite'],
+        'confiance': p['confiance'],
+        'vote_statistique': bool(p.get('vote_statistique', False)),
+        'vote_cotes': bool(p.get('vote_cotes', False)),
+        'vote_simulation': bool(p.get('vote_simulation', False)),
+        'vote_forme': bool(p.get('vote_forme', False)),
+        'consensus': bool(p.get('consensus', False)),
+        'created_at': now,
+        'updated_at': now,
+        'extra_data': json.dumps(p['extra_data']) if p.get('extra_data') else None
+    } for p in predictions]
+
+
+def _insert_confidence_anomalies(rows, now):
+    """
+    Anomalies de confiance (rares) d'un lot de prédictions archivées et leurs
+    alertes admin, insérées en INSERT multi-lignes dans la transaction de l'appelant
+    
+    Returns:
+        int: nombre d'anomalies
+    """
+    latest = {(r['match_id'], r['consensus_type']): r for r in rows}  # la dernière gagne, comme l'upsert
+    flagged = {key: r for key, r in latest.items() if r['confiance'] is not None and r['confiance'] > 95}
+    if not flagged:
+        return 0
+    
+    ids = ids_by_keys(db, PredictionArchive, ('match_id', 'consensus_type'), list(flagged))
+    description = "Confiance anormalement élevée ({}%) pour match {}"
+    db.session.execute(db.insert(AnomalyLog), [{
+        'anomaly_type': 'high_confidence',
+        'description': description.format(r['confiance'], r['match_id']),
+        'match_id': r['match_id'],
+        'prediction_archive_id': ids.get(key),
+        'severity': 'warning',
+        'detected_at': now,
+        'is_resolved': False,
+        'context_data': json.dumps({'confiance': r['confiance'], 'probabilite': r['probabilite']})
+    } for key, r in flagged.items()])
+    # Alertes admin correspondantes
+    db.session.execute(db.insert(Alert), [{
+        'alert_type': 'high_confidence',
+        'message': description.format(r['confiance'], r['match_id']),
+        'severity': 'warning',
+        'match_id': r['match_id'],
+        'is_acknowledged': False,
+        'created_at': now
+    } for r in flagged.values()])
+    return len(flagged)
+
+
+def archive_matches_before_bulk(matches, admin_id=None):
+    """
+    Archive plusieurs matchs AVANT leur début en une transaction
+    
+    Équivalent ensembliste d'archive_match_before : un seul
+    INSERT ... ON CONFLICT (match_id) DO UPDATE et un seul commit.
+    
+    Args:
+        matches: liste de dicts aux paramètres d'archive_match_before
+        admin_id: ID de l'admin qui archive (optionnel)
+    
+    Returns:
+        list de MatchArchive
+    """
+    rows = _match_archive_rows(matches, admin_id, datetime.utcnow())
+    
+    try:
+        keys = upsert_rows(db, MatchArchive, rows, ('match_id',),
+                           MATCH_ARCHIVE_UPDATE_COLUMNS, keep_if_null=('extra_data',))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log_action('archive_error', f"Erreur lors de l'archivage groupé de {len(rows)} matchs: {str(e)}", severity='error')
+        raise
+    
+    log_action('matches_archived_before_bulk',
+              f"{len(keys)} matchs archivés AVANT match en lot",
+              admin_id=admin_id,
+              severity='info',
+              extra_data={'count': len(keys)})
+    
+    return load_by_keys(db, MatchArchive, ('match_id',), keys)
+
+
+def archive_predictions_before_bulk(predictions):
+    """
+    Archive plusieurs prédictions AVANT match en une transaction
+    
+    Tous les matchs doivent déjà être archivés (vérifié en une requête).
+    
+    Args:
+        predictions: liste de dicts aux paramètres d'archive_prediction_before
+    
+    Returns:
+        list de PredictionArchive
+    """
+    now = datetime.utcnow()
+    rows = _prediction_archive_rows(predictions, now)
+    
+    try:
+        keys = upsert_rows(db, PredictionArchive, rows, ('match_id', 'consensus_type'),
+                           PREDICTION_ARCHIVE_UPDATE_COLUMNS, keep_if_null=('extra_data',))
+        anomalies = _insert_confidence_anomalies(rows, now)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log_action('archive_error', f"Erreur lors de l'archivage groupé de prédictions: {str(e)}", severity='error')
+        raise
+    
+    saved = load_by_keys(db, PredictionArchive, ('match_id', 'consensus_type'), keys)
+    log_action('predictions_archived_before_bulk',
+              f"{len(saved)} prédictions archivées AVANT match en lot",
+              severity='info',
+              extra_data={'count': len(saved), 'anomalies': anomalies})
+    
+    return saved
+
+
+def archive_before_bulk(matches, predictions, admin_id=None):
+    """
+    Archive des matchs et leurs prédictions AVANT match en une seule transaction
+    
+    Les prédictions peuvent viser des matchs de `matches` ou déjà archivés.
+    Rejouer le même lot ne change rien (upserts idempotents).
+    
+    Args:
+        matches: liste de dicts aux paramètres d'archive_match_before
+        predictions: liste de dicts aux paramètres d'archive_prediction_before
+        admin_id: ID de l'admin qui archive (optionnel)
+    
+    Returns:
+        tuple (list de MatchArchive, list de PredictionArchive)
+    """
+    now = datetime.utcnow()
+    match_keys, prediction_keys = [], []
+    anomalies = 0
+    try:
+        if matches:
+            match_keys = upsert_rows(db, MatchArchive, _match_archive_rows(matches, admin_id, now), ('match_id',),
+                                     MATCH_ARCHIVE_UPDATE_COLUMNS, keep_if_null=('extra_data',))
+        if predictions:
+            rows = _prediction_archive_rows(predictions, now)
+            prediction_keys = upsert_rows(db, PredictionArchive, rows, ('match_id', 'consensus_type'),
+                                          PREDICTION_ARCHIVE_UPDATE_COLUMNS, keep_if_null=('extra_data',))
+            anomalies = _insert_confidence_anomalies(rows, now)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log_action('archive_error', f"Erreur lors de l'archivage groupé ({len(matches)} matchs, "
+                                    f"{len(predictions)} prédictions): {str(e)}", severity='error')
+        raise
+    
+    saved_matches = load_by_keys(db, MatchArchive, ('match_id',), match_keys)
+    saved_predictions = load_by_keys(db, PredictionArchive, ('match_id', 'consensus_type'), prediction_keys)
+    log_action('archived_before_bulk',
+              f"{len(saved_matches)} matchs et {len(saved_predictions)} prédictions archivés AVANT match en lot",
+              admin_id=admin_id,
+              severity='info',
+              extra_data={'matches': len(saved_matches), 'predictions': len(saved_predictions),
+                          'anomalies': anomalies})
+    
+    return saved_matches, saved_predictions
+
+
 # ========== MISE À JOUR APRÈS MATCH ==========
 
 def update_match_after(match_id, score_final_equipe_1, score_final_equipe_2, 
@@ -248,140 +459,419 @@ def update_predictions_after_match(match_id, resultat_reel):
         match_id: ID du match
         resultat_reel: Résultat réel (1, X, 2)
     """
-    predictions = PredictionArchive.query.filter_by(match_id=match_id).all()
+    try:
+        finalize_predictions_bulk({match_id: resultat_reel})
+    except Exception:
+        # Déjà annulé et journalisé par finalize_predictions_bulk
+        pass
+
+
+# Matchs réglés par instruction UPDATE (paramètres liés par match : CASE résultat, probabilité réelle, IN)
+FINALIZE_CHUNK = 200
+
+
+def _finalize_predictions(results, now):
+    """
+    Finalise les prédictions des matchs de `results` sans valider la transaction
     
-    for pred in predictions:
-        # Déterminer si la prédiction est correcte
-        prediction_correcte = None
-        ecart_probabilite = None
-        
-        if pred.consensus_type == '1X2':
-            # Pour 1X2, comparer le choix avec le résultat réel
-            choix_normalise = str(pred.choix).upper()
-            resultat_normalise = str(resultat_reel).upper()
-            
-            # Extraire le résultat prédit (1, X, 2)
-            if 'VICTOIRE' in choix_normalise or pred.choix.startswith('1'):
-                choix_extrait = '1'
-            elif 'NUL' in choix_normalise or 'X' in choix_normalise or pred.choix.startswith('X'):
-                choix_extrait = 'X'
-            elif pred.choix.startswith('2'):
-                choix_extrait = '2'
-            else:
-                choix_extrait = None
-            
-            if choix_extrait:
-                prediction_correcte = (choix_extrait == resultat_normalise)
-                
-                # Calculer l'écart de probabilité
-                if resultat_normalise == '1':
-                    prob_reel = 100.0
-                elif resultat_normalise == 'X':
-                    prob_reel = 100.0
-                elif resultat_normalise == '2':
-                    prob_reel = 100.0
-                else:
-                    prob_reel = 33.33  # Par défaut
-                
-                ecart_probabilite = abs(pred.probabilite - prob_reel)
+    Correction et écart calculés dans un UPDATE par tranche de matchs
+    (résultat réel injecté par CASE match_id), compteurs de performance
+    ajustés en SQL, anomalies insérées en un INSERT multi-lignes.
+    
+    Returns:
+        tuple (prédictions finalisées, anomalies créées)
+    """
+    PA = PredictionArchive
+    match_ids = list(results)
+    deltas = {}
+    anomalies = []
+    finalized = 0
+    
+    # Extraire le résultat prédit (1, X, 2) du choix
+    choix = db.func.upper(PA.choix)
+    choix_extrait = db.case(
+        (db.or_(choix.contains('VICTOIRE'), PA.choix.startswith('1')), '1'),
+        (db.or_(choix.contains('NUL'), choix.contains('X')), 'X'),
+        (PA.choix.startswith('2'), '2'),
+        else_=None
+    )
+    comparable = db.and_(PA.consensus_type == '1X2', choix_extrait.isnot(None))
+    
+    for start in range(0, len(match_ids), FINALIZE_CHUNK):
+        chunk = match_ids[start:start + FINALIZE_CHUNK]
+        # Prédictions déjà finalisées : retirer leur ancienne contribution aux compteurs
+        _performance_deltas_for_matches(deltas, chunk, -1)
         
-        # Mettre à jour la prédiction
-        pred.resultat_reel = resultat_reel
-        pred.prediction_correcte = prediction_correcte
-        pred.ecart_probabilite = ecart_probabilite
-        pred.finalized_at = datetime.utcnow()
-        pred.updated_at = datetime.utcnow()
+        resultat = db.case({m: results[m] for m in chunk}, value=PA.match_id)
+        resultat_normalise = db.case({m: str(results[m]).upper() for m in chunk}, value=PA.match_id)
+        prob_reel = db.case({m: 100.0 if str(results[m]).upper() in ('1', 'X', '2') else 33.33 for m in chunk},
+                            value=PA.match_id)
+        finalized += db.session.execute(
+            db.update(PA).where(PA.match_id.in_(chunk)).values(
+                resultat_reel=resultat,
+                prediction_correcte=db.case((comparable, choix_extrait == resultat_normalise), else_=None),
+                ecart_probabilite=db.case((comparable, db.func.abs(PA.probabilite - prob_reel)), else_=None),
+                finalized_at=now,
+                updated_at=now
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        _performance_deltas_for_matches(deltas, chunk, 1)
         
-        # Vérifier les anomalies
-        if pred.consensus and not prediction_correcte:
-            # Consensus annoncé mais résultat incohérent
-            create_anomaly_log('consensus_incoherent',
-                              f"Consensus annoncé mais prédiction incorrecte pour match {match_id}",
-                              match_id=match_id,
-                              prediction_archive_id=pred.id,
-                              severity='error',
-                              context_data={
-                                  'choix': pred.choix,
-                                  'resultat_reel': resultat_reel,
-                                  'probabilite': pred.probabilite,
-                                  'confiance': pred.confiance
-                              })
+        # Consensus annoncé mais résultat incohérent
+        anomalies += db.session.execute(
+            db.select(PA.id, PA.match_id, PA.choix, PA.resultat_reel, PA.probabilite, PA.confiance).where(
+                PA.match_id.in_(chunk),
+                PA.consensus.is_(True),
+                db.or_(PA.prediction_correcte.is_(None), PA.prediction_correcte.is_(False))
+            )
+        ).all()
+    
+    record_performance_deltas(deltas)
+    
+    if anomalies:
+        description = "Consensus annoncé mais prédiction incorrecte pour match {}"
+        db.session.execute(db.insert(AnomalyLog), [{
+            'anomaly_type': 'consensus_incoherent',
+            'description': description.format(a.match_id),
+            'match_id': a.match_id,
+            'prediction_archive_id': a.id,
+            'severity': 'error',
+            'detected_at': now,
+            'is_resolved': False,
+            'context_data': json.dumps({
+                'choix': a.choix,
+                'resultat_reel': a.resultat_reel,
+                'probabilite': a.probabilite,
+                'confiance': a.confiance
+            })
+        } for a in anomalies])
+        # Alertes admin correspondantes
+        db.session.execute(db.insert(Alert), [{
+            'alert_type': 'consensus_incoherent',
+            'message': description.format(a.match_id),
+            'severity': 'error',
+            'match_id': a.match_id,
+            'is_acknowledged': False,
+            'created_at': now
+        } for a in anomalies])
+    
+    return finalized, len(anomalies)
+
+
+def finalize_predictions_bulk(results):
+    """
+    Finalise les prédictions archivées de plusieurs matchs en une transaction
+    
+    Args:
+        results: dict match_id -> résultat réel (1, X, 2)
+    
+    Returns:
+        int: nombre de prédictions finalisées
+    """
+    if not results:
+        return 0
     
     try:
+        finalized, anomalies = _finalize_predictions(results, datetime.utcnow())
         db.session.commit()
-        
+    except Exception as e:
+        db.session.rollback()
+        log_action('predictions_update_error', f"Erreur lors de la mise à jour des prédictions: {str(e)}", severity='error')
+        raise
+    
+    if len(results) == 1:
+        match_id, resultat_reel = next(iter(results.items()))
         log_action('predictions_updated_after',
                   f"Prédictions archivées mises à jour pour match {match_id}",
                   severity='info',
                   extra_data={'match_id': match_id, 'resultat': resultat_reel})
-        
-        # Recalculer les performances
-        calculate_model_performance()
-        
+    else:
+        log_action('predictions_updated_after_bulk',
+                  f"{finalized} prédictions archivées mises à jour pour {len(results)} matchs",
+                  severity='info',
+                  extra_data={'matches': len(results), 'predictions': finalized})
+    if anomalies:
+        log_action('anomaly_logged',
+                  f"{anomalies} anomalies consensus_incoherent enregistrées",
+                  severity='error',
+                  extra_data={'anomaly_type': 'consensus_incoherent', 'count': anomalies})
+    
+    # Recalculer les performances (compteurs journaliers)
+    calculate_model_performance()
+    return finalized
+
+
+def update_matches_after_bulk(results, admin_id=None):
+    """
+    Met à jour plusieurs matchs terminés et leurs prédictions en une transaction
+    
+    Pour régler un arriéré (reprise après coupure du flux) : les matchs
+    verrouillés sont ignorés, les autres sont mis à jour et verrouillés,
+    puis leurs prédictions sont finalisées ensemble, avec un seul commit.
+    
+    Args:
+        results: liste de dicts {match_id, score_final_equipe_1, score_final_equipe_2,
+                 resultat_reel, statut_final (optionnel, 'terminé' par défaut)}
+        admin_id: ID de l'admin qui met à jour (optionnel)
+    
+    Returns:
+        dict: {'matches': matchs réglés, 'predictions': prédictions finalisées, 'skipped': match_ids ignorés}
+    """
+    by_match = {r['match_id']: r for r in results}
+    archived = {}
+    for start in range(0, len(by_match), FINALIZE_CHUNK):
+        chunk = list(by_match)[start:start + FINALIZE_CHUNK]
+        for row in db.session.execute(db.select(MatchArchive.id, MatchArchive.match_id, MatchArchive.is_locked)
+                                      .where(MatchArchive.match_id.in_(chunk))):
+            archived[row.match_id] = row
+    skipped = sorted(m for m in by_match if m not in archived or archived[m].is_locked)
+    settled = {m: r for m, r in by_match.items() if m not in skipped}
+    
+    now = datetime.utcnow()
+    try:
+        if settled:
+            db.session.execute(db.update(MatchArchive), [{
+                'id': archived[m].id,
+                'score_final_equipe_1': r['score_final_equipe_1'],
+                'score_final_equipe_2': r['score_final_equipe_2'],
+                'resultat_reel': r['resultat_reel'],
+                'statut_final': r.get('statut_final', 'terminé'),
+                'updated_at': now,
+                'is_locked': True
+            } for m, r in settled.items()])
+        finalized, anomalies = _finalize_predictions({m: r['resultat_reel'] for m, r in settled.items()}, now)
+        db.session.commit()
     except Exception as e:
         db.session.rollback()
-        log_action('predictions_update_error', f"Erreur lors de la mise à jour des prédictions: {str(e)}", severity='error')
+        log_action('archive_update_error', f"Erreur lors du règlement groupé de {len(settled)} matchs: {str(e)}", severity='error')
+        raise
+    
+    log_action('matches_updated_after_bulk',
+              f"{len(settled)} matchs réglés en lot ({finalized} prédictions, {len(skipped)} ignorés)",
+              admin_id=admin_id,
+              severity='warning' if skipped else 'info',
+              extra_data={'matches': len(settled), 'predictions': finalized,
+                          'anomalies': anomalies, 'skipped': skipped[:100]})
+    
+    if settled:
+        calculate_model_performance()
+    return {'matches': len(settled), 'predictions': finalized, 'skipped': skipped}
 
 
 # ========== CALCUL DE PERFORMANCE ==========
 
-def calculate_model_performance(date_debut=None, date_fin=None):
+# Segments suivis par les compteurs de performance (en plus de 'global') : colonne et valeur attendue
+PERFORMANCE_SEGMENTS = {
+    'statistique': ('vote_statistique', True),
+    'cotes': ('vote_cotes', True),
+    'simulation': ('vote_simulation', True),
+    'forme': ('vote_forme', True),
+    'consensus': ('consensus', True),
+    '1x2': ('consensus_type', '1X2'),
+    'alternatif': ('consensus_type', 'alternatif'),
+}
+BUCKET_COUNTERS = ('total', 'correctes', 'somme_confiance', 'somme_probabilite', 'somme_ecart')
+
+
+def _add_performance_delta(deltas, pred, sign):
+    """Ajoute (sign=1) ou retire (sign=-1) une prédiction finalisée aux compteurs de son jour"""
+    day = pred.finalized_at.date()
+    delta = (
+        sign,
+        sign if pred.prediction_correcte else 0,
+        sign * (pred.confiance or 0.0),
+        sign * (pred.probabilite or 0.0),
+        sign * (pred.ecart_probabilite or 0.0),
+    )
+    segments = ['global'] + [name for name, (column, value) in PERFORMANCE_SEGMENTS.items()
+                             if getattr(pred, column) == value]
+    for segment in segments:
+        current = deltas.get((day, segment), (0, 0, 0.0, 0.0, 0.0))
+        deltas[(day, segment)] = tuple(a + b for a, b in zip(current, delta))
+
+
+def record_performance_deltas(deltas):
     """
-    Calcule les performances du modèle sur une période donnée
+    Applique des variations de compteurs (un upsert additif, sans commit)
     
     Args:
-        date_debut: Date de début (par défaut: il y a 30 jours)
-        date_fin: Date de fin (par défaut: maintenant)
+        deltas: dict (jour, segment) -> (total, correctes, somme_confiance, somme_probabilite, somme_ecart)
+    """
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    rows = [dict(zip(BUCKET_COUNTERS, counters), day=day, segment=segment, updated_at=now)
+            for (day, segment), counters in deltas.items()]
+    upsert_rows(db, PerformanceBucket, rows, ('day', 'segment'), ('updated_at',),
+                increment_columns=BUCKET_COUNTERS)
+
+
+def rebuild_performance_buckets():
+    """
+    Reconstruit tous les compteurs depuis PredictionArchive (maintenance, bases existantes)
+    
+    Parcourt l'archive une fois ; le calcul courant n'en a plus besoin.
     
     Returns:
-        ModelPerformance object
+        int: nombre de prédictions finalisées comptées
     """
-    from datetime import timedelta
+    deltas = {}
+    count = 0
+    query = PredictionArchive.query.filter(
+        PredictionArchive.finalized_at.isnot(None),
+        PredictionArchive.prediction_correcte.isnot(None)
+    ).yield_per(1000)
+    for pred in query:
+        _add_performance_delta(deltas, pred, 1)
+        count += 1
     
-    if not date_debut:
-        date_fin = datetime.utcnow()
-        date_debut = date_fin - timedelta(days=30)
-    elif not date_fin:
-        date_fin = datetime.utcnow()
+    try:
+        PerformanceBucket.query.delete()
+        record_performance_deltas(deltas)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log_action('performance_error', f"Erreur lors de la reconstruction des compteurs: {str(e)}", severity='error')
+        raise
     
-    # Récupérer toutes les prédictions finalisées dans la période
-    predictions = PredictionArchive.query.filter(
+    log_action('performance_buckets_rebuilt',
+              f"Compteurs de performance reconstruits ({count} prédictions)",
+              severity='info',
+              extra_data={'predictions': count, 'buckets': len(deltas)})
+    return count
+
+
+def _rate(bucket):
+    return (bucket['correctes'] / bucket['total'] * 100) if bucket and bucket['total'] > 0 else None
+
+
+def _segment_sum_columns():
+    """Agrégats conditionnels SQL (compteurs BUCKET_COUNTERS de chaque segment) et noms des segments"""
+    correct = PredictionArchive.prediction_correcte.is_(True)
+    conditions = {'global': PredictionArchive.id.isnot(None)}
+    conditions.update({name: getattr(PredictionArchive, column) == value
+                       for name, (column, value) in PERFORMANCE_SEGMENTS.items()})
+    
+    def conditional_sum(condition, value):
+        return db.func.coalesce(db.func.sum(db.case((condition, value), else_=0)), 0)
+    
+    columns = []
+    for condition in conditions.values():
+        columns += [
+            conditional_sum(condition, 1),
+            conditional_sum(db.and_(condition, correct), 1),
+            conditional_sum(condition, PredictionArchive.confiance),
+            conditional_sum(condition, PredictionArchive.probabilite),
+            conditional_sum(condition, db.func.coalesce(PredictionArchive.ecart_probabilite, 0.0)),
+        ]
+    return columns, list(conditions)
+
+
+def _split_segments(row, segments):
+    width = len(BUCKET_COUNTERS)
+    return {segment: tuple(row[i * width:(i + 1) * width]) for i, segment in enumerate(segments)}
+
+
+def aggregate_prediction_archive(date_debut, date_fin):
+    """
+    Agrège les prédictions finalisées d'une période directement en SQL
+    
+    Une seule requête d'agrégats conditionnels (index finalized_at,
+    consensus_type) : aucune ligne n'est chargée en Python.
+    
+    Returns:
+        dict segment -> compteurs (même forme que les PerformanceBucket)
+    """
+    columns, segments = _segment_sum_columns()
+    row = db.session.query(*columns).filter(
         PredictionArchive.finalized_at >= date_debut,
         PredictionArchive.finalized_at <= date_fin,
         PredictionArchive.prediction_correcte.isnot(None)
-    ).all()
+    ).one()
+    return {segment: dict(zip(BUCKET_COUNTERS, counters))
+            for segment, counters in _split_segments(row, segments).items()}
+
+
+def _performance_deltas_for_matches(deltas, match_ids, sign):
+    """Ajoute (sign=1) ou retire (sign=-1) aux compteurs les prédictions finalisées de ces matchs, agrégées en SQL"""
+    columns, segments = _segment_sum_columns()
+    day = db.func.date(PredictionArchive.finalized_at)
+    rows = db.session.query(day, *columns).filter(
+        PredictionArchive.match_id.in_(match_ids),
+        PredictionArchive.finalized_at.isnot(None),
+        PredictionArchive.prediction_correcte.isnot(None)
+    ).group_by(day).all()
+    for row in rows:
+        row_day = date.fromisoformat(row[0]) if isinstance(row[0], str) else row[0]
+        for segment, counters in _split_segments(row[1:], segments).items():
+            if not counters[0]:
+                continue
+            current = deltas.get((row_day, segment), (0, 0, 0.0, 0.0, 0.0))
+            deltas[(row_day, segment)] = tuple(a + sign * b for a, b in zip(current, counters))
+
+
+def _bucket_totals(date_debut, date_fin):
+    """Somme des compteurs journaliers d'une période, par segment"""
+    sums = [db.func.coalesce(db.func.sum(getattr(PerformanceBucket, c)), 0) for c in BUCKET_COUNTERS]
+    totals = db.session.query(PerformanceBucket.segment, *sums).filter(
+        PerformanceBucket.day >= date_debut.date(),
+        PerformanceBucket.day <= date_fin.date()
+    ).group_by(PerformanceBucket.segment).all()
+    return {row[0]: dict(zip(BUCKET_COUNTERS, row[1:])) for row in totals}
+
+
+def calculate_model_performance(date_debut=None, date_fin=None):
+    """
+    Calcule les performances du modèle sur une période donnée
     
-    if not predictions:
+    Fenêtre glissante par défaut : taux assemblés à partir des compteurs
+    journaliers (PerformanceBucket), au plus un jour par segment quelle
+    que soit la taille de l'archive. Période explicite : agrégation SQL
+    exacte sur PredictionArchive.
+    
+    Args:
+        date_debut: Date de début (par défaut: fenêtre glissante de 30 jours)
+        date_fin: Date de fin (par défaut: maintenant, fin du jour pour la fenêtre glissante)
+    
+    Returns:
+        ModelPerformance object
+    """
+    from datetime import timedelta, time
+    
+    if not date_debut:
+        # Fenêtre glissante : une ligne ModelPerformance par jour, mise à jour au fil des matchs
+        today = datetime.utcnow().date()
+        date_debut = datetime.combine(today - timedelta(days=29), time.min)
+        date_fin = datetime.combine(today, time.max)
+        buckets = _bucket_totals(date_debut, date_fin)
+    else:
+        if not date_fin:
+            date_fin = datetime.utcnow()
+        buckets = aggregate_prediction_archive(date_debut, date_fin)
+    
+    overall = buckets.get('global')
+    if not overall or overall['total'] <= 0:
         return None
     
-    total = len(predictions)
-    correctes = sum(1 for p in predictions if p.prediction_correcte)
-    taux_reussite = (correctes / total * 100) if total > 0 else 0
+    total = int(overall['total'])
+    correctes = int(overall['correctes'])
+    taux_reussite = _rate(overall)
     
     # Calculer par module
-    stats_statistique = [p for p in predictions if p.vote_statistique]
-    stats_cotes = [p for p in predictions if p.vote_cotes]
-    stats_simulation = [p for p in predictions if p.vote_simulation]
-    stats_forme = [p for p in predictions if p.vote_forme]
-    stats_consensus = [p for p in predictions if p.consensus]
-    
-    taux_reussite_statistique = (sum(1 for p in stats_statistique if p.prediction_correcte) / len(stats_statistique) * 100) if stats_statistique else None
-    taux_reussite_cotes = (sum(1 for p in stats_cotes if p.prediction_correcte) / len(stats_cotes) * 100) if stats_cotes else None
-    taux_reussite_simulation = (sum(1 for p in stats_simulation if p.prediction_correcte) / len(stats_simulation) * 100) if stats_simulation else None
-    taux_reussite_forme = (sum(1 for p in stats_forme if p.prediction_correcte) / len(stats_forme) * 100) if stats_forme else None
-    taux_reussite_consensus = (sum(1 for p in stats_consensus if p.prediction_correcte) / len(stats_consensus) * 100) if stats_consensus else None
+    taux_reussite_statistique = _rate(buckets.get('statistique'))
+    taux_reussite_cotes = _rate(buckets.get('cotes'))
+    taux_reussite_simulation = _rate(buckets.get('simulation'))
+    taux_reussite_forme = _rate(buckets.get('forme'))
+    taux_reussite_consensus = _rate(buckets.get('consensus'))
     
     # Calculer moyennes de confiance
-    moyenne_confiance = sum(p.confiance for p in predictions) / total if total > 0 else 0
-    moyenne_probabilite = sum(p.probabilite for p in predictions) / total if total > 0 else 0
-    ecart_moyen_probabilite = sum(p.ecart_probabilite for p in predictions if p.ecart_probabilite) / total if total > 0 else None
+    moyenne_confiance = overall['somme_confiance'] / total
+    moyenne_probabilite = overall['somme_probabilite'] / total
+    ecart_moyen_probabilite = overall['somme_ecart'] / total
     
     # Par type
-    preds_1x2 = [p for p in predictions if p.consensus_type == '1X2']
-    preds_alternatifs = [p for p in predictions if p.consensus_type == 'alternatif']
-    
-    taux_reussite_1x2 = (sum(1 for p in preds_1x2 if p.prediction_correcte) / len(preds_1x2) * 100) if preds_1x2 else None
-    taux_reussite_alternatifs = (sum(1 for p in preds_alternatifs if p.prediction_correcte) / len(preds_alternatifs) * 100) if preds_alternatifs else None
+    taux_reussite_1x2 = _rate(buckets.get('1x2'))
+    taux_reussite_alternatifs = _rate(buckets.get('alternatif'))
     
     # Créer ou mettre à jour la performance
     performance = ModelPerformance.query.filter_by(date_debut=date_debut, date_fin=date_fin).first()
@@ -533,7 +1023,7 @@ def get_recent_performance(days=30):
     """Récupère les performances récentes"""
     from datetime import timedelta
     date_debut = datetime.utcnow() - timedelta(days=days)
-    return ModelPerformance.query.filter(ModelPerformance.date_debut >= date_debut).all()
+    return ModelPerformance.query.filter(ModelPerformance.date_debut >= date_debut).order_by(ModelPerformance.date_debut).all()
 
 
 def get_unresolved_anomalies():
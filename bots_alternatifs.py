@@ -70,15 +70,18 @@ def systeme_ia_alternatifs_only(team1, team2, league, paris_cotes_valides, score
         'specialite': 'INTELLIGENCE ARTIFICIELLE ALTERNATIFS'
     }
 
-def systeme_probabilites_alternatifs_only(paris_cotes_valides, score1, score2, minute):
-    """📊 BOT 3: PROBABILITÉS ALTERNATIVES UNIQUEMENT"""
+def systeme_probabilites_alternatifs_only(paris_cotes_valides, score1, score2, minute, pricer=None):
+    """📊 BOT 3: PROBABILITÉS ALTERNATIVES UNIQUEMENT
+
+    pricer (PricerMarches, optionnel) : probabilités exactes calculées une fois par match
+    """
     
     print(f"📊 BOT PROBABILITÉS - Calcul probabiliste de {len(paris_cotes_valides)} paris")
     
     paris_recommandes = []
     
     for pari in paris_cotes_valides:
-        confiance = _analyser_pari_probabilites(pari, score1, score2, minute)
+        confiance = _analyser_pari_probabilites(pari, score1, score2, minute, pricer)
         
         if confiance >= 55:  # Seuil probabilités
             paris_recommandes.append({
@@ -98,15 +101,18 @@ def systeme_probabilites_alternatifs_only(paris_cotes_valides, score1, score2, m
         'specialite': 'CALCULS PROBABILISTES ALTERNATIFS'
     }
 
-def systeme_value_betting_alternatifs_only(paris_cotes_valides, team1, team2, league):
-    """💰 BOT 4: VALUE BETTING ALTERNATIFS UNIQUEMENT"""
+def systeme_value_betting_alternatifs_only(paris_cotes_valides, team1, team2, league, pricer=None):
+    """💰 BOT 4: VALUE BETTING ALTERNATIFS UNIQUEMENT
+
+    pricer (PricerMarches, optionnel) : probabilités exactes calculées une fois par match
+    """
     
     print(f"💰 BOT VALUE - Détection de value sur {len(paris_cotes_valides)} paris")
     
     paris_recommandes = []
     
     for pari in paris_cotes_valides:
-        value_score = _calculer_value_pari(pari, team1, team2, league)
+        value_score = _calculer_value_pari(pari, team1, team2, league, pricer)
         
         if value_score >= 10:  # Value positive de 10%+
             confiance = min(50 + value_score, 95)  # Confiance basée sur la value
@@ -229,7 +235,14 @@ def _analyser_pari_ia(pari, team1, team2, league, score1, score2, minute):
     
     return min(confiance, 95)
 
-def _analyser_pari_probabilites(pari, score1, score2, minute):
+def _probabilite_analytique(pari, pricer, team1='', team2=''):
+    """📐 Probabilité exacte (en %) depuis le pricer du match, ou None"""
+    if pricer is None:
+        return None
+    probabilite = pricer.probabilite_pari(pari, team1, team2)
+    return None if probabilite is None else probabilite * 100
+
+def _analyser_pari_probabilites(pari, score1, score2, minute, pricer=None):
     """📊 ANALYSE PROBABILISTE D'UN PARI"""
     confiance = 50
     nom = pari['nom'].lower()
@@ -239,7 +252,10 @@ def _analyser_pari_probabilites(pari, score1, score2, minute):
     prob_implicite = (1 / cote) * 100
     
     # Estimation probabiliste
-    if 'total' in nom:
+    prob_analytique = _probabilite_analytique(pari, pricer)
+    if prob_analytique is not None:
+        prob_estimee = prob_analytique
+    elif 'total' in nom:
         if 'plus' in nom:
             # Probabilité basée sur le contexte
             if score1 + score2 >= 2:
@@ -259,13 +275,16 @@ def _analyser_pari_probabilites(pari, score1, score2, minute):
     
     return min(confiance, 95)
 
-def _calculer_value_pari(pari, team1, team2, league):
+def _calculer_value_pari(pari, team1, team2, league, pricer=None):
     """💰 CALCULE LA VALUE D'UN PARI"""
     cote = float(pari['cote'])
     nom = pari['nom'].lower()
     
     # Probabilité estimée
-    if 'total' in nom:
+    prob_analytique = _probabilite_analytique(pari, pricer, team1, team2)
+    if prob_analytique is not None:
+        prob_estimee = prob_analytique
+    elif 'total' in nom:
         if 'moins' in nom:
             prob_estimee = 65  # Généralement plus probable
         else:
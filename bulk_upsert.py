@@ -0,0 +1,158 @@
+"""
+📥 UPSERT ENSEMBLISTE - ORACXPRED MÉTAPHORE
+==========================================
+Insère ou met à jour un lot de lignes en une instruction :
+INSERT ... ON CONFLICT (clé) DO UPDATE sur PostgreSQL et SQLite, dans la
+transaction de l'appelant. Repli portable (un SELECT des clés existantes,
+un UPDATE groupé, un INSERT groupé) pour les autres bases ou quand l'index
+unique de la clé n'a pas pu être créé.
+"""
+
+import os
+
+from sqlalchemy import func, insert, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Lignes par instruction (limite de variables SQLite)
+CHUNK_ROWS = int(os.getenv("BULK_UPSERT_CHUNK", "500"))
+
+# Index uniques requis par ON CONFLICT, ajoutés après la création des premières bases
+UNIQUE_KEYS = {
+    "predictions": ("uq_predictions_match_type", ("match_id", "consensus_type")),
+    "predictions_archive": ("uq_predictions_archive_match_type", ("match_id", "consensus_type")),
+    "performance_buckets": ("uq_performance_buckets_day_segment", ("day", "segment")),
+}
+
+_DIALECT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_unique_ready = {}  # (url, table) -> index unique disponible
+
+
+def ensure_unique_keys(db):
+    """
+    Crée les index uniques de UNIQUE_KEYS sur une base existante (idempotent)
+
+    Exécuté dans un savepoint de la session : si la table contient déjà des
+    doublons, seul l'index est abandonné et l'upsert portable est utilisé.
+    """
+    url = str(db.engine.url)
+    for table, (name, columns) in UNIQUE_KEYS.items():
+        try:
+            with db.session.begin_nested():
+                db.session.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+            _unique_ready[(url, table)] = True
+        except Exception as e:
+            _unique_ready[(url, table)] = False
+            print(f"⚠️ Index unique {name} indisponible (doublons ?), upsert portable utilisé: {e}")
+
+
+def _has_unique_key(db, table, keys):
+    if table not in UNIQUE_KEYS:
+        # Clé d'une seule colonne déclarée unique dans le modèle (ex. matches_archive.match_id)
+        return True
+    key = (str(db.engine.url), table)
+    if key not in _unique_ready:
+        ensure_unique_keys(db)
+    return _unique_ready.get(key, False)
+
+
+def _dedupe(rows, keys, increment_columns=()):
+    """Une ligne par clé (la dernière gagne, compteurs additionnés) : ON CONFLICT ne peut toucher deux fois la même ligne"""
+    unique = {}
+    for row in rows:
+        key = tuple(row[k] for k in keys)
+        if increment_columns and key in unique:
+            row = dict(row, **{c: unique[key][c] + row[c] for c in increment_columns})
+        unique[key] = row
+    return list(unique.values())
+
+
+def upsert_rows(db, model, rows, keys, update_columns, keep_if_null=(), increment_columns=()):
+    """
+    Insère ou met à jour `rows` (dicts colonne -> valeur) sans valider la transaction
+
+    Args:
+        db: instance SQLAlchemy
+        model: modèle cible
+        rows: lignes complètes (mêmes colonnes pour toutes)
+        keys: colonnes de la clé de conflit
+        update_columns: colonnes réécrites quand la ligne existe
+        keep_if_null: colonnes conservées quand la nouvelle valeur est NULL
+        increment_columns: compteurs ajoutés à la valeur existante (les
+            lignes de même clé sont alors additionnées, pas remplacées)
+
+    Returns:
+        list: les clés écrites (tuples), dans l'ordre d'entrée dédoublonné
+    """
+    rows = _dedupe(rows, keys, increment_columns)
+    if not rows:
+        return []
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in _DIALECT_INSERT and _has_unique_key(db, table.name, keys):
+        for start in range(0, len(rows), CHUNK_ROWS):
+            stmt = _DIALECT_INSERT[dialect](table).values(rows[start:start + CHUNK_ROWS])
+            set_ = {column: stmt.excluded[column] for column in update_columns}
+            for column in keep_if_null:
+                set_[column] = func.coalesce(stmt.excluded[column], table.c[column])
+            for column in increment_columns:
+                set_[column] = table.c[column] + stmt.excluded[column]
+            db.session.execute(stmt.on_conflict_do_update(index_elements=list(keys), set_=set_))
+    else:
+        _upsert_portable(db, model, rows, keys, update_columns, keep_if_null, increment_columns)
+    return [tuple(row[k] for k in keys) for row in rows]
+
+
+def _upsert_portable(db, model, rows, keys, update_columns, keep_if_null, increment_columns=()):
+    """SELECT des clés existantes, puis un UPDATE et un INSERT groupés"""
+    key_columns = [getattr(model, k) for k in keys]
+    counters = [getattr(model, c) for c in increment_columns]
+    existing = {}
+    wanted = [tuple(row[k] for k in keys) for row in rows]
+    for start in range(0, len(wanted), CHUNK_ROWS):
+        chunk = wanted[start:start + CHUNK_ROWS]
+        for found in db.session.execute(
+            db.select(model.id, *counters, *key_columns).where(tuple_(*key_columns).in_(chunk))
+        ):
+            existing[tuple(found[1 + len(counters):])] = found[:1 + len(counters)]
+
+    updates, inserts = [], []
+    for key, row in zip(wanted, rows):
+        if key in existing:
+            values = {column: row[column] for column in update_columns}
+            for column in keep_if_null:
+                if row[column] is not None:
+                    values[column] = row[column]
+            found = existing[key]
+            for i, column in enumerate(increment_columns):
+                values[column] = (found[1 + i] or 0) + row[column]
+            updates.append(dict(values, id=found[0]))
+        else:
+            inserts.append(row)
+    if updates:
+        db.session.execute(update(model), updates)
+    if inserts:
+        db.session.execute(insert(model), inserts)
+
+
+def load_by_keys(db, model, keys, values):
+    """Objets du modèle pour une liste de clés, rafraîchis après un upsert (un SELECT par tranche)"""
+    key_columns = [getattr(model, k) for k in keys]
+    found = {}
+    for start in range(0, len(values), CHUNK_ROWS):
+        chunk = values[start:start + CHUNK_ROWS]
+        query = db.select(model).where(tuple_(*key_columns).in_(chunk)).execution_options(populate_existing=True)
+        for obj in db.session.execute(query).scalars():
+            found[tuple(getattr(obj, k) for k in keys)] = obj
+    return [found[value] for value in values if value in found]
+
+
+def ids_by_keys(db, model, keys, values):
+    """Clé -> id pour une liste de clés, sans charger d'objets ORM (un SELECT par tranche)"""
+    key_columns = [getattr(model, k) for k in keys]
+    ids = {}
+    for start in range(0, len(values), CHUNK_ROWS):
+        chunk = values[start:start + CHUNK_ROWS]
+        for row in db.session.execute(db.select(model.id, *key_columns).where(tuple_(*key_columns).in_(chunk))):
+            ids[tuple(row[1:])] = row[0]
+    return ids
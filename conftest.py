@@ -0,0 +1,44 @@
+"""
+🧪 OUTILS COMMUNS DES TESTS
+==========================
+Application Flask sur une base SQLite temporaire, utilisable depuis pytest
+comme depuis les scripts de test (python test_xxx.py)
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from flask import Flask
+
+from log_writer import log_writer
+from models import db
+
+
+@contextmanager
+def application_sqlite(nom_base="test.db", peupler=None):
+    """
+    Application liée à une base SQLite neuve (tables de models.py créées)
+
+    Le dossier temporaire sert d'instance_path (base, archives...). Les
+    journaux encore en file dans log_writer sont écrits avant sa suppression.
+
+    Args:
+        nom_base: nom du fichier SQLite
+        peupler: fonction sans argument appelée après create_all (données initiales)
+
+    Yields:
+        Flask: application de test
+    """
+    with tempfile.TemporaryDirectory() as dossier:
+        app = Flask(__name__, instance_path=dossier)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(dossier, nom_base)
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            if peupler:
+                peupler()
+        try:
+            yield app
+        finally:
+            log_writer.flush()
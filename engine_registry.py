@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Registre des moteurs de prédiction pour ORACXPRED
+Chaque moteur est construit une seule fois par worker puis partagé entre les requêtes
+"""
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+def _creer_maitre():
+    from maitre_pronostics import MaitreDesPronostics
+    return MaitreDesPronostics()
+
+
+def _creer_quantique():
+    # Même ordre de préférence que app.py : version simplifiée (Render) puis version complète
+    try:
+        from systeme_prediction_simple import SystemePredictionQuantique
+    except ImportError:
+        from systeme_prediction_quantique import SystemePredictionQuantique
+    return SystemePredictionQuantique()
+
+
+def _creer_snake_win():
+    from snake_win_system import SnakeWinSystem
+    return SnakeWinSystem()
+
+
+class EngineRegistry:
+    """Registre thread-safe des moteurs sans état (un singleton par worker)
+
+    Les moteurs enregistrés ne conservent aucun état propre à un match : toutes
+    les données d'un match (équipes, cotes, contexte temps réel) sont passées
+    explicitement à chaque appel.
+    """
+
+    _INDISPONIBLE = object()
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """Enregistre (ou remplace) la fabrique d'un moteur"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            self._errors.pop(name, None)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Retourne l'instance partagée du moteur, construite au premier appel
+
+        Retourne None si le moteur est inconnu ou si sa construction a échoué.
+        """
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._construire(name)
+                    self._instances[name] = instance
+        return None if instance is self._INDISPONIBLE else instance
+
+    def _construire(self, name: str) -> Any:
+        factory = self._factories.get(name)
+        if factory is None:
+            self._errors[name] = "moteur_inconnu"
+            return self._INDISPONIBLE
+        try:
+            return factory()
+        except Exception as e:
+            print(f"❌ Erreur initialisation moteur {name}: {e}")
+            self._errors[name] = str(e)
+            return self._INDISPONIBLE
+
+    def preload(self, *names: str) -> Dict[str, bool]:
+        """Construit les moteurs à l'avance (tous par défaut), ex. au démarrage du worker"""
+        cibles = names or tuple(self._factories)
+        return {name: self.get(name) is not None for name in cibles}
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Oublie une instance (ou toutes) pour forcer sa reconstruction"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._errors.clear()
+            else:
+                self._instances.pop(name, None)
+                self._errors.pop(name, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Statut des moteurs enregistrés"""
+        return {
+            name: {
+                'initialise': name in self._instances,
+                'disponible': self._instances.get(name, self._INDISPONIBLE) is not self._INDISPONIBLE,
+                'erreur': self._errors.get(name)
+            }
+            for name in self._factories
+        }
+
+
+# Instance globale
+engine_registry = EngineRegistry()
+engine_registry.register('maitre', _creer_maitre)
+engine_registry.register('quantique', _creer_quantique)
+engine_registry.register('snake_win', _creer_snake_win)
@@ -0,0 +1,262 @@
+"""
+📡 ARCHIVAGE DU FLUX AVANT MATCH - ORACXPRED MÉTAPHORE
+======================================================
+À chaque rafraîchissement du flux 1xbet, archive les matchs à venir (cotes
+1X2 comprises) et leurs prédictions, avant le coup d'envoi, en une seule
+transaction (archive_before_bulk).
+
+Seuls les matchs nouveaux ou modifiés sont écrits : une empreinte
+(équipes, ligue, horaire, cotes) est gardée en mémoire par match présent
+dans le flux, et les prédictions ne sont relues que pour ces matchs ou si
+elles ont changé depuis le cycle précédent (updated_at). Un flux inchangé
+coûte une requête indexée, sans écriture.
+
+Au démarrage, les empreintes des matchs déjà archivés sont relues en base
+(une requête) : un redémarrage ne réécrit pas les matchs, seules les
+prédictions du flux sont réarchivées au premier cycle (upserts idempotents).
+
+- FEED_ARCHIVE_INTERVAL_SECONDS : période du cycle (0 = désactivé)
+- FEED_ARCHIVE_COUNT : nombre de matchs demandés au flux
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+
+from models import db, MatchArchive, Prediction
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+FEED_ARCHIVE_INTERVAL = float(os.getenv("FEED_ARCHIVE_INTERVAL_SECONDS", "60"))
+FEED_ARCHIVE_COUNT = int(os.getenv("FEED_ARCHIVE_COUNT", "100"))
+# Recouvrement du filtre updated_at (prédictions écrites pendant le cycle précédent)
+WATERMARK_OVERLAP = timedelta(seconds=5)
+LOCK_PATH = os.getenv("FEED_ARCHIVE_LOCK", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        "data", ".feed_archiver.lock"))
+
+ODDS_TYPES = {1: "cote_1", 2: "cote_2", 3: "cote_X"}
+FINGERPRINT_COLUMNS = ("jeu", "mode", "ligue", "equipe_1", "equipe_2", "date_heure_match", "cote_1", "cote_X", "cote_2")
+
+
+def _game(league):
+    """Jeu (FIFA / FC / eFootball) déduit du nom de la ligue"""
+    upper = league.upper()
+    if "EFOOTBALL" in upper:
+        return "eFootball"
+    if re.search(r"\bFC\b", upper):
+        return "FC"
+    return "FIFA"
+
+
+def _mode(league):
+    """Mode (3v3, 4v4, Rush...) déduit du nom de la ligue"""
+    found = re.search(r"(\d)\s*[xXvV]\s*(\d)", league)
+    if found:
+        return f"{found.group(1)}v{found.group(2)}"
+    return "Rush" if "RUSH" in league.upper() else None
+
+
+def parse_feed_match(raw, now=None):
+    """
+    Match du flux au format d'archive_match_before
+
+    Returns:
+        dict, ou None si le match a commencé ou est incomplet
+    """
+    match_id = raw.get("I")
+    kickoff = raw.get("S")
+    league, team1, team2 = raw.get("LE"), raw.get("O1"), raw.get("O2")
+    if not (match_id and kickoff and league and team1 and team2):
+        return None
+    kickoff = datetime.fromtimestamp(kickoff, timezone.utc).replace(tzinfo=None)
+    if kickoff <= (now or datetime.utcnow()) or raw.get("HS") in (1, 3):
+        return None
+
+    odds = {}
+    for o in raw.get("E", []):
+        if o.get("G") == 1 and o.get("T") in ODDS_TYPES and o.get("C") is not None:
+            odds[ODDS_TYPES[o["T"]]] = float(o["C"])
+    if not odds:
+        for ae in raw.get("AE", []):
+            if ae.get("G") == 1:
+                for o in ae.get("ME", []):
+                    if o.get("T") in ODDS_TYPES and o.get("C") is not None:
+                        odds[ODDS_TYPES[o["T"]]] = float(o["C"])
+
+    return {
+        "match_id": int(match_id),
+        "jeu": _game(league),
+        "mode": _mode(league),
+        "ligue": league,
+        "equipe_1": team1,
+        "equipe_2": team2,
+        "date_heure_match": kickoff,
+        "cote_1": odds.get("cote_1"),
+        "cote_X": odds.get("cote_X"),
+        "cote_2": odds.get("cote_2"),
+    }
+
+
+def _fingerprint(values):
+    return tuple(values.get(c) for c in FINGERPRINT_COLUMNS)
+
+
+def _prediction_archive(pred):
+    """Prédiction en cours -> paramètres d'archive_prediction_before"""
+    votes = [pred.votes_statistique, pred.votes_cotes, pred.votes_simulation, pred.votes_forme]
+    return {
+        "match_id": pred.match_id,
+        "prediction_id": pred.id,
+        "consensus_type": pred.consensus_type,
+        "choix": pred.consensus_result,
+        "probabilite": pred.consensus_probability,
+        "confiance": pred.confidence,
+        "vote_statistique": pred.votes_statistique,
+        "vote_cotes": pred.votes_cotes,
+        "vote_simulation": pred.votes_simulation,
+        "vote_forme": pred.votes_forme,
+        # Consensus : majorité des quatre systèmes
+        "consensus": sum(bool(v) for v in votes) >= 3,
+    }
+
+
+class FeedArchiver:
+    """Étape d'archivage incrémental branchée sur les instantanés du flux"""
+
+    def __init__(self, watermark_overlap=WATERMARK_OVERLAP):
+        self.watermark_overlap = watermark_overlap
+        self._lock = threading.Lock()
+        self._fingerprints = {}  # match_id -> empreinte archivée (matchs présents dans le flux)
+        self._watermark = None  # début du dernier cycle réussi
+        self._thread = None
+        self.stats = {"cycles": 0, "matches": 0, "predictions": 0, "unchanged": 0, "errors": 0,
+                      "last_cycle_ms": None}
+
+    def archive_snapshot(self, raw_matches, now=None):
+        """
+        Archive les matchs nouveaux ou modifiés d'un instantané du flux
+        (contexte d'application requis)
+
+        Args:
+            raw_matches: liste de matchs bruts (fetch_1xbet_matches)
+
+        Returns:
+            dict: {'matches', 'predictions', 'unchanged'}
+        """
+        with self._lock:
+            started = time.perf_counter()
+            cycle_start = datetime.utcnow()
+            upcoming = {}
+            for raw in raw_matches:
+                parsed = parse_feed_match(raw, now)
+                if parsed:
+                    upcoming[parsed["match_id"]] = parsed
+
+            # Matchs inconnus de ce processus : empreinte relue en base (une requête)
+            unknown = [i for i in upcoming if i not in self._fingerprints]
+            if unknown:
+                columns = [getattr(MatchArchive, c) for c in ("match_id",) + FINGERPRINT_COLUMNS]
+                for row in db.session.query(*columns).filter(MatchArchive.match_id.in_(unknown)):
+                    self._fingerprints[row[0]] = tuple(row[1:])
+
+            changed = [m for i, m in upcoming.items() if self._fingerprints.get(i) != _fingerprint(m)]
+            changed_ids = [m["match_id"] for m in changed]
+
+            query = Prediction.query.filter(Prediction.match_id.in_(list(upcoming)), Prediction.is_valid.is_(True))
+            if self._watermark is not None:
+                query = query.filter(or_(Prediction.match_id.in_(changed_ids),
+                                         Prediction.updated_at > self._watermark - self.watermark_overlap))
+            predictions = query.all() if upcoming else []
+
+            if changed or predictions:
+                from archive_manager import archive_before_bulk
+                try:
+                    archive_before_bulk(changed, [_prediction_archive(p) for p in predictions])
+                except Exception:
+                    self.stats["errors"] += 1
+                    raise
+                for match in changed:
+                    self._fingerprints[match["match_id"]] = _fingerprint(match)
+            self._watermark = cycle_start
+
+            # Matchs sortis du flux (commencés) : oubliés
+            for match_id in [i for i in self._fingerprints if i not in upcoming]:
+                del self._fingerprints[match_id]
+
+            report = {"matches": len(changed), "predictions": len(predictions),
+                      "unchanged": len(upcoming) - len(changed)}
+            self.stats["cycles"] += 1
+            self.stats["matches"] += report["matches"]
+            self.stats["predictions"] += report["predictions"]
+            self.stats["unchanged"] += report["unchanged"]
+            self.stats["last_cycle_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return report
+
+    def run_cycle(self, app, fetch=None):
+        """Un cycle : instantané du flux puis archivage"""
+        if fetch is None:
+            from api_client import fetch_1xbet_matches
+            snapshot = fetch_1xbet_matches(count=FEED_ARCHIVE_COUNT, timeout=10, verify=False)
+        else:
+            snapshot = fetch()
+        with app.app_context():
+            return self.archive_snapshot(snapshot)
+
+    def start(self, app, interval=FEED_ARCHIVE_INTERVAL, fetch=None):
+        """
+        Cycle périodique dans un thread démon
+
+        Un verrou fichier (fcntl) réserve le cycle à un seul worker par machine.
+
+        Returns:
+            threading.Thread ou None si désactivé ou déjà démarré
+        """
+        if interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return None
+
+        def loop():
+            lock = None
+            while True:
+                if lock is None:
+                    # Un autre worker détient le verrou : nouvel essai au cycle suivant
+                    lock = _acquire_lock()
+                if lock is not None:
+                    try:
+                        self.run_cycle(app, fetch)
+                    except Exception as e:
+                        print(f"❌ Erreur archivage du flux: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="feed-archiver")
+        self._thread.start()
+        return self._thread
+
+    def status(self):
+        with self._lock:
+            return {"tracked_matches": len(self._fingerprints),
+                    "watermark": self._watermark.isoformat() if self._watermark else None,
+                    **self.stats}
+
+
+def _acquire_lock():
+    if fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(LOCK_PATH), exist_ok=True)
+    handle = open(LOCK_PATH, "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+    except OSError:
+        handle.close()
+        return None
+
+
+# Instance globale
+feed_archiver = FeedArchiver()
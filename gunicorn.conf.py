@@ -0,0 +1,72 @@
+"""
+Configuration gunicorn ORACXPRED
+Les modèles ML sont chargés une fois dans le master puis partagés
+(copy-on-write) par les workers forkés.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# Requêtes simultanées par worker (dimensionne aussi le pool des bots du maître)
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Import de l'application (et donc des modèles) dans le master avant le fork
+preload_app = True
+
+
+def on_starting(server):
+    """Précharge les modèles du registre partagé dans le master"""
+    from model_registry import model_registry
+    loaded = model_registry.preload()
+    server.log.info(f"Registre ML: {loaded} modèle(s) préchargé(s) dans le master")
+
+
+def when_ready(server):
+    # Objets du master gelés : le GC des workers ne réécrit plus leurs pages partagées
+    gc.collect()
+    gc.freeze()
+
+
+def _dispose_inherited_connections(app):
+    """
+    Connexions ouvertes par le master à l'import d'app.py (create_all, index,
+    compteurs de performance, compte ADMIN) : abandonnées par le worker sans
+    les fermer, pour ne jamais partager une socket avec le master ou un autre worker
+    """
+    import models
+    import models_oauth
+    with app.app_context():
+        for database in (models.db, models_oauth.db):
+            try:
+                engines = list(database.engines.values())
+            except RuntimeError:
+                # Instance SQLAlchemy non enregistrée sur cette application
+                continue
+            database.session.remove()
+            for engine in engines:
+                engine.dispose(close=False)
+
+
+def post_fork(server, worker):
+    """Connexions héritées abandonnées, surveillance des modèles et pool d'inférence (si activé) dans chaque worker"""
+    _dispose_inherited_connections(server.app.wsgi())
+    from ml_integration import ml_integration
+    ml_integration.start_watcher()
+    ml_integration.start_inference_pool()
+    # Rétention des journaux (opt-in : LOG_RETENTION_INTERVAL_HOURS et LOG_ARCHIVE_DIR persistant),
+    # un seul worker la prend en charge (verrou fichier)
+    from log_retention import start_retention_scheduler
+    start_retention_scheduler(server.app.wsgi())
+    # Archivage avant match à chaque rafraîchissement du flux (un seul worker, verrou fichier)
+    from feed_archiver import feed_archiver
+    feed_archiver.start(server.app.wsgi())
+
+
+def worker_exit(server, worker):
+    from log_writer import log_writer
+    from ml_integration import ml_integration
+    ml_integration.stop_inference_pool()
+    log_writer.close()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+📚 HISTORIQUE BORNÉ DES PRÉDICTIONS
+==================================
+Tampon circulaire de taille fixe + statistiques en flux (O(1) par ajout)
+partagé par les moteurs de prédiction (Maître, Quantique, Snake Win)
+"""
+
+import math
+import threading
+from collections import deque
+
+CAPACITE_PAR_DEFAUT = 500
+
+
+class MesureFlux:
+    """📈 Moyenne / variance en ligne (algorithme de Welford), min et max"""
+
+    __slots__ = ('n', 'moyenne', '_m2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.n = 0
+        self.moyenne = 0.0
+        self._m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def ajouter(self, valeur):
+        valeur = float(valeur)
+        self.n += 1
+        delta = valeur - self.moyenne
+        self.moyenne += delta / self.n
+        self._m2 += delta * (valeur - self.moyenne)
+        self.minimum = valeur if self.minimum is None else min(self.minimum, valeur)
+        self.maximum = valeur if self.maximum is None else max(self.maximum, valeur)
+
+    @property
+    def variance(self):
+        return self._m2 / self.n if self.n > 1 else 0.0
+
+    def resume(self):
+        return {
+            'n': self.n,
+            'moyenne': round(self.moyenne, 4),
+            'variance': round(self.variance, 4),
+            'ecart_type': round(math.sqrt(self.variance), 4),
+            'min': self.minimum,
+            'max': self.maximum
+        }
+
+
+class HistoriquePredictions:
+    """📚 HISTORIQUE BORNÉ AVEC AGRÉGATS EN FLUX
+
+    Seules les `capacite` dernières entrées sont conservées ; les agrégats
+    (moyennes, variances, comptage par résultat) couvrent en revanche toute la
+    vie du worker. La mémoire reste donc constante quel que soit le volume.
+    """
+
+    def __init__(self, capacite=CAPACITE_PAR_DEFAUT):
+        self.capacite = max(1, int(capacite))
+        self._entrees = deque(maxlen=self.capacite)
+        self._mesures = {}
+        self._par_resultat = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def ajouter(self, entree, resultat=None, **mesures):
+        """Ajoute une entrée et met à jour les agrégats
+
+        Args:
+            entree: objet conservé dans le tampon circulaire
+            resultat: issue à comptabiliser (ex: "1", "N", "MISE RECOMMANDÉE")
+            **mesures: valeurs numériques à agréger (ex: confiance=72.5)
+        """
+        with self._lock:
+            self._entrees.append(entree)
+            self._total += 1
+            if resultat is not None:
+                self._par_resultat[resultat] = self._par_resultat.get(resultat, 0) + 1
+            for nom, valeur in mesures.items():
+                if valeur is None:
+                    continue
+                mesure = self._mesures.get(nom)
+                if mesure is None:
+                    mesure = self._mesures[nom] = MesureFlux()
+                mesure.ajouter(valeur)
+
+    def moyenne(self, nom):
+        """Moyenne courante d'une mesure (0.0 si aucune valeur)"""
+        mesure = self._mesures.get(nom)
+        return mesure.moyenne if mesure else 0.0
+
+    def recentes(self, n=5):
+        """Les n dernières entrées (de la plus ancienne à la plus récente)"""
+        with self._lock:
+            if n <= 0:
+                return []
+            return list(self._entrees)[-n:]
+
+    def statistiques(self):
+        """Instantané cohérent des agrégats"""
+        with self._lock:
+            return {
+                'total': self._total,
+                'conservees': len(self._entrees),
+                'capacite': self.capacite,
+                'mesures': {nom: mesure.resume() for nom, mesure in self._mesures.items()},
+                'par_resultat': dict(self._par_resultat)
+            }
+
+    def __len__(self):
+        return self._total
+
+    def __bool__(self):
+        return self._total > 0
@@ -0,0 +1,416 @@
+"""
+🗄️ RÉTENTION ET COMPACTION DES JOURNAUX - ORACXPRED MÉTAPHORE
+=============================================================
+Les tables de journal (system_logs, access_logs, alerts, anomaly_logs,
+audit_logs) ne gardent en base que les LOG_RETENTION_<TABLE>_DAYS derniers
+jours. Les lignes plus anciennes sont compactées, jour par jour, dans des
+fichiers d'archive colonnaires compressés puis supprimées de la table :
+
+    <LOG_ARCHIVE_DIR>/<table>/<table>_<AAAAMMJJ>_<lot>.cols.json.gz
+
+Chaque fichier est une partition journalière (ou un lot d'une journée) :
+{"table", "day", "time_column", "columns", "types", "rows", "data": {colonne: [valeurs]}}.
+L'écriture du fichier précède la suppression ; un lot interrompu est
+réécrit sous le même nom à la reprise (pas de doublon).
+
+L'historique reste interrogeable hors ligne (query_archive) ou fusionné
+avec la table chaude (query_logs), et en ligne de commande :
+
+    python log_retention.py run [--table alerts] [--dry-run] [--oauth]
+    python log_retention.py query system_logs --since 2026-01-01 --where severity=error
+
+⚠️ LOG_ARCHIVE_DIR doit se trouver sur un stockage persistant (disque
+monté, volume) : les lignes archivées sont supprimées de la base, et un
+système de fichiers éphémère (Render free, conteneurs) les perdrait au
+redémarrage. Le passage automatique est donc désactivé par défaut et ne
+démarre que si LOG_RETENTION_INTERVAL_HOURS > 0 ET LOG_ARCHIVE_DIR est
+défini explicitement.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time as _time
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from models import db, Alert, AnomalyLog, AccessLog, SystemLog
+import models_oauth
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+# Répertoire des archives : stockage persistant obligatoire (voir ci-dessus)
+ARCHIVE_DIR_CONFIGURED = bool(os.getenv("LOG_ARCHIVE_DIR"))
+ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        "data", "archives", "logs"))
+# Lignes par fichier d'archive (mémoire bornée pour les grosses journées)
+CHUNK_ROWS = int(os.getenv("LOG_ARCHIVE_CHUNK_ROWS", "20000"))
+DELETE_BATCH = 500
+# Intervalle du passage automatique dans les workers (0 = désactivé, par défaut)
+INTERVAL_HOURS = float(os.getenv("LOG_RETENTION_INTERVAL_HOURS", "0"))
+
+ARCHIVE_SUFFIX = ".cols.json.gz"
+
+
+def _days(table, default):
+    return int(os.getenv(f"LOG_RETENTION_{table.upper()}_DAYS", str(default)))
+
+
+class RetentionPolicy:
+    """Durée de conservation en base d'une table de journal (days <= 0 : conservée indéfiniment)"""
+
+    def __init__(self, model, db, time_column, days):
+        self.model = model
+        self.db = db
+        self.time_column = time_column
+        self.days = days
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+    def cutoff(self, now=None):
+        """Début du jour le plus ancien conservé en base"""
+        now = now or datetime.utcnow()
+        cutoff = datetime.combine(now.date() - timedelta(days=self.days), time.min)
+        if getattr(self.table.c[self.time_column].type, "timezone", False):
+            cutoff = cutoff.replace(tzinfo=timezone.utc)
+        return cutoff
+
+
+POLICIES = {
+    "system_logs": RetentionPolicy(SystemLog, db, "created_at", _days("system_logs", 30)),
+    "access_logs": RetentionPolicy(AccessLog, db, "created_at", _days("access_logs", 30)),
+    "alerts": RetentionPolicy(Alert, db, "created_at", _days("alerts", 90)),
+    "anomaly_logs": RetentionPolicy(AnomalyLog, db, "detected_at", _days("anomaly_logs", 180)),
+    "audit_logs": RetentionPolicy(models_oauth.AuditLog, models_oauth.db, "created_at", _days("audit_logs", 365)),
+}
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _type_name(column):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if python_type in (datetime, date, uuid.UUID):
+        return python_type.__name__
+    return None
+
+
+def _restore(value, type_name):
+    if value is None or type_name is None:
+        return value
+    if type_name == "datetime":
+        return datetime.fromisoformat(value)
+    if type_name == "date":
+        return date.fromisoformat(value)
+    return uuid.UUID(value)
+
+
+def _part_path(archive_dir, table_name, day, ids):
+    lot = hashlib.sha1(f"{ids[0]}:{ids[-1]}:{len(ids)}".encode("utf-8")).hexdigest()[:10]
+    return os.path.join(archive_dir, table_name, f"{table_name}_{day:%Y%m%d}_{lot}{ARCHIVE_SUFFIX}")
+
+
+def _write_part(path, header, columns, rows):
+    """Écrit un lot en colonnes (fichier temporaire puis renommage atomique)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = dict(header, columns=columns, rows=len(rows),
+                   data={name: [_serialize(row[i]) for row in rows] for i, name in enumerate(columns)})
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def compact_table(policy, now=None, archive_dir=None, dry_run=False):
+    """
+    Compacte les lignes d'une table antérieures à la fenêtre de rétention
+
+    Args:
+        policy: RetentionPolicy de la table
+        now: instant de référence (défaut : maintenant, UTC)
+        archive_dir: répertoire des archives (défaut : LOG_ARCHIVE_DIR)
+        dry_run: compte les lignes concernées sans rien écrire ni supprimer
+
+    Returns:
+        dict: {'cutoff', 'archived', 'parts', 'days'}
+    """
+    archive_dir = archive_dir or ARCHIVE_DIR
+    table = policy.table
+    column = table.c[policy.time_column]
+    pk = table.primary_key.columns.values()[0]
+    session = policy.db.session
+    report = {"cutoff": None, "archived": 0, "parts": 0, "days": []}
+    if policy.days <= 0:
+        return report
+
+    cutoff = policy.cutoff(now)
+    report["cutoff"] = cutoff.isoformat()
+    if dry_run:
+        report["archived"] = session.execute(select(func.count()).select_from(table).where(column < cutoff)).scalar()
+        return report
+
+    columns = [c.name for c in table.columns]
+    header = {"table": table.name, "time_column": policy.time_column,
+              "types": {c.name: _type_name(c) for c in table.columns if _type_name(c)}}
+    while True:
+        oldest = session.execute(select(func.min(column)).where(column < cutoff)).scalar()
+        if oldest is None:
+            break
+        start = datetime.combine(oldest.date(), time.min, tzinfo=cutoff.tzinfo)
+        end = min(start + timedelta(days=1), cutoff)
+        rows = session.execute(
+            select(*table.columns).where(column >= start, column < end).order_by(pk).limit(CHUNK_ROWS)
+        ).all()
+        ids = [row._mapping[pk.name] for row in rows]
+
+        _write_part(_part_path(archive_dir, table.name, start.date(), ids),
+                    dict(header, day=start.date().isoformat()), columns, [tuple(row) for row in rows])
+        for i in range(0, len(ids), DELETE_BATCH):
+            session.execute(table.delete().where(pk.in_(ids[i:i + DELETE_BATCH])))
+        session.commit()
+
+        report["archived"] += len(ids)
+        report["parts"] += 1
+        if start.date().isoformat() not in report["days"]:
+            report["days"].append(start.date().isoformat())
+    return report
+
+
+def _bound(policy):
+    """La table est-elle servie par l'application courante ?"""
+    try:
+        policy.db.engine
+        return True
+    except (RuntimeError, KeyError):
+        return False
+
+
+def run_retention(tables=None, now=None, archive_dir=None, dry_run=False):
+    """
+    Applique les politiques de rétention (contexte d'application requis)
+
+    Args:
+        tables: noms des tables à traiter (défaut : toutes)
+        now, archive_dir, dry_run: voir compact_table
+
+    Returns:
+        dict: table -> bilan de compact_table, ou {'skipped': raison}
+    """
+    report = {}
+    for name, policy in POLICIES.items():
+        if tables and name not in tables:
+            continue
+        if not _bound(policy):
+            report[name] = {"skipped": "base non initialisée pour cette application"}
+            continue
+        try:
+            report[name] = compact_table(policy, now=now, archive_dir=archive_dir, dry_run=dry_run)
+        except Exception as e:
+            policy.db.session.rollback()
+            report[name] = {"error": str(e)}
+
+    archived = sum(r.get("archived", 0) for r in report.values())
+    if archived and not dry_run:
+        from prediction_manager import log_action
+        log_action('log_retention', f"Rétention des journaux : {archived} lignes archivées",
+                   severity='info', extra_data=report)
+    return report
+
+
+def _archive_files(table_name, since=None, until=None, archive_dir=None):
+    """Fichiers d'archive d'une table, limités aux jours de [since, until]"""
+    directory = os.path.join(archive_dir or ARCHIVE_DIR, table_name)
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(ARCHIVE_SUFFIX):
+            continue
+        try:
+            day = datetime.strptime(name[len(table_name) + 1:len(table_name) + 9], "%Y%m%d").date()
+        except ValueError:
+            continue
+        if (since and day < since.date()) or (until and day > until.date()):
+            continue
+        files.append(os.path.join(directory, name))
+    return files
+
+
+def read_archive(path):
+    """Lignes (dicts, types restaurés) d'un fichier d'archive"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    types = payload.get("types", {})
+    data = {name: [_restore(v, types.get(name)) for v in values] for name, values in payload["data"].items()}
+    return [{name: data[name][i] for name in payload["columns"]} for i in range(payload["rows"])]
+
+
+def _naive(value):
+    return value.replace(tzinfo=None) if isinstance(value, datetime) and value.tzinfo else value
+
+
+def _matches(row, time_column, since, until, where):
+    moment = _naive(row.get(time_column))
+    if since and (moment is None or moment < _naive(since)):
+        return False
+    if until and (moment is None or moment >= _naive(until)):
+        return False
+    return all(str(row.get(k)) == str(v) for k, v in (where or {}).items())
+
+
+def query_archive(table_name, since=None, until=None, where=None, archive_dir=None):
+    """
+    Historique archivé d'une table
+
+    Args:
+        table_name: nom de la table (ex. 'system_logs')
+        since, until: bornes [since, until[ sur la colonne de temps (datetime)
+        where: dict colonne -> valeur (égalité)
+
+    Returns:
+        list[dict]: lignes triées chronologiquement
+    """
+    time_column = POLICIES[table_name].time_column if table_name in POLICIES else "created_at"
+    rows = []
+    for path in _archive_files(table_name, since, until, archive_dir):
+        rows.extend(r for r in read_archive(path) if _matches(r, time_column, since, until, where))
+    rows.sort(key=lambda r: (_naive(r.get(time_column)) or datetime.min, str(r.get("id"))))
+    return rows
+
+
+def query_logs(table_name, since=None, until=None, where=None, archive_dir=None):
+    """
+    Historique complet d'une table : archives puis lignes encore en base
+
+    Même interface que query_archive (contexte d'application requis).
+    """
+    policy = POLICIES[table_name]
+    table = policy.table
+    column = table.c[policy.time_column]
+    statement = select(*table.columns)
+    if since:
+        statement = statement.where(column >= since)
+    if until:
+        statement = statement.where(column < until)
+    for key, value in (where or {}).items():
+        statement = statement.where(table.c[key] == value)
+    hot = [dict(row._mapping) for row in policy.db.session.execute(statement.order_by(column, table.primary_key.columns.values()[0]))]
+    return query_archive(table_name, since, until, where, archive_dir) + hot
+
+
+def start_retention_scheduler(app, interval_hours=INTERVAL_HOURS, archive_dir=None):
+    """
+    Passage périodique de la rétention dans un thread démon
+
+    Un verrou fichier (fcntl) réserve le travail à un seul worker par machine.
+    Refusé sans répertoire d'archives explicite (LOG_ARCHIVE_DIR ou
+    `archive_dir`) : le défaut dans l'arborescence de l'application peut
+    être éphémère.
+
+    Returns:
+        threading.Thread ou None si désactivé
+    """
+    if interval_hours <= 0:
+        return None
+    if archive_dir is None and not ARCHIVE_DIR_CONFIGURED:
+        print("⚠️ Rétention des journaux non démarrée : LOG_ARCHIVE_DIR doit désigner un stockage persistant")
+        return None
+    archive_dir = archive_dir or ARCHIVE_DIR
+
+    def loop():
+        lock = None
+        while True:
+            _time.sleep(min(300, interval_hours * 3600))
+            if lock is None:
+                # Un autre worker détient le verrou : nouvel essai dans 5 minutes
+                lock = _acquire_lock(archive_dir)
+            if lock is not None:
+                try:
+                    with app.app_context():
+                        run_retention(archive_dir=archive_dir)
+                except Exception as e:
+                    print(f"❌ Erreur rétention des journaux: {e}")
+                _time.sleep(max(0, interval_hours * 3600 - 300))
+
+    thread = threading.Thread(target=loop, daemon=True, name="log-retention")
+    thread.start()
+    return thread
+
+
+def _acquire_lock(archive_dir):
+    if fcntl is None:
+        return True
+    os.makedirs(archive_dir, exist_ok=True)
+    handle = open(os.path.join(archive_dir, ".retention.lock"), "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+    except OSError:
+        handle.close()
+        return None
+
+
+def _parse_moment(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rétention et archives des journaux ORACXPRED')
+    sub = parser.add_subparsers(dest='action', required=True)
+
+    run = sub.add_parser('run', help='Compacte les lignes hors fenêtre de rétention')
+    run.add_argument('--table', action='append', choices=list(POLICIES), help='Table à traiter (répétable)')
+    run.add_argument('--dry-run', action='store_true', help='Compte sans archiver')
+    run.add_argument('--oauth', action='store_true', help='Traite aussi audit_logs (application OAuth)')
+
+    query = sub.add_parser('query', help='Interroge les archives (hors ligne)')
+    query.add_argument('table', choices=list(POLICIES))
+    query.add_argument('--since', help='Date ISO de début (incluse)')
+    query.add_argument('--until', help='Date ISO de fin (exclue)')
+    query.add_argument('--where', action='append', default=[], help='Filtre colonne=valeur (répétable)')
+
+    args = parser.parse_args()
+    if args.action == 'query':
+        where = dict(item.split('=', 1) for item in args.where)
+        for row in query_archive(args.table, _parse_moment(args.since), _parse_moment(args.until), where):
+            print(json.dumps({k: _serialize(v) for k, v in row.items()}, ensure_ascii=False))
+        return
+
+    from app import app
+    with app.app_context():
+        report = run_retention(args.table, dry_run=args.dry_run)
+    if args.oauth:
+        from app_oauth import create_app
+        with create_app().app_context():
+            report.update(run_retention(["audit_logs"], dry_run=args.dry_run))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+📝 JOURNALISATION DIFFÉRÉE (WRITE-BEHIND)
+========================================
+Les lignes de journal (SystemLog, AccessLog, AuditLog) sont placées dans une
+file bornée en mémoire et insérées en lots par un thread d'écriture, sur
+seuil de taille ou de temps. La requête ne paie plus l'aller-retour base.
+
+- File pleine : une entrée plus grave remplace la plus ancienne entrée
+  moins grave ; sinon l'appelant attend brièvement (backpressure) puis
+  l'entrée est abandonnée et comptée
+- Arrêt du processus : la file est vidée (atexit, worker_exit gunicorn)
+- LOG_WRITE_BEHIND=0 : écriture synchrone comme auparavant
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from flask import current_app, has_app_context
+
+WRITE_BEHIND = os.getenv("LOG_WRITE_BEHIND", "1").lower() not in ("0", "false", "no", "")
+QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+FLUSH_INTERVAL_MS = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "500"))
+# Attente maximale d'un appelant quand la file est pleine
+BLOCK_MS = float(os.getenv("LOG_QUEUE_BLOCK_MS", "50"))
+
+# Ordre d'abandon : les entrées les moins graves partent en premier
+SEVERITY_RANK = {"debug": 0, "info": 1, "warning": 2, "audit": 3, "error": 3, "critical": 4}
+
+
+class LogWriter:
+    """File bornée de lignes de journal, insérées en lots par un thread dédié"""
+
+    def __init__(self, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval_ms=FLUSH_INTERVAL_MS, block_ms=BLOCK_MS, enabled=WRITE_BEHIND):
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.block = block_ms / 1000.0
+        self.enabled = enabled
+        self._reset()
+
+    def _reset(self):
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = os.getpid()
+        self._stopping = False
+        self._writing = 0
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "evicted": 0,
+                      "dropped": {}, "errors": 0, "sync": 0}
+
+    def enqueue(self, model, values, severity="info", db=None):
+        """
+        Ajoute une ligne de journal
+
+        Args:
+            model: classe de modèle SQLAlchemy (SystemLog, AccessLog, AuditLog...)
+            values: dict colonne -> valeur, évalué dans la requête (IP, horodatage)
+            severity: gravité (debug, info, warning, audit, error, critical)
+            db: instance SQLAlchemy propriétaire du modèle
+
+        Returns:
+            bool: False si l'entrée a été abandonnée (file pleine)
+        """
+        if not self.enabled or not has_app_context():
+            return self._write_now(model, values, db)
+        if self._pid != os.getpid():
+            # Processus forké : file et verrou du parent ne sont pas réutilisables
+            self._reset()
+        self._ensure_thread()
+
+        rank = SEVERITY_RANK.get(severity, 1)
+        entry = (current_app._get_current_object(), db, model, values, rank)
+        with self._cond:
+            if len(self._queue) >= self.queue_size and not self._evict_below(rank):
+                deadline = time.monotonic() + self.block
+                while len(self._queue) >= self.queue_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if len(self._queue) >= self.queue_size and not self._evict_below(rank):
+                    dropped = self.stats["dropped"]
+                    dropped[severity] = dropped.get(severity, 0) + 1
+                    return False
+            self._queue.append(entry)
+            self.stats["queued"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def _evict_below(self, rank):
+        """Retire la plus ancienne entrée moins grave que `rank` (appelé sous verrou)"""
+        for i, queued in enumerate(self._queue):
+            if queued[4] < rank:
+                del self._queue[i]
+                self.stats["evicted"] += 1
+                return True
+        return False
+
+    def _write_now(self, model, values, db):
+        """Écriture synchrone (mode désactivé ou hors contexte applicatif)"""
+        db = db or _db_for(model)
+        try:
+            db.session.add(model(**values))
+            db.session.commit()
+            self.stats["sync"] += 1
+            return True
+        except Exception as e:
+            print(f"❌ Erreur lors de la journalisation: {e}")
+            db.session.rollback()
+            return False
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self):
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        if batch:
+            self._writing += 1
+        self._cond.notify_all()
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_batch()
+                if not batch and self._stopping:
+                    return
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        """Insère un lot : un INSERT multi-lignes et un commit par table"""
+        try:
+            groups = {}
+            for app, db, model, values, _ in batch:
+                groups.setdefault((app, db or _db_for(model), model), []).append(values)
+            for (app, db, model), rows in groups.items():
+                with app.app_context():
+                    try:
+                        db.session.execute(model.__table__.insert(), rows)
+                        db.session.commit()
+                        self.stats["written"] += len(rows)
+                        self.stats["batches"] += 1
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"❌ Erreur d'écriture du journal ({model.__tablename__}, {len(rows)} lignes): {e}")
+                        self._write_rows_one_by_one(db, model, rows)
+        finally:
+            with self._cond:
+                self._writing -= 1
+                self._cond.notify_all()
+
+    def _write_rows_one_by_one(self, db, model, rows):
+        """Repli après l'échec d'un lot : seule la ligne fautive est perdue"""
+        for row in rows:
+            try:
+                db.session.execute(model.__table__.insert(), [row])
+                db.session.commit()
+                self.stats["written"] += 1
+            except Exception:
+                db.session.rollback()
+                self.stats["errors"] += 1
+
+    def flush(self, timeout=5.0):
+        """Écrit tout ce qui est en file (dans le thread appelant) et attend les lots en cours"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if batch:
+                self._write(batch)
+                continue
+            with self._cond:
+                while self._writing and time.monotonic() < deadline:
+                    self._cond.wait(deadline - time.monotonic())
+                if not self._queue or time.monotonic() >= deadline:
+                    return not self._queue
+
+    def close(self, timeout=5.0):
+        """Arrête le thread d'écriture après avoir vidé la file"""
+        if self._pid != os.getpid():
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush(timeout)
+
+    def status(self):
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "pending": len(self._queue),
+                "queue_size": self.queue_size,
+                "batch_size": self.batch_size,
+                **self.stats,
+                "dropped": dict(self.stats["dropped"]),
+            }
+
+
+def _db_for(model):
+    """Instance SQLAlchemy d'un modèle (models.db ou models_oauth.db)"""
+    return getattr(sys.modules[model.__module__], "db")
+
+
+# Instance globale
+log_writer = LogWriter()
+atexit.register(log_writer.close)
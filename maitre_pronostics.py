@@ -6,16 +6,223 @@ Bot central qui reçoit toutes les décisions des bots spécialisés
 et prend la décision finale pour les paris alternatifs
 """
 
+import os
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as DelaiDepasse, as_completed
 from datetime import datetime
 
+from historique_predictions import HistoriquePredictions
+
+# Délai maximal accordé aux bots avant la décision finale (ms)
+DELAI_DECISION_MS = int(os.getenv("MAITRE_DELAI_MS", "2000"))
+# Pool dimensionné sur les requêtes simultanées d'un worker gunicorn (même variable que gunicorn.conf.py)
+THREADS_REQUETES = int(os.getenv("GUNICORN_THREADS", "1"))
+BOTS_PAR_REQUETE = int(os.getenv("MAITRE_BOTS_PAR_REQUETE", "5"))
+BOTS_WORKERS = int(os.getenv("MAITRE_BOTS_WORKERS", str(BOTS_PAR_REQUETE * THREADS_REQUETES)))
+
+COTE_MIN = 1.399
+COTE_MAX = 3.0
+
+_executeur_bots = None
+_executeur_lock = threading.Lock()
+
+
+class PoolBots:
+    """Pool de threads des bots, sans file d'attente
+
+    Un bot ne reçoit un thread que s'il en reste un de libre : il démarre
+    aussitôt au lieu d'attendre derrière des bots lents (un bot ignoré à
+    l'échéance continue de tourner et garde sa place jusqu'à la fin).
+    Sinon l'appelant l'exécute lui-même sur son thread.
+    """
+
+    def __init__(self, taille):
+        self.taille = taille
+        self.executeur = ThreadPoolExecutor(max_workers=taille, thread_name_prefix="bot-maitre")
+        self._places = threading.BoundedSemaphore(taille)
+        self._lock = threading.Lock()
+        self.stats = {'occupes': 0, 'saturations': 0, 'bots_en_ligne': 0}
+
+    def soumettre(self, fournisseur):
+        """Future du bot, ou None si aucun thread n'est libre"""
+        if not self._places.acquire(blocking=False):
+            return None
+        with self._lock:
+            self.stats['occupes'] += 1
+        future = self.executeur.submit(fournisseur)
+        future.add_done_callback(self._liberer)
+        return future
+
+    def _liberer(self, future):
+        with self._lock:
+            self.stats['occupes'] -= 1
+        self._places.release()
+
+    def signaler_saturation(self, en_ligne):
+        with self._lock:
+            self.stats['saturations'] += 1
+            self.stats['bots_en_ligne'] += len(en_ligne)
+        print(f"⚠️ MAÎTRE - Pool des bots saturé ({self.taille} threads occupés), "
+              f"bots exécutés sur le thread de la requête: {', '.join(en_ligne)}")
+
+    def etat(self):
+        with self._lock:
+            return {'threads': self.taille, **self.stats}
+
+
+def _obtenir_executeur():
+    """Pool de threads partagé par le processus pour exécuter les bots"""
+    global _executeur_bots
+    if _executeur_bots is None:
+        with _executeur_lock:
+            if _executeur_bots is None:
+                _executeur_bots = PoolBots(BOTS_WORKERS)
+    return _executeur_bots
+
+
+def etat_pool_bots():
+    """Occupation du pool des bots (threads occupés, saturations, bots exécutés hors pool)"""
+    return _obtenir_executeur().etat()
+
+
+class ConsensusIncremental:
+    """⏱️ CONSENSUS ANYTIME ALIMENTÉ BOT PAR BOT
+
+    Chaque résultat de bot met à jour les votes en O(nombre de paris du bot) ;
+    la meilleure décision courante est disponible à tout moment et la décision
+    finale est identique à celle de analyser_decisions_bots sur les mêmes bots.
+    """
+
+    def __init__(self, maitre, bots_attendus=None):
+        self.maitre = maitre
+        self.bots_attendus = list(bots_attendus or [])
+        self.bots_recus = []
+        self.decisions_valides = []
+        self._types = {}
+        self._paris = {}
+        self._somme_confiance_bots = 0.0
+        self._meilleur = None
+        self._lock = threading.Lock()
+
+    def ajouter_decision_bot(self, bot_name, decision):
+        """Intègre le résultat d'un bot dès qu'il arrive"""
+        with self._lock:
+            self.bots_recus.append(bot_name)
+            if not isinstance(decision, dict) or 'paris_recommandes' not in decision:
+                return False
+
+            paris_valides = []
+            for pari in decision['paris_recommandes']:
+                try:
+                    cote = float(pari.get('cote', 0))
+                except (TypeError, ValueError, AttributeError):
+                    continue
+                if COTE_MIN <= cote <= COTE_MAX and 'nom' in pari:
+                    paris_valides.append(pari)
+            if not paris_valides:
+                return False
+
+            self.decisions_valides.append({
+                'bot': bot_name,
+                'paris': paris_valides,
+                'confiance_bot': decision.get('confiance_globale', 50)
+            })
+            self._somme_confiance_bots += decision.get('confiance_globale', 50)
+
+            for pari in paris_valides:
+                nom_pari = pari['nom']
+                confiance = pari.get('confiance', 50)
+                type_pari = self.maitre._detecter_type_pari(nom_pari)
+                self._types[type_pari] = self._types.get(type_pari, 0) + 1
+
+                votes = self._paris.get(nom_pari)
+                if votes is None:
+                    votes = {
+                        'nom': nom_pari,
+                        'ordre': len(self._paris),
+                        'nb': 0,
+                        'somme_confiance': 0.0,
+                        'meilleur_pari': pari,
+                        'meilleure_confiance': confiance,
+                        'bots': []
+                    }
+                    self._paris[nom_pari] = votes
+                elif confiance > votes['meilleure_confiance']:
+                    votes['meilleur_pari'] = pari
+                    votes['meilleure_confiance'] = confiance
+                votes['nb'] += 1
+                votes['somme_confiance'] += confiance
+                votes['bots'].append(bot_name)
+
+                # Même départage qu'un tri stable décroissant : à égalité, le premier vu gagne
+                meilleur = self._meilleur
+                if meilleur is None or votes['nb'] > meilleur['nb'] or (
+                        votes['nb'] == meilleur['nb'] and votes['ordre'] < meilleur['ordre']):
+                    self._meilleur = votes
+            return True
+
+    @property
+    def bots_manquants(self):
+        recus = set(self.bots_recus)
+        return [b for b in self.bots_attendus if b not in recus]
+
+    def confiance_globale(self):
+        """Même pondération que _calculer_confiance_globale (0.6 consensus + 0.4 moyenne)"""
+        nb_bots = len(self.decisions_valides)
+        if not nb_bots:
+            return 0
+        confiance_consensus = 0
+        if self._meilleur:
+            confiance_consensus = min((self._meilleur['nb'] / nb_bots) * 100, 90)
+        confiance_moyenne = self._somme_confiance_bots / nb_bots
+        return (confiance_consensus * 0.6) + (confiance_moyenne * 0.4)
+
+    def decision_courante(self, team1, team2):
+        """Meilleure décision disponible à cet instant (sans sauvegarde)"""
+        with self._lock:
+            if not self.decisions_valides or not self._meilleur:
+                rapport = self.maitre._generer_decision_aucune()
+            else:
+                votes = self._meilleur
+                nom_pari = votes['nom']
+                decision = {
+                    'nom': nom_pari,
+                    'cote': votes['meilleur_pari']['cote'],
+                    'type': self.maitre._detecter_type_pari(nom_pari),
+                    'confiance': votes['somme_confiance'] / votes['nb'],
+                    'nb_bots_accord': votes['nb'],
+                    'bots_supporters': list(votes['bots']),
+                    'details': votes['meilleur_pari']
+                }
+                consensus = {'types_populaires': list(self._types.items())}
+                rapport = self.maitre._generer_rapport_final(
+                    decision, list(self.decisions_valides), consensus, self.confiance_globale(), team1, team2
+                )
+            rapport['meta']['bots_recus'] = len(self.bots_recus)
+            rapport['meta']['bots_manquants'] = self.bots_manquants
+            return rapport
+
+    def finaliser(self, team1, team2, league):
+        """Décision finale : prise avec les bots arrivés, sauvegardée pour apprentissage"""
+        rapport = self.decision_courante(team1, team2)
+        rapport['meta']['mode'] = 'ANYTIME'
+        # Comme analyser_decisions_bots : pas de sauvegarde sans décision (aucun bot valide à temps)
+        if rapport['meta']['type'] != 'AUCUNE_DECISION':
+            self.maitre._sauvegarder_decision(rapport, team1, team2, league)
+        return rapport
+
 class MaitreDesPronostics:
     """🎯 MAÎTRE CENTRAL DES PRONOSTICS ALTERNATIFS"""
     
     def __init__(self):
         self.version = "MAITRE-PRONOSTICS-2024"
-        self.decisions_historiques = []
-        self.precision_moyenne = 0.0
+        self.decisions_historiques = HistoriquePredictions()
+    
+    @property
+    def precision_moyenne(self):
+        return self.decisions_historiques.moyenne('confiance')
         
     def analyser_decisions_bots(self, decisions_bots, team1, team2, league, contexte_temps_reel=None):
         """🎯 ANALYSE TOUTES LES DÉCISIONS DES BOTS ET PREND LA DÉCISION FINALE"""
@@ -45,6 +252,64 @@ class MaitreDesPronostics:
         
         return rapport
     
+    def demarrer_consensus(self, bots_attendus=None):
+        """⏱️ OUVRE UN CONSENSUS INCRÉMENTAL (résultats des bots fournis au fil de l'eau)"""
+        return ConsensusIncremental(self, bots_attendus)
+    
+    def analyser_decisions_bots_avec_delai(self, fournisseurs, team1, team2, league, delai_ms=None):
+        """⏱️ EXÉCUTE LES BOTS EN PARALLÈLE ET DÉCIDE À L'ÉCHÉANCE
+
+        fournisseurs: {nom_bot: callable sans argument}. Les bots qui n'ont pas
+        répondu avant le délai sont ignorés. Ceux qui ne trouvent pas de thread
+        libre (pool saturé) s'exécutent sur le thread de la requête, jamais
+        abandonnés, et sont listés dans meta['bots_en_ligne'].
+        Retourne (rapport, resultats_bots).
+        """
+        delai = (DELAI_DECISION_MS if delai_ms is None else delai_ms) / 1000.0
+        consensus = self.demarrer_consensus(fournisseurs.keys())
+        resultats = {}
+        debut = time.monotonic()
+
+        pool = _obtenir_executeur()
+        futures = {}
+        en_ligne = []
+        for nom, fournisseur in fournisseurs.items():
+            future = pool.soumettre(fournisseur)
+            if future is None:
+                en_ligne.append(nom)
+            else:
+                futures[future] = nom
+        if en_ligne:
+            pool.signaler_saturation(en_ligne)
+            # Pendant que les bots du pool tournent, les autres passent sur le thread de la requête
+            for nom in en_ligne:
+                try:
+                    resultats[nom] = fournisseurs[nom]()
+                except Exception as e:
+                    print(f"  ⚠️ {nom} en erreur: {e}")
+                    resultats[nom] = None
+                consensus.ajouter_decision_bot(nom, resultats[nom])
+        try:
+            restant = max(0.0, delai - (time.monotonic() - debut))
+            for future in as_completed(futures, timeout=restant):
+                nom = futures[future]
+                try:
+                    resultats[nom] = future.result()
+                except Exception as e:
+                    print(f"  ⚠️ {nom} en erreur: {e}")
+                    resultats[nom] = None
+                consensus.ajouter_decision_bot(nom, resultats[nom])
+        except DelaiDepasse:
+            for future in futures:
+                future.cancel()
+            print(f"⏱️ MAÎTRE - Délai atteint, bots ignorés: {', '.join(consensus.bots_manquants)}")
+
+        rapport = consensus.finaliser(team1, team2, league)
+        rapport['meta']['bots_en_ligne'] = en_ligne
+        rapport['meta']['duree_ms'] = round((time.monotonic() - debut) * 1000, 1)
+        print(f"🎯 MAÎTRE ANYTIME - {len(consensus.decisions_valides)}/{len(fournisseurs)} bots valides en {rapport['meta']['duree_ms']} ms")
+        return rapport, resultats
+    
     def _filtrer_cotes_valides(self, decisions_bots):
         """💰 FILTRE LES DÉCISIONS AVEC COTES ENTRE 1.399 ET 3.0"""
         
@@ -283,19 +548,24 @@ class MaitreDesPronostics:
             'confiance': rapport['decision_finale']['confiance_numerique']
         }
         
-        self.decisions_historiques.append(decision_data)
-        
-        # Calcul de la précision moyenne
-        if len(self.decisions_historiques) > 0:
-            precision_totale = sum(d['confiance'] for d in self.decisions_historiques)
-            self.precision_moyenne = precision_totale / len(self.decisions_historiques)
+        # Historique borné, précision moyenne mise à jour en O(1)
+        self.decisions_historiques.ajouter(
+            decision_data,
+            resultat=rapport['decision_finale'].get('action'),
+            confiance=decision_data['confiance']
+        )
     
     def obtenir_statistiques_maitre(self):
         """📈 STATISTIQUES DU MAÎTRE DES PRONOSTICS"""
         
+        stats = self.decisions_historiques.statistiques()
         return {
-            'decisions_totales': len(self.decisions_historiques),
+            'decisions_totales': stats['total'],
             'precision_moyenne': round(self.precision_moyenne, 2),
+            'confiance': stats['mesures'].get('confiance', {}),
+            'decisions_par_action': stats['par_resultat'],
+            'historique_conserve': stats['conservees'],
+            'pool_bots': etat_pool_bots(),
             'version': self.version,
             'specialite': 'PARIS ALTERNATIFS UNIQUEMENT',
             'cotes_acceptees': '1.399 - 3.0'
@@ -0,0 +1,4 @@
+-- Migration 002 pour ORACXPRED MÉTAPHORE : index de pagination par curseur (tri created_at, id décroissant)
+-- Historique des prédictions par utilisateur et quota du jour
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON users(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_predictions_user_created_id ON predictions(user_id, created_at, id);
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+📦 MICRO-BATCHING DES PRÉDICTIONS ML
+===================================
+Les requêtes concurrentes (threads gunicorn) pour un même modèle sont
+regroupées pendant une courte fenêtre (quelques ms) ou jusqu'à N lignes,
+prédites en un seul appel, puis chaque appelant récupère son résultat.
+
+Pas de thread dédié : le premier appelant d'un lot en est le meneur ; il
+attend la fenêtre (au plus), exécute le lot et réveille les autres. Il
+n'attend pas hors charge (aucun lot récent) ni quand tous les appelants en
+cours sont déjà dans son lot : la latence d'une requête isolée est inchangée.
+"""
+
+import os
+import threading
+import time
+
+# Fenêtre de regroupement (0 = désactivé) et taille maximale d'un lot
+WINDOW_MS = float(os.getenv("ML_MICROBATCH_WINDOW_MS", "2"))
+MAX_ROWS = int(os.getenv("ML_MICROBATCH_MAX_ROWS", "64"))
+# Sans lot depuis ce délai, le trafic est considéré comme isolé : pas d'attente
+IDLE_SECONDS = float(os.getenv("ML_MICROBATCH_IDLE_SECONDS", "0.05"))
+
+
+class _Pending:
+    """Une requête en attente dans un lot"""
+
+    __slots__ = ("item", "event", "result", "error", "lead")
+
+    def __init__(self, item):
+        self.item = item
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.lead = False
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels `submit(key, item)` de même clé en lots
+
+    Args:
+        runner: fonction (key, items) -> liste de résultats, un par item
+        window_ms: durée maximale d'attente du meneur
+        max_rows: taille maximale d'un lot
+    """
+
+    def __init__(self, runner, window_ms=WINDOW_MS, max_rows=MAX_ROWS, idle_seconds=IDLE_SECONDS):
+        self.runner = runner
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_rows = max(1, int(max_rows))
+        self.idle_seconds = idle_seconds
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._inflight = {}
+        self._last_batch_at = 0.0
+        self.stats = {"batches": 0, "rows": 0, "max_rows_seen": 0, "waited_batches": 0}
+
+    @property
+    def enabled(self):
+        return self.window > 0 and self.max_rows > 1
+
+    def submit(self, key, item):
+        """Résultat de `item`, calculé dans un lot avec les requêtes concurrentes"""
+        if not self.enabled:
+            return self.runner(key, [item])[0]
+
+        pending = _Pending(item)
+        with self._cond:
+            queue = self._queues.setdefault(key, [])
+            queue.append(pending)
+            pending.lead = len(queue) == 1
+            self._inflight[key] = self._inflight.get(key, 0) + 1
+            self._cond.notify_all()
+
+        try:
+            if not pending.lead:
+                pending.event.wait()
+            # Meneur initial, ou promu meneur du reliquat d'un lot plein
+            if pending.lead:
+                self._lead(key)
+        finally:
+            with self._cond:
+                self._inflight[key] -= 1
+                if not self._inflight[key]:
+                    del self._inflight[key]
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _lead(self, key):
+        with self._cond:
+            waited = time.monotonic() - self._last_batch_at < self.idle_seconds
+            if waited:
+                deadline = time.monotonic() + self.window
+                # Inutile d'attendre quand tous les appelants en cours sont déjà dans le lot
+                while len(self._queues.get(key, ())) < min(self.max_rows, self._inflight.get(key, 0)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            queue = self._queues.pop(key, [])
+            batch, rest = queue[:self.max_rows], queue[self.max_rows:]
+            if rest:
+                self._queues[key] = rest
+                rest[0].lead = True
+                rest[0].event.set()
+            self._last_batch_at = time.monotonic()
+            self.stats["batches"] += 1
+            self.stats["rows"] += len(batch)
+            self.stats["max_rows_seen"] = max(self.stats["max_rows_seen"], len(batch))
+            self.stats["waited_batches"] += int(waited)
+
+        try:
+            results = self.runner(key, [p.item for p in batch])
+            for p, result in zip(batch, results):
+                p.result = result
+        except Exception as e:
+            for p in batch:
+                p.error = e
+        finally:
+            for p in batch:
+                p.lead = False
+                p.event.set()
+
+    def status(self):
+        with self._cond:
+            batches = self.stats["batches"]
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000,
+                "max_rows": self.max_rows,
+                **self.stats,
+                "avg_rows": round(self.stats["rows"] / batches, 2) if batches else 0.0,
+            }
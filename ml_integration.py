@@ -4,20 +4,218 @@
 Intègre les modèles de prédiction FIFA dans le système de paris
 """
 
-import joblib
-import pandas as pd
 import numpy as np
+from collections import OrderedDict
 from datetime import datetime
+import hashlib
+import itertools
 import json
 import os
+import threading
+import warnings
+
+from ml_batcher import MicroBatcher
+from model_registry import model_registry
+
+# pandas n'est importé qu'au premier besoin (pipelines avec prétraitement catégoriel)
+pd = None
+
+# Les modèles entraînés sur DataFrame acceptent les tableaux NumPy dans le même ordre de colonnes
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+# Ordre canonique des features Over/Under - Handicap (voir _prepare_over_under_features)
+OVER_UNDER_FEATURES = ["match_time_seconds", "score1", "score2", "total_current", "odd", "line"]
+
+# Cache des prédictions Over/Under - Handicap (0 = désactivé)
+PREDICTION_CACHE_SIZE = int(os.getenv("ML_PREDICTION_CACHE_SIZE", "4096"))
+# Pas de quantification par feature, ex: "match_time_seconds=30,odd=0.01,line=0" (0 = valeur exacte)
+DEFAULT_QUANTIZATION = {"match_time_seconds": 30, "odd": 0.01, "line": 0}
+
+# Modèles exportés en tableaux plats (model_export.py) utilisés à la place du joblib ; "0" pour désactiver
+USE_FLAT_MODELS = os.getenv("ML_FLAT_MODELS", "1") != "0"
+
+# Grille de probabilités précompilée (model_grid.py) ; "0" pour la désactiver
+PROBABILITY_GRID = os.getenv("ML_PROBABILITY_GRID", "model_over_under_grid.npy")
+
+DEFAULT_LINES = [0.5, 1.5, 2.5, 3.5]
+DEFAULT_HANDICAPS = [-1.5, -1.0, 0, +1.0, +1.5]
+
+def _get_pandas():
+    """Import paresseux de pandas"""
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+
+def _requires_dataframe(model):
+    """Vrai si le modèle sélectionne ses colonnes par nom (ColumnTransformer)"""
+    steps = [model]
+    if hasattr(model, "steps"):
+        steps += [step for _, step in model.steps]
+    return any(type(step).__name__ == "ColumnTransformer" for step in steps)
+
+
+def _parse_quantization(spec):
+    """Lit une spécification 'feature=pas,...' (variable ML_PREDICTION_CACHE_QUANTIZATION)"""
+    steps = dict(DEFAULT_QUANTIZATION)
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            steps[name.strip()] = max(0.0, float(value))
+        except ValueError:
+            continue
+    return steps
+
+
+class PredictionCache:
+    """
+    Cache LRU borné des probabilités Over/Under - Handicap
+    
+    La clé est le tuple de features nettoyées et quantifiées ; le modèle est
+    évalué sur ces valeurs quantifiées, de sorte qu'une entrée ne dépend pas
+    de la requête qui l'a remplie.
+    """
+    
+    def __init__(self, maxsize=PREDICTION_CACHE_SIZE, quantization=None):
+        self.maxsize = max(0, int(maxsize))
+        self.quantization = dict(DEFAULT_QUANTIZATION)
+        self.quantization.update(quantization or {})
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def _quantize(self, name, value):
+        step = self.quantization.get(name, 0)
+        value = float(value)
+        if not step:
+            return value
+        return round(round(value / step) * step, 6)
+
+    def make_key(self, sanitized, value):
+        """(temps, score1, score2, cote, ligne) quantifiés"""
+        return (
+            self._quantize("match_time_seconds", sanitized.get("match_time_seconds", 0)),
+            int(sanitized.get("score1", 0)),
+            int(sanitized.get("score2", 0)),
+            self._quantize("odd", sanitized.get("odd", 2.0)),
+            self._quantize("line", value)
+        )
+
+    def get_many(self, keys):
+        """Probabilités en cache (None si absentes), mises à jour LRU"""
+        found = []
+        with self._lock:
+            for key in keys:
+                row = self._entries.get(key)
+                if row is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                found.append(row)
+        return found
+
+    def put_many(self, keys, rows):
+        with self._lock:
+            for key, row in zip(keys, rows):
+                self._entries[key] = row
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "quantization": dict(self.quantization)
+            }
+
+
+class ModelVersion:
+    """
+    Jeu de modèles chargés ensemble (Over/Under - Handicap, baseline, grille)
+    
+    Immuable une fois activé : chaque prédiction lit la version active une
+    seule fois, un rechargement remplace la référence d'un bloc.
+    """
+    
+    _counter = itertools.count(1)
+    
+    def __init__(self, model_over_under=None, model_baseline=None, digests=None, probability_grid=None):
+        self.number = next(ModelVersion._counter)
+        self.model_over_under = model_over_under
+        self.model_baseline = model_baseline
+        self.digests = dict(digests or {})
+        # Identité de la version entre processus (pool d'inférence) : empreintes des fichiers
+        self.signature = hashlib.sha256(
+            "|".join(f"{name}:{digest}" for name, digest in sorted(self.digests.items())).encode("utf-8")
+        ).hexdigest()
+        self.probability_grid = probability_grid
+        self.loaded_at = datetime.now().isoformat()
+        self.validation = None
+        self.over_under_order = None
+        self.over_under_needs_frame = False
+        if model_over_under:
+            columns = list(model_over_under.get("columns") or OVER_UNDER_FEATURES)
+            if sorted(columns) == sorted(OVER_UNDER_FEATURES):
+                self.over_under_order = np.array([OVER_UNDER_FEATURES.index(c) for c in columns])
+            else:
+                self.over_under_order = np.arange(len(columns))
+            self.over_under_needs_frame = _requires_dataframe(model_over_under["model"])
+    
+    @property
+    def models_loaded(self):
+        return bool(self.model_over_under or self.model_baseline)
+    
+    def describe(self):
+        return {
+            "number": self.number,
+            "signature": self.signature[:12],
+            "loaded_at": self.loaded_at,
+            "digests": {name: digest[:12] for name, digest in self.digests.items()},
+            "probability_grid": self.probability_grid is not None,
+            "validation": self.validation
+        }
+
 
 class MLIntegration:
     """Classe principale pour l'intégration des modèles ML"""
     
-    def __init__(self):
-        self.model_over_under = None
-        self.model_baseline = None
-        self.models_loaded = False
+    def __init__(self, cache_size=PREDICTION_CACHE_SIZE, cache_quantization=None):
+        self.prediction_cache = PredictionCache(
+            cache_size,
+            cache_quantization or _parse_quantization(os.getenv("ML_PREDICTION_CACHE_QUANTIZATION"))
+        )
+        self.batcher = MicroBatcher(self._run_micro_batch)
+        self.inference_pool = None
+        self._active = ModelVersion()
+        self._previous = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self.last_reload = None
+        self.grid_metrics = {"rows": 0, "fallback_rows": 0}
         self.model_dir = os.path.dirname(os.path.abspath(__file__))
         self.metrics = {
             "predictions_total": 0,
@@ -27,18 +225,78 @@ class MLIntegration:
         }
         self.load_models()
     
+    def start_inference_pool(self, processes=None):
+        """Démarre le pool de processus d'inférence (ML_INFERENCE_PROCESSES, 0 = désactivé)"""
+        from ml_workers import InferencePool, INFERENCE_PROCESSES
+        processes = INFERENCE_PROCESSES if processes is None else processes
+        if processes <= 0:
+            return None
+        if self.inference_pool is not None and self.inference_pool._pid == os.getpid():
+            return self.inference_pool
+        self.inference_pool = InferencePool(processes).start(self._active.signature)
+        return self.inference_pool
+
+    def _sync_inference_pool(self):
+        """Propage la version active (rechargement, rollback) aux processus d'inférence"""
+        pool = self.inference_pool
+        if pool is not None and pool._pid == os.getpid():
+            pool.sync(self._active.signature)
+
+    def stop_inference_pool(self):
+        pool, self.inference_pool = self.inference_pool, None
+        if pool is not None and pool._pid == os.getpid():
+            pool.close()
+
+    # --- Chargement et versions des modèles ---
+    
+    @property
+    def model_over_under(self):
+        return self._active.model_over_under
+    
+    @property
+    def model_baseline(self):
+        return self._active.model_baseline
+    
+    @property
+    def models_loaded(self):
+        return self._active.models_loaded
+    
+    @property
+    def probability_grid(self):
+        return self._active.probability_grid
+    
+    @probability_grid.setter
+    def probability_grid(self, grid):
+        self._active.probability_grid = grid
+    
+    @property
+    def model_paths(self):
+        return {
+            "over_under": os.path.join(self.model_dir, "model_over_under_handicap.joblib"),
+            "baseline": os.path.join(self.model_dir, "fifa_model_baseline.joblib")
+        }
+
     def load_models(self):
         """Charge les mod??les ML depuis les fichiers joblib"""
-        self.model_over_under = None
-        self.model_baseline = None
+        self._previous = None
+        self._active = self._build_version()
+        self.prediction_cache.clear()
+        self._sync_inference_pool()
 
-        over_under_path = os.path.join(self.model_dir, "model_over_under_handicap.joblib")
-        baseline_path = os.path.join(self.model_dir, "fifa_model_baseline.joblib")
+    def _build_version(self):
+        """Charge une nouvelle version des modèles depuis le disque (sans l'activer)"""
+        paths = self.model_paths
+        over_under_path = paths["over_under"]
+        baseline_path = paths["baseline"]
+        model_over_under = None
+        model_baseline = None
+        digests = {}
 
         # Charger le mod??le Over/Under Handicap
         if os.path.exists(over_under_path):
             try:
-                self.model_over_under = joblib.load(over_under_path)
+                model_over_under = self._load_model_file(over_under_path)
+                digests["over_under"] = model_registry.digest(over_under_path)
                 print("??? Mod??le Over/Under Handicap charg??")
             except Exception as e:
                 print(f"??? Erreur chargement model_over_under_handicap.joblib: {e}")
@@ -48,22 +306,123 @@ class MLIntegration:
         # Charger le mod??le Baseline
         if os.path.exists(baseline_path):
             try:
-                self.model_baseline = joblib.load(baseline_path)
+                model_baseline = self._load_model_file(baseline_path)
+                digests["baseline"] = model_registry.digest(baseline_path)
                 print("??? Mod??le Baseline FIFA charg??")
             except Exception as e:
                 print(f"??? Erreur chargement fifa_model_baseline.joblib: {e}")
         else:
             print("??? Fichier fifa_model_baseline.joblib introuvable")
 
-        # Au moins un mod??le charg??
-        self.models_loaded = bool(self.model_over_under or self.model_baseline)
+        version = ModelVersion(model_over_under, model_baseline, digests)
+        version.probability_grid = self._load_probability_grid(version, digests.get("over_under"))
+        return version
+
+    def _current_digests(self):
+        """Empreintes des fichiers de modèles sur disque (recalculées seulement si modifiés)"""
+        digests = {}
+        for name, path in self.model_paths.items():
+            if os.path.exists(path):
+                digests[name] = model_registry.digest(path)
+        return digests
+
+    def reload_models(self, force=False, smoke_batch=None, latency_budget_ms=None):
+        """
+        Recharge les modèles si les fichiers ont changé, sans interrompre les prédictions
+        
+        La nouvelle version est chargée à côté de l'active, validée sur un lot
+        de contrôle (sorties valides + budget de latence), puis activée d'un
+        bloc. L'ancienne version est conservée pour rollback().
+        
+        Returns:
+            dict: rapport {status: unchanged|activated|rejected|busy, ...}
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return {"status": "busy"}
+        try:
+            if not force and self._current_digests() == self._active.digests:
+                return {"status": "unchanged", "version": self._active.number}
+            
+            from model_versions import validate_version
+            candidate = self._build_version()
+            report = validate_version(self, candidate, smoke_batch, latency_budget_ms)
+            candidate.validation = report
+            self.last_reload = {"at": datetime.now().isoformat(), "version": candidate.number, **report}
+            if not report["ok"]:
+                print(f"❌ Version {candidate.number} des modèles rejetée: {report['errors']}")
+                return {"status": "rejected", "version": candidate.number, "validation": report}
+            
+            self._activate(candidate)
+            self._sync_inference_pool()
+            print(f"✅ Version {candidate.number} des modèles activée")
+            return {"status": "activated", "version": candidate.number, "validation": report}
+        finally:
+            self._reload_lock.release()
+
+    def _activate(self, version):
+        """Remplace la version active (référence unique, lue une fois par prédiction)"""
+        retired = self._previous
+        self._previous, self._active = self._active, version
+        if retired is not None:
+            kept = set(self._active.digests.values()) | set(self._previous.digests.values())
+            for digest in set(retired.digests.values()) - kept:
+                model_registry.release(digest)
+
+    def rollback(self):
+        """Revient instantanément à la version précédente"""
+        with self._reload_lock:
+            if self._previous is None:
+                return {"status": "unavailable"}
+            self._previous, self._active = self._active, self._previous
+            self._sync_inference_pool()
+            print(f"↩️ Retour à la version {self._active.number} des modèles")
+            return {"status": "rolled_back", "version": self._active.number}
+
+    def start_watcher(self, interval=None):
+        """Surveille le répertoire des modèles (thread par processus, relancé après fork)"""
+        from model_versions import ModelWatcher, POLL_SECONDS
+        interval = POLL_SECONDS if interval is None else interval
+        if interval <= 0:
+            return None
+        if self._watcher is None or not self._watcher.is_running():
+            self._watcher = ModelWatcher(self, interval)
+            self._watcher.start()
+        return self._watcher
 
-    def _record_metric(self, ok, error_message=None):
+    def _load_model_file(self, path):
+        """Modèle partagé via le registre (export plat sans sklearn s'il est à jour, sinon le joblib)"""
+        return model_registry.load(path, prefer_flat=USE_FLAT_MODELS)
+
+    def _load_probability_grid(self, version, model_digest):
+        """Grille précompilée (mmap) si elle correspond au modèle de la version"""
+        if not version.model_over_under or not model_digest or PROBABILITY_GRID in ("", "0"):
+            return None
+        grid_path = os.path.join(self.model_dir, PROBABILITY_GRID)
+        if not os.path.exists(grid_path):
+            return None
+        classes = list(getattr(version.model_over_under["model"], "classes_", []))
+        if len(classes) != 2 or 1 not in classes:
+            return None
+        try:
+            from model_grid import ProbabilityGrid
+            grid = ProbabilityGrid.load(grid_path)
+            if grid.meta.get("model_sha256") != model_digest:
+                print("⚠️ Grille de probabilités obsolète (modèle différent), ignorée")
+                return None
+            print("✅ Grille de probabilités Over/Under chargée")
+            return grid
+        except Exception as e:
+            print(f"❌ Erreur chargement grille de probabilités: {e}")
+            return None
+
+    def _record_metric(self, ok, error_message=None, count=1):
         """Met ?? jour les m??triques internes"""
-        self.metrics["predictions_total"] += 1
+        if count <= 0:
+            return
+        self.metrics["predictions_total"] += count
         self.metrics["last_prediction_at"] = datetime.now().isoformat()
         if not ok:
-            self.metrics["predictions_error"] += 1
+            self.metrics["predictions_error"] += count
             self.metrics["last_error"] = error_message
 
     def _coerce_int(self, value, default=0):
@@ -152,7 +511,8 @@ class MLIntegration:
         Returns:
             dict: prédiction avec probabilités
         """
-        if not self.model_baseline:
+        version = self._active
+        if not version.model_baseline:
             self._record_metric(False, "model_baseline_unavailable")
             return {"error": "Mod??le baseline non disponible"}
         
@@ -162,28 +522,38 @@ class MLIntegration:
             self._record_metric(False, error_message)
             return {"error": error_message}
         
+        return self.batcher.submit(("1x2", version), sanitized)
+
+    def _predict_match_results_batch(self, sanitized_list, version=None):
+        """Prédictions 1X2 de plusieurs matchs nettoyés (un seul appel predict_proba)"""
+        if not sanitized_list:
+            return []
+        version = version or self._active
         try:
-            features = self._prepare_baseline_features(sanitized)
-            prediction = self.model_baseline.predict(features)[0]
-            probabilities = self.model_baseline.predict_proba(features)[0]
-            classes = self.model_baseline.classes_
-            result = {
+            features = self._prepare_baseline_features_batch(sanitized_list, version)
+            probabilities = version.model_baseline.predict_proba(features)
+            classes = version.model_baseline.classes_
+            predictions = classes[np.argmax(probabilities, axis=1)]
+        except Exception as e:
+            error_message = f"Erreur pr??diction baseline: {str(e)}"
+            self._record_metric(False, error_message, count=len(sanitized_list))
+            return [{"error": error_message} for _ in sanitized_list]
+        
+        timestamp = datetime.now().isoformat()
+        results = []
+        for row, prediction in zip(probabilities, predictions):
+            results.append({
                 "prediction": prediction,
                 "probabilities": {
-                    classes[i]: float(probabilities[i])
+                    classes[i]: float(row[i])
                     for i in range(len(classes))
                 },
-                "confidence": float(max(probabilities)),
-                "timestamp": datetime.now().isoformat(),
+                "confidence": float(max(row)),
+                "timestamp": timestamp,
                 "model_type": "baseline_1x2"
-            }
-            self._record_metric(True)
-            return result
-        
-        except Exception as e:
-            error_message = f"Erreur pr??diction baseline: {str(e)}"
-            self._record_metric(False, error_message)
-            return {"error": error_message}
+            })
+        self._record_metric(True, count=len(results))
+        return results
 
     def predict_over_under(self, match_data, line=2.5):
         """
@@ -196,7 +566,8 @@ class MLIntegration:
         Returns:
             dict: prédiction Over/Under
         """
-        if not self.model_over_under:
+        version = self._active
+        if not version.model_over_under:
             self._record_metric(False, "model_over_under_unavailable")
             return {"error": "Mod??le Over/Under non disponible"}
         
@@ -206,33 +577,7 @@ class MLIntegration:
             self._record_metric(False, error_message)
             return {"error": error_message}
         
-        line_value = self._coerce_float(line, 2.5)
-        if line_value <= 0:
-            line_value = 2.5
-        
-        try:
-            features = self._prepare_over_under_features(sanitized, line_value)
-            model = self.model_over_under["model"]
-            columns = self.model_over_under["columns"]
-            df_features = pd.DataFrame([features], columns=columns)
-            prediction = model.predict(df_features)[0]
-            probability = model.predict_proba(df_features)[0]
-            result = {
-                "prediction": "Over" if prediction == 1 else "Under",
-                "line": line_value,
-                "over_probability": float(probability[1]) if len(probability) > 1 else 0.0,
-                "under_probability": float(probability[0]) if len(probability) > 0 else 0.0,
-                "confidence": float(max(probability)),
-                "timestamp": datetime.now().isoformat(),
-                "model_type": "over_under_handicap"
-            }
-            self._record_metric(True)
-            return result
-        
-        except Exception as e:
-            error_message = f"Erreur pr??diction Over/Under: {str(e)}"
-            self._record_metric(False, error_message)
-            return {"error": error_message}
+        return self.batcher.submit(("lines", version, (self._coerce_float(line, 2.5),), ()), sanitized)[0]
 
     def predict_handicap(self, match_data, handicap=-1.5):
         """
@@ -245,7 +590,8 @@ class MLIntegration:
         Returns:
             dict: prédiction handicap
         """
-        if not self.model_over_under:
+        version = self._active
+        if not version.model_over_under:
             self._record_metric(False, "model_handicap_unavailable")
             return {"error": "Mod??le Handicap non disponible"}
         
@@ -255,47 +601,90 @@ class MLIntegration:
             self._record_metric(False, error_message)
             return {"error": error_message}
         
-        handicap_value = self._coerce_float(handicap, -1.5)
+        return self.batcher.submit(("lines", version, (), (self._coerce_float(handicap, -1.5),)), sanitized)[0]
+
+    def _predict_lines_batch(self, sanitized_list, lines=(), handicaps=(), version=None):
+        """
+        Prédit toutes les lignes Over/Under et tous les handicaps de plusieurs matchs
+        
+        Une seule matrice de features (une ligne par match et par ligne/handicap)
+        et un seul appel predict_proba ; la classe est déduite des probabilités.
         
-        try:
-            features = self._prepare_handicap_features(sanitized, handicap_value)
-            model = self.model_over_under["model"]
-            columns = self.model_over_under["columns"]
-            df_features = pd.DataFrame([features], columns=columns)
-            prediction = model.predict(df_features)[0]
-            probability = model.predict_proba(df_features)[0]
-            result = {
-                "prediction": "Home" if prediction == 1 else "Away",
-                "handicap": handicap_value,
-                "home_probability": float(probability[1]) if len(probability) > 1 else 0.0,
-                "away_probability": float(probability[0]) if len(probability) > 0 else 0.0,
-                "confidence": float(max(probability)),
-                "timestamp": datetime.now().isoformat(),
-                "model_type": "over_under_handicap"
-            }
-            self._record_metric(True)
-            return result
+        Returns:
+            list: pour chaque match, une prédiction par ligne puis par handicap
+        """
+        line_values = []
+        for line in lines:
+            line_value = self._coerce_float(line, 2.5)
+            line_values.append(line_value if line_value > 0 else 2.5)
+        handicap_values = [self._coerce_float(h, -1.5) for h in handicaps]
+        per_match = len(line_values) + len(handicap_values)
+        if not sanitized_list or not per_match:
+            return [[] for _ in sanitized_list]
         
+        version = version or self._active
+        try:
+            probabilities = self._over_under_probabilities(sanitized_list, line_values + handicap_values, version)
+            predictions = version.model_over_under["model"].classes_[np.argmax(probabilities, axis=1)]
         except Exception as e:
-            error_message = f"Erreur pr??diction Handicap: {str(e)}"
-            self._record_metric(False, error_message)
-            return {"error": error_message}
+            label = "Over/Under" if line_values else "Handicap"
+            error_message = f"Erreur pr??diction {label}: {str(e)}"
+            self._record_metric(False, error_message, count=per_match * len(sanitized_list))
+            return [[{"error": error_message} for _ in range(per_match)] for _ in sanitized_list]
+        
+        timestamp = datetime.now().isoformat()
+        all_results = []
+        for m in range(len(sanitized_list)):
+            base = m * per_match
+            results = []
+            for i, line_value in enumerate(line_values):
+                probability = probabilities[base + i]
+                results.append({
+                    "prediction": "Over" if predictions[base + i] == 1 else "Under",
+                    "line": line_value,
+                    "over_probability": float(probability[1]) if len(probability) > 1 else 0.0,
+                    "under_probability": float(probability[0]) if len(probability) > 0 else 0.0,
+                    "confidence": float(max(probability)),
+                    "timestamp": timestamp,
+                    "model_type": "over_under_handicap"
+                })
+            offset = base + len(line_values)
+            for i, handicap_value in enumerate(handicap_values):
+                probability = probabilities[offset + i]
+                results.append({
+                    "prediction": "Home" if predictions[offset + i] == 1 else "Away",
+                    "handicap": handicap_value,
+                    "home_probability": float(probability[1]) if len(probability) > 1 else 0.0,
+                    "away_probability": float(probability[0]) if len(probability) > 0 else 0.0,
+                    "confidence": float(max(probability)),
+                    "timestamp": timestamp,
+                    "model_type": "over_under_handicap"
+                })
+            all_results.append(results)
+        self._record_metric(True, count=per_match * len(sanitized_list))
+        return all_results
 
     def _prepare_baseline_features(self, match_data):
         """Prépare les features pour le modèle baseline"""
-        # Créer un DataFrame avec les features attendues
-        features = pd.DataFrame({
-            "minute": [match_data.get("minute", 0)],
-            "score1": [match_data.get("score1", 0)],
-            "score2": [match_data.get("score2", 0)],
-            "odds_1": [match_data.get("odds_1", 2.0)],
-            "odds_x": [match_data.get("odds_x", 3.0)],
-            "odds_2": [match_data.get("odds_2", 2.5)],
-            "team1": [match_data.get("team1", "Unknown")],
-            "team2": [match_data.get("team2", "Unknown")],
-            "league": [match_data.get("league", "Unknown")]
-        })
-        return features
+        return self._prepare_baseline_features_batch([match_data])
+
+    def _prepare_baseline_features_batch(self, matches, version=None):
+        """Prépare les features baseline de plusieurs matchs (une ligne par match)"""
+        columns = {
+            "minute": [m.get("minute", 0) for m in matches],
+            "score1": [m.get("score1", 0) for m in matches],
+            "score2": [m.get("score2", 0) for m in matches],
+            "odds_1": [m.get("odds_1", 2.0) for m in matches],
+            "odds_x": [m.get("odds_x", 3.0) for m in matches],
+            "odds_2": [m.get("odds_2", 2.5) for m in matches],
+            "team1": [m.get("team1", "Unknown") for m in matches],
+            "team2": [m.get("team2", "Unknown") for m in matches],
+            "league": [m.get("league", "Unknown") for m in matches]
+        }
+        # Le pipeline sklearn encode équipes et ligue par nom de colonne : DataFrame requis
+        if _requires_dataframe((version or self._active).model_baseline):
+            return _get_pandas().DataFrame(columns)
+        return columns
     
     def _prepare_over_under_features(self, match_data, line):
         """Prépare les features pour le modèle Over/Under"""
@@ -308,6 +697,98 @@ class MLIntegration:
             line  # ligne de Over/Under
         ]
     
+    def _over_under_predict_proba(self, features, version=None):
+        """Appel unique du modèle Over/Under sur une matrice de features"""
+        version = version or self._active
+        if version.over_under_needs_frame:
+            features = _get_pandas().DataFrame(features, columns=version.model_over_under["columns"])
+        return version.model_over_under["model"].predict_proba(features)
+
+    def _over_under_probabilities(self, sanitized_list, values, version=None):
+        """
+        Probabilités de toutes les lignes (match x valeur)
+        
+        Lecture interpolée dans la grille précompilée si disponible ; les points
+        hors grille passent par le cache puis le modèle.
+        """
+        version = version or self._active
+        grid = version.probability_grid
+        if grid is None:
+            return self._model_probabilities(sanitized_list, values, version)
+        
+        n_values = len(values)
+        repeat = lambda name: np.repeat([float(s.get(name, 0)) for s in sanitized_list], n_values)
+        positive, inside = grid.lookup(
+            repeat("match_time_seconds"), repeat("score1"), repeat("score2"),
+            repeat("odd"), np.tile(np.asarray(values, dtype=np.float64), len(sanitized_list))
+        )
+        classes = list(version.model_over_under["model"].classes_)
+        probabilities = np.empty((len(positive), 2), dtype=np.float64)
+        probabilities[:, classes.index(1)] = positive
+        probabilities[:, 1 - classes.index(1)] = 1.0 - positive
+        
+        outside = np.flatnonzero(~inside)
+        self.grid_metrics["rows"] += len(positive) - len(outside)
+        self.grid_metrics["fallback_rows"] += len(outside)
+        for m in np.unique(outside // n_values) if len(outside) else ():
+            rows = outside[outside // n_values == m]
+            subset = [values[i % n_values] for i in rows]
+            probabilities[rows] = self._model_probabilities([sanitized_list[m]], subset, version)
+        return probabilities
+
+    def _model_probabilities(self, sanitized_list, values, version=None):
+        """
+        Probabilités calculées par le modèle, via le cache quantifié
+        
+        Seules les combinaisons absentes du cache sont envoyées au modèle,
+        en un seul appel. Les clés incluent le numéro de version du modèle.
+        """
+        version = version or self._active
+        cache = self.prediction_cache
+        if not cache.enabled:
+            return self._over_under_predict_proba(self._over_under_matrix(sanitized_list, values, version), version)
+        
+        keys = [(version.number,) + cache.make_key(sanitized, value) for sanitized in sanitized_list for value in values]
+        rows = cache.get_many(keys)
+        missing = list(OrderedDict.fromkeys(k for k, row in zip(keys, rows) if row is None))
+        if missing:
+            quantized = np.asarray([k[1:] for k in missing], dtype=np.float64)
+            features = np.empty((len(missing), len(OVER_UNDER_FEATURES)), dtype=np.float64)
+            features[:, 0:3] = quantized[:, 0:3]
+            features[:, 3] = quantized[:, 1] + quantized[:, 2]
+            features[:, 4:6] = quantized[:, 3:5]
+            if version.over_under_order is not None:
+                features = features[:, version.over_under_order]
+            computed = dict(zip(missing, [row.copy() for row in self._over_under_predict_proba(features, version)]))
+            cache.put_many(missing, [computed[k] for k in missing])
+            rows = [computed[k] if row is None else row for k, row in zip(keys, rows)]
+        return np.vstack(rows)
+
+    def _over_under_matrix(self, sanitized_list, values, version=None):
+        """
+        Matrice NumPy des features Over/Under - Handicap, écrite dans un tableau préalloué
+        
+        Une ligne par match et par valeur de ligne/handicap, colonnes dans l'ordre
+        du modèle (calculé au chargement). Équivalent vectorisé de
+        _prepare_over_under_features / _prepare_handicap_features.
+        """
+        n_values = len(values)
+        features = np.empty((len(sanitized_list) * n_values, len(OVER_UNDER_FEATURES)), dtype=np.float64)
+        for m, sanitized in enumerate(sanitized_list):
+            block = features[m * n_values:(m + 1) * n_values]
+            score1 = sanitized.get("score1", 0)
+            score2 = sanitized.get("score2", 0)
+            block[:, 0] = sanitized.get("match_time_seconds", 0)
+            block[:, 1] = score1
+            block[:, 2] = score2
+            block[:, 3] = score1 + score2
+            block[:, 4] = sanitized.get("odd", 2.0)
+        features[:, 5] = np.tile(np.asarray(values, dtype=np.float64), len(sanitized_list))
+        order = (version or self._active).over_under_order
+        if order is not None and not np.array_equal(order, np.arange(len(order))):
+            features = features[:, order]
+        return features
+    
     def _prepare_handicap_features(self, match_data, handicap):
         """Prépare les features pour le modèle Handicap"""
         return [
@@ -329,36 +810,83 @@ class MLIntegration:
         Returns:
             dict: toutes les prédictions disponibles
         """
-        sanitized, warnings = self._sanitize_match_data(match_data)
-        if not sanitized:
-            return {"error": "Donnees du match invalides"}
-
-        results = {
-            "match_info": {
-                "team1": sanitized.get("team1", "Unknown"),
-                "team2": sanitized.get("team2", "Unknown"),
-                "league": sanitized.get("league", "Unknown"),
-                "minute": sanitized.get("minute", 0),
-                "score1": sanitized.get("score1", 0),
-                "score2": sanitized.get("score2", 0)
-            },
-            "predictions": {},
-            "timestamp": datetime.now().isoformat()
-        }
+        return self.batcher.submit(("all", self._active), match_data)
+
+    def _run_micro_batch(self, key, items):
+        """Exécute un lot du micro-batcher : key = (type, version, ...)"""
+        pool = self.inference_pool
+        if pool is not None:
+            results = pool.run(key[0], key[1].signature, key[2:], items)
+            if results is not None:
+                return results
+        return self._run_local_batch(key, items)
+
+    def _run_local_batch(self, key, items):
+        """Calcule un lot dans ce processus"""
+        kind, version = key[0], key[1]
+        if kind == "1x2":
+            return self._predict_match_results_batch(items, version)
+        if kind == "lines":
+            return self._predict_lines_batch(items, key[2], key[3], version)
+        return self.predict_batch(items, version=version)
+
+    def predict_batch(self, matches, lines=None, handicaps=None, version=None):
+        """
+        Prédictions complètes de plusieurs matchs en un seul lot
         
-        baseline_pred = self.predict_match_result(sanitized)
-        if "error" not in baseline_pred:
-            results["predictions"]["1x2"] = baseline_pred
+        Chaque match est nettoyé une fois ; un seul appel predict_proba par
+        modèle couvre tous les matchs, toutes les lignes et tous les handicaps.
         
-        for line in [0.5, 1.5, 2.5, 3.5]:
-            ou_pred = self.predict_over_under(sanitized, line)
-            if "error" not in ou_pred:
-                results["predictions"][f"over_under_{line}"] = ou_pred
+        Args:
+            matches: liste de dicts de données de match
+            lines: lignes Over/Under (défaut 0.5 à 3.5)
+            handicaps: valeurs de handicap (défaut -1.5 à +1.5)
+            version: version des modèles (défaut : version active, lue une seule fois)
+            
+        Returns:
+            list: un résultat par match, au format de get_all_predictions
+        """
+        version = version or self._active
+        lines = list(lines) if lines is not None else list(DEFAULT_LINES)
+        handicaps = list(handicaps) if handicaps is not None else list(DEFAULT_HANDICAPS)
+        
+        results = []
+        valid = []
+        for match_data in matches:
+            sanitized, warnings = self._sanitize_match_data(match_data)
+            if not sanitized:
+                results.append({"error": "Donnees du match invalides"})
+                continue
+            result = {
+                "match_info": {
+                    "team1": sanitized.get("team1", "Unknown"),
+                    "team2": sanitized.get("team2", "Unknown"),
+                    "league": sanitized.get("league", "Unknown"),
+                    "minute": sanitized.get("minute", 0),
+                    "score1": sanitized.get("score1", 0),
+                    "score2": sanitized.get("score2", 0)
+                },
+                "predictions": {},
+                "timestamp": datetime.now().isoformat()
+            }
+            results.append(result)
+            valid.append((sanitized, result))
+        
+        sanitized_list = [v[0] for v in valid]
+        if version.model_baseline and sanitized_list:
+            for (_, result), baseline_pred in zip(valid, self._predict_match_results_batch(sanitized_list, version)):
+                if "error" not in baseline_pred:
+                    result["predictions"]["1x2"] = baseline_pred
         
-        for handicap in [-1.5, -1.0, 0, +1.0, +1.5]:
-            hc_pred = self.predict_handicap(sanitized, handicap)
-            if "error" not in hc_pred:
-                results["predictions"][f"handicap_{handicap}"] = hc_pred
+        if version.model_over_under and sanitized_list:
+            batch = self._predict_lines_batch(sanitized_list, lines, handicaps, version)
+            for (_, result), match_preds in zip(valid, batch):
+                for line, ou_pred in zip(lines, match_preds[:len(lines)]):
+                    if "error" not in ou_pred:
+                        result["predictions"][f"over_under_{line}"] = ou_pred
+                for handicap, hc_pred in zip(handicaps, match_preds[len(lines):]):
+                    if "error" not in hc_pred:
+                        result["predictions"][f"handicap_{handicap}"] = hc_pred
         
         return results
 
@@ -367,7 +895,25 @@ class MLIntegration:
             "models_loaded": self.models_loaded,
             "over_under_available": self.model_over_under is not None,
             "baseline_available": self.model_baseline is not None,
+            "version": self._active.describe(),
+            "previous_version": self._previous.describe() if self._previous else None,
+            "last_reload": self.last_reload,
+            "watcher_running": bool(self._watcher and self._watcher.is_running()),
+            "micro_batching": self.batcher.status(),
+            "inference_pool": self.inference_pool.status() if self.inference_pool else None,
             "metrics": self.metrics,
+            "prediction_cache": self.prediction_cache.stats(),
+            "model_registry": model_registry.status(),
+            "probability_grid": {
+                "loaded": self.probability_grid is not None,
+                "shape": list(self.probability_grid.values.shape) if self.probability_grid is not None else None,
+                "accuracy": self.probability_grid.meta.get("accuracy") if self.probability_grid is not None else None,
+                "rows": self.grid_metrics["rows"],
+                "fallback_rows": self.grid_metrics["fallback_rows"]
+            },
             "timestamp": datetime.now().isoformat()
         }
 
+
+# Instance globale
+ml_integration = MLIntegration()
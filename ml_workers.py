@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+🧵 POOL DE PROCESSUS D'INFÉRENCE ML (OPTIONNEL)
+==============================================
+Les lots du micro-batcher peuvent être exécutés dans des processus dédiés
+qui détiennent leurs propres modèles : l'inférence ne dispute plus le GIL
+aux threads web et le débit ML suit le nombre de cœurs.
+
+- Transport : un Pipe par processus, un message par lot (pas par requête)
+- Backpressure : nombre de lots en cours borné ; au-delà, ou si aucun
+  processus n'est prêt, le lot est calculé dans le processus web
+- Santé : un thread de surveillance ping les processus et relance ceux
+  qui sont morts ou ne répondent plus
+- Versions : les processus ne surveillent pas les fichiers eux-mêmes ;
+  chaque lot porte la signature (empreintes) de la version active du
+  processus web, un processus sur une autre version n'est pas choisi et
+  le lot est calculé localement. reload_models() et rollback() du
+  processus web sont propagés au pool (sync)
+
+Activé avec ML_INFERENCE_PROCESSES > 0 (gunicorn : un pool par worker,
+démarré dans post_fork).
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+
+# Nombre de processus d'inférence (0 = inférence dans le processus web)
+INFERENCE_PROCESSES = int(os.getenv("ML_INFERENCE_PROCESSES", "0"))
+# Lots en cours au maximum avant repli sur l'inférence locale
+MAX_PENDING = int(os.getenv("ML_INFERENCE_MAX_PENDING", "64"))
+# Délai de réponse d'un lot avant repli local
+TIMEOUT_MS = float(os.getenv("ML_INFERENCE_TIMEOUT_MS", "2000"))
+# Intervalle des contrôles de santé
+HEALTH_SECONDS = float(os.getenv("ML_INFERENCE_HEALTH_SECONDS", "10"))
+
+_PING = "ping"
+_SYNC = "sync"
+# Réponse d'un processus dont la version diffère de celle demandée
+_STALE = "version_mismatch"
+
+
+def _align(ml, signature):
+    """Amène la version active du processus sur `signature` (rollback ou rechargement)"""
+    if ml._active.signature == signature:
+        return
+    if ml._previous is not None and ml._previous.signature == signature:
+        ml.rollback()
+        return
+    ml.reload_models(force=True)
+
+
+def _worker_main(conn):
+    """Boucle d'un processus d'inférence : reçoit des lots, renvoie les résultats"""
+    # Le processus calcule ses lots directement (pas de pool ni de fenêtre imbriqués)
+    os.environ["ML_INFERENCE_PROCESSES"] = "0"
+    os.environ["ML_MICROBATCH_WINDOW_MS"] = "0"
+    from ml_integration import ml_integration as ml
+    # Pas de surveillance des fichiers ici : la version suit celle du processus web (sync)
+    conn.send((0, True, {"pid": os.getpid(), "version": ml._active.signature}))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        request_id, kind, signature, args, items = message
+        try:
+            if kind == _SYNC:
+                _align(ml, signature)
+            if kind in (_PING, _SYNC):
+                conn.send((request_id, True, {"pid": os.getpid(), "version": ml._active.signature}))
+                continue
+            version = ml._active
+            if version.signature != signature:
+                conn.send((request_id, False, _STALE))
+                continue
+            results = ml._run_local_batch((kind, version) + tuple(args), items)
+            conn.send((request_id, True, results))
+        except Exception as e:
+            conn.send((request_id, False, str(e)))
+
+
+class _Request:
+    __slots__ = ("event", "ok", "payload")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.ok = False
+        self.payload = None
+
+
+class _Worker:
+    """Un processus d'inférence et son canal"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.pending = {}
+        self.ready = False
+        self.alive = True
+        self.version = None  # signature de la version chargée
+        self.started_at = time.time()
+        self.last_seen = None
+
+    def send(self, message):
+        with self.send_lock:
+            self.conn.send(message)
+
+
+class InferencePool:
+    """Pool de processus d'inférence alimenté par lots"""
+
+    def __init__(self, processes=INFERENCE_PROCESSES, max_pending=MAX_PENDING,
+                 timeout_ms=TIMEOUT_MS, health_seconds=HEALTH_SECONDS):
+        self.processes = max(0, int(processes))
+        self.timeout = timeout_ms / 1000.0
+        self.health_seconds = health_seconds
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self.max_pending = max(1, max_pending)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._workers = []
+        self._next = 0
+        self._closed = threading.Event()
+        self._pid = None
+        self.version = None  # signature attendue (version active du processus web)
+        self.stats = {"batches": 0, "rows": 0, "rejected": 0, "timeouts": 0, "errors": 0, "restarts": 0,
+                      "stale": 0, "syncs": 0}
+
+    def start(self, version=None):
+        """Démarre les processus ; `version` : signature attendue (version active du processus web)"""
+        self.version = version
+        self._pid = os.getpid()
+        self._closed.clear()
+        with self._lock:
+            self._workers = [self._spawn() for _ in range(self.processes)]
+        if self.health_seconds > 0:
+            threading.Thread(target=self._monitor, name="ml-inference-health", daemon=True).start()
+        return self
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        threading.Thread(target=self._reader, args=(worker,), name="ml-inference-reader", daemon=True).start()
+        return worker
+
+    def _reader(self, worker):
+        """Redistribue les réponses d'un processus ; le marque mort si le canal se ferme"""
+        while True:
+            try:
+                request_id, ok, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            worker.last_seen = time.time()
+            if request_id == 0:
+                worker.ready = True
+                worker.version = payload.get("version")
+                if self.version is not None and worker.version != self.version:
+                    self._send_sync(worker)
+                continue
+            if ok and isinstance(payload, dict) and "version" in payload:
+                worker.version = payload["version"]
+            request = worker.pending.pop(request_id, None)
+            if request is not None:
+                request.ok, request.payload = ok, payload
+                request.event.set()
+        worker.alive = False
+        worker.ready = False
+        for request in list(worker.pending.values()):
+            request.event.set()
+        worker.pending.clear()
+
+    def _pick(self, version):
+        with self._lock:
+            candidates = [w for w in self._workers if w.ready and w.alive and w.version == version]
+            if not candidates:
+                return None
+            self._next = (self._next + 1) % len(candidates)
+            return min(candidates[self._next:] + candidates[:self._next], key=lambda w: len(w.pending))
+
+    def _call(self, worker, kind, version, args, items, timeout):
+        request_id = next(self._ids)
+        request = _Request()
+        worker.pending[request_id] = request
+        try:
+            worker.send((request_id, kind, version, tuple(args), items))
+        except (OSError, ValueError):
+            worker.pending.pop(request_id, None)
+            worker.alive = False
+            return None
+        if not request.event.wait(timeout):
+            worker.pending.pop(request_id, None)
+            self.stats["timeouts"] += 1
+            return None
+        if not request.ok:
+            if request.payload == _STALE:
+                self.stats["stale"] += 1
+                self._send_sync(worker)
+            else:
+                self.stats["errors"] += 1
+            return None
+        return request
+
+    def _send_sync(self, worker):
+        """Demande au processus de s'aligner sur self.version (sans attendre la réponse)"""
+        if self.version is None:
+            return
+        request_id = next(self._ids)
+        worker.pending[request_id] = _Request()
+        # Plus choisi jusqu'à sa réponse (version effectivement chargée)
+        worker.version = None
+        try:
+            worker.send((request_id, _SYNC, self.version, (), []))
+            self.stats["syncs"] += 1
+        except (OSError, ValueError):
+            worker.pending.pop(request_id, None)
+            worker.alive = False
+
+    def sync(self, version):
+        """
+        Fixe la version attendue et la propage aux processus
+
+        Args:
+            version: signature de la version active du processus web
+        """
+        self.version = version
+        with self._lock:
+            workers = [w for w in self._workers if w.alive and w.ready and w.version != version]
+        for worker in workers:
+            self._send_sync(worker)
+
+    def run(self, kind, version, args, items):
+        """
+        Résultats du lot calculés par un processus d'inférence
+
+        Args:
+            version: signature de la version des modèles du lot
+
+        Returns:
+            list, ou None si le lot doit être calculé localement
+            (pool saturé, aucun processus sur cette version, erreur ou délai dépassé)
+        """
+        if self._closed.is_set() or self._pid != os.getpid():
+            return None
+        if not self._slots.acquire(blocking=False):
+            self.stats["rejected"] += 1
+            return None
+        try:
+            worker = self._pick(version)
+            if worker is None:
+                self.stats["rejected"] += 1
+                return None
+            request = self._call(worker, kind, version, args, items, self.timeout)
+            if request is None:
+                return None
+            self.stats["batches"] += 1
+            self.stats["rows"] += len(items)
+            return request.payload
+        finally:
+            self._slots.release()
+
+    def health_check(self):
+        """Ping chaque processus prêt, relance les processus morts ou muets"""
+        with self._lock:
+            workers = list(self._workers)
+        for i, worker in enumerate(workers):
+            healthy = worker.alive and worker.process.is_alive()
+            if healthy and worker.ready:
+                request = self._call(worker, _PING, None, (), [], self.timeout)
+                healthy = request is not None
+                if healthy and worker.version != self.version:
+                    self._send_sync(worker)
+            elif healthy:
+                # Démarrage en cours : laissé tranquille tant que le délai de chargement n'est pas écoulé
+                healthy = time.time() - worker.started_at < max(30.0, self.health_seconds * 3)
+            if not healthy and not self._closed.is_set():
+                self._restart(worker)
+
+    def _restart(self, worker):
+        try:
+            worker.process.kill()
+            worker.conn.close()
+        except Exception:
+            pass
+        replacement = self._spawn()
+        with self._lock:
+            self._workers = [replacement if w is worker else w for w in self._workers]
+        self.stats["restarts"] += 1
+
+    def _monitor(self):
+        while not self._closed.wait(self.health_seconds):
+            try:
+                self.health_check()
+            except Exception as e:
+                print(f"❌ Contrôle de santé des processus d'inférence: {e}")
+
+    def close(self):
+        """Arrête les processus d'inférence"""
+        self._closed.set()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                worker.send(None)
+            except Exception:
+                pass
+        for worker in workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+    def wait_ready(self, timeout=30.0):
+        """Attend que tous les processus aient chargé la version attendue"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._workers and all(w.ready and self.version in (None, w.version) for w in self._workers):
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def status(self):
+        with self._lock:
+            workers = list(self._workers)
+        return {
+            "processes": self.processes,
+            "max_pending": self.max_pending,
+            "model_version": self.version[:12] if self.version else None,
+            "workers": [
+                {
+                    "pid": w.process.pid,
+                    "ready": w.ready,
+                    "alive": w.alive and w.process.is_alive(),
+                    "pending": len(w.pending),
+                    "model_version": w.version[:12] if w.version else None,
+                }
+                for w in workers
+            ],
+            **self.stats,
+        }
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+📦 EXPORT DES MODÈLES ML EN TABLEAUX PLATS
+=========================================
+Convertit les estimateurs sklearn (joblib) en tableaux NumPy plats et les
+évalue sans sklearn : chargement rapide, pas de dépickling d'estimateurs,
+prédiction vectorisée par lot.
+
+Modèles pris en charge :
+- LogisticRegression (binaire ou multinomiale)
+- DecisionTreeClassifier, RandomForestClassifier, ExtraTreesClassifier
+  (tous les arbres parcourus ensemble, niveau par niveau)
+- Pipeline [ColumnTransformer(SimpleImputer/StandardScaler, SimpleImputer/OneHotEncoder)] + l'un des précédents
+
+Usage:
+    python model_export.py [fichier.joblib ...]   # écrit fichier.flat.npz à côté
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODELS = [
+    os.path.join(BASE_DIR, "model_over_under_handicap.joblib"),
+    os.path.join(BASE_DIR, "fifa_model_baseline.joblib"),
+]
+FORMAT_VERSION = 1
+
+
+def file_digest(path):
+    """Empreinte SHA-256 d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def flat_path(model_path):
+    """Chemin du fichier exporté associé à un modèle joblib"""
+    return os.path.splitext(model_path)[0] + ".flat.npz"
+
+
+class UnsupportedModel(ValueError):
+    """Estimateur non pris en charge par l'export"""
+
+
+# --- Export ---
+
+def _export_estimator(estimator, arrays):
+    name = type(estimator).__name__
+    if name == "LogisticRegression":
+        arrays["coef"] = np.asarray(estimator.coef_, dtype=np.float64)
+        arrays["intercept"] = np.asarray(estimator.intercept_, dtype=np.float64)
+        if getattr(estimator, "multi_class", "auto") == "ovr" and len(estimator.classes_) > 2:
+            raise UnsupportedModel("LogisticRegression one-vs-rest multiclasse")
+        return "linear"
+
+    if name == "DecisionTreeClassifier":
+        trees = [estimator]
+    elif name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        trees = list(estimator.estimators_)
+    else:
+        raise UnsupportedModel(name)
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        roots.append(offset)
+        feature.append(t.feature)
+        threshold.append(t.threshold)
+        # Enfants réindexés dans le tableau global ; feuilles = pointent sur elles-mêmes
+        is_leaf = t.children_left < 0
+        nodes = np.arange(t.node_count)
+        left.append(np.where(is_leaf, nodes, t.children_left) + offset)
+        right.append(np.where(is_leaf, nodes, t.children_right) + offset)
+        v = t.value[:, 0, :].astype(np.float64)
+        sums = v.sum(axis=1, keepdims=True)
+        value.append(np.divide(v, sums, out=np.zeros_like(v), where=sums > 0))
+        offset += t.node_count
+
+    arrays["tree_feature"] = np.concatenate(feature).astype(np.int64)
+    arrays["tree_threshold"] = np.concatenate(threshold).astype(np.float64)
+    arrays["tree_left"] = np.concatenate(left).astype(np.int64)
+    arrays["tree_right"] = np.concatenate(right).astype(np.int64)
+    arrays["tree_value"] = np.concatenate(value)
+    arrays["tree_roots"] = np.asarray(roots, dtype=np.int64)
+    arrays["tree_depth"] = np.asarray([max(tree.tree_.max_depth for tree in trees)], dtype=np.int64)
+    return "forest"
+
+
+def _export_preprocess(transformer, meta, arrays):
+    """ColumnTransformer : colonnes numériques (imputation + standardisation) et catégorielles (one-hot)"""
+    numeric, categorical = [], []
+    for name, pipe, columns in transformer.transformers_:
+        if name == "remainder" or pipe == "drop":
+            continue
+        steps = dict(pipe.steps) if hasattr(pipe, "steps") else {type(pipe).__name__: pipe}
+        encoder = next((s for s in steps.values() if type(s).__name__ == "OneHotEncoder"), None)
+        imputer = next((s for s in steps.values() if type(s).__name__ == "SimpleImputer"), None)
+        scaler = next((s for s in steps.values() if type(s).__name__ == "StandardScaler"), None)
+        unknown = [s for s in steps.values() if type(s).__name__ not in ("OneHotEncoder", "SimpleImputer", "StandardScaler")]
+        if unknown:
+            raise UnsupportedModel(type(unknown[0]).__name__)
+        if encoder is not None:
+            if getattr(encoder, "drop_idx_", None) is not None:
+                raise UnsupportedModel("OneHotEncoder(drop=...)")
+            for i, column in enumerate(columns):
+                categorical.append({
+                    "column": column,
+                    "categories": [str(c) for c in encoder.categories_[i]],
+                    "fill": str(imputer.statistics_[i]) if imputer is not None else None,
+                })
+        else:
+            n = len(columns)
+            fill = imputer.statistics_ if imputer is not None else np.zeros(n)
+            mean = scaler.mean_ if scaler is not None and scaler.mean_ is not None else np.zeros(n)
+            scale = scaler.scale_ if scaler is not None and scaler.scale_ is not None else np.ones(n)
+            numeric.append((list(columns), fill, mean, scale))
+
+    meta["numeric_columns"] = [c for cols, *_ in numeric for c in cols]
+    meta["categorical"] = categorical
+    if numeric:
+        arrays["num_fill"] = np.concatenate([n[1] for n in numeric]).astype(np.float64)
+        arrays["num_mean"] = np.concatenate([n[2] for n in numeric]).astype(np.float64)
+        arrays["num_scale"] = np.concatenate([n[3] for n in numeric]).astype(np.float64)
+
+
+def export_model(model, columns=None):
+    """
+    Convertit un estimateur (ou pipeline) en (meta, tableaux)
+
+    Raises:
+        UnsupportedModel: si une étape n'est pas prise en charge
+    """
+    meta = {"format": FORMAT_VERSION, "columns": list(columns) if columns is not None else None}
+    arrays = {}
+    estimator = model
+    if hasattr(model, "steps"):
+        *pre, (_, estimator) = model.steps
+        for _, step in pre:
+            if type(step).__name__ != "ColumnTransformer":
+                raise UnsupportedModel(type(step).__name__)
+            _export_preprocess(step, meta, arrays)
+    meta["kind"] = _export_estimator(estimator, arrays)
+    classes = list(estimator.classes_)
+    meta["classes"] = [c.item() if hasattr(c, "item") else c for c in classes]
+    return meta, arrays
+
+
+def save_flat(path, meta, arrays):
+    np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+# --- Évaluation ---
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class FlatModel:
+    """Évaluateur NumPy d'un modèle exporté (interface predict_proba / classes_ de sklearn)"""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.arrays = arrays
+        self.kind = meta["kind"]
+        self.classes_ = np.asarray(meta["classes"])
+        self.categorical = meta.get("categorical") or []
+        self.numeric_columns = meta.get("numeric_columns") or []
+        self._lookups = [
+            {category: i for i, category in enumerate(c["categories"])} for c in self.categorical
+        ]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {k: data[k] for k in data.files if k != "meta"}
+        return cls(meta, arrays)
+
+    @property
+    def has_preprocess(self):
+        return bool(self.numeric_columns or self.categorical)
+
+    def _numeric(self, X):
+        """Colonnes numériques imputées et standardisées"""
+        a = self.arrays
+        values = np.column_stack([np.asarray(X[c], dtype=np.float64) for c in self.numeric_columns])
+        values = np.where(np.isnan(values), a["num_fill"], values)
+        return (values - a["num_mean"]) / a["num_scale"]
+
+    def _linear_scores(self, X):
+        coef, intercept = self.arrays["coef"], self.arrays["intercept"]
+        if not self.has_preprocess:
+            return np.asarray(X, dtype=np.float64) @ coef.T + intercept
+
+        n_numeric = len(self.numeric_columns)
+        scores = np.zeros((len(X[self.numeric_columns[0]] if n_numeric else X[self.categorical[0]["column"]]), coef.shape[0]))
+        if n_numeric:
+            scores += self._numeric(X) @ coef[:, :n_numeric].T
+        # One-hot : chaque catégorie connue ajoute sa colonne de coefficients, les inconnues rien
+        offset = n_numeric
+        for spec, lookup in zip(self.categorical, self._lookups):
+            fill = spec["fill"]
+            indices = np.fromiter(
+                (lookup.get(fill if _is_missing(v) else str(v), -1) for v in X[spec["column"]]), dtype=np.int64
+            )
+            known = indices >= 0
+            scores[known] += coef[:, offset + indices[known]].T
+            offset += len(spec["categories"])
+        return scores + intercept
+
+    def _forest_proba(self, X):
+        a = self.arrays
+        # sklearn compare les features en float32
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        n = X.shape[0]
+        roots = a["tree_roots"]
+        nodes = np.repeat(roots[None, :], n, axis=0)
+        rows = np.arange(n)[:, None]
+        feature, threshold, left, right = a["tree_feature"], a["tree_threshold"], a["tree_left"], a["tree_right"]
+        for _ in range(int(a["tree_depth"][0])):
+            f = feature[nodes]
+            go_left = X[rows, np.maximum(f, 0)] <= threshold[nodes]
+            nodes = np.where(go_left, left[nodes], right[nodes])
+        return a["tree_value"][nodes].mean(axis=1)
+
+    def predict_proba(self, X):
+        """Probabilités par classe ; X : tableau numérique, ou mapping colonne -> valeurs si prétraitement"""
+        if self.kind == "forest":
+            if self.has_preprocess:
+                raise UnsupportedModel("prétraitement + arbres")
+            return self._forest_proba(X)
+
+        scores = self._linear_scores(X)
+        if scores.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def load_flat_model(model_path, digest=None):
+    """
+    Charge l'export plat d'un modèle joblib s'il existe et correspond au fichier
+
+    Args:
+        digest: empreinte SHA-256 du joblib si déjà calculée
+
+    Returns:
+        dict {"model": FlatModel, "columns": ...} pour un bundle, FlatModel sinon ; None si absent/obsolète
+    """
+    path = flat_path(model_path)
+    if not os.path.exists(path):
+        return None
+    model = FlatModel.load(path)
+    if model.meta.get("source_sha256") != (digest or file_digest(model_path)):
+        return None
+    if model.meta.get("bundle"):
+        return {"model": model, "columns": model.meta.get("columns")}
+    return model
+
+
+def export_file(model_path):
+    """Exporte un fichier joblib (modèle seul ou bundle {'model', 'columns'})"""
+    import joblib
+
+    loaded = joblib.load(model_path)
+    bundle = isinstance(loaded, dict)
+    model = loaded["model"] if bundle else loaded
+    meta, arrays = export_model(model, loaded.get("columns") if bundle else None)
+    meta["bundle"] = bundle
+    meta["source_sha256"] = file_digest(model_path)
+    meta["source_file"] = os.path.basename(model_path)
+    output = flat_path(model_path)
+    save_flat(output, meta, arrays)
+    return output
+
+
+def main():
+    paths = sys.argv[1:] or DEFAULT_MODELS
+    status = 0
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"❌ Introuvable: {path}")
+            status = 1
+            continue
+        try:
+            start = time.perf_counter()
+            output = export_file(path)
+            print(f"✅ {os.path.basename(path)} -> {os.path.basename(output)} ({time.perf_counter() - start:.2f}s)")
+        except UnsupportedModel as e:
+            print(f"⚠️ {os.path.basename(path)}: non pris en charge ({e})")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+🧮 GRILLE DE PROBABILITÉS PRÉCALCULÉE (OVER/UNDER - HANDICAP)
+============================================================
+Compile hors ligne le modèle Over/Under - Handicap sur une grille dense de
+ses features, stocke les probabilités dans un tableau NumPy projetable en
+mémoire (mmap) et sert les prédictions par lecture + interpolation, sans
+appel sklearn.
+
+Usage:
+    python model_grid.py compile [--model model_over_under_handicap.joblib] [--output model_over_under_grid.npy]
+    python model_grid.py report [--grid model_over_under_grid.npy]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(BASE_DIR, "model_over_under_handicap.joblib")
+DEFAULT_GRID = os.path.join(BASE_DIR, "model_over_under_grid.npy")
+
+# Axes de la grille : temps, cote et ligne sont interpolés, les scores sont exacts
+DEFAULT_AXES = {
+    "match_time_seconds": np.arange(0, 8401, 300, dtype=np.float64),
+    "score1": np.arange(0, 11, dtype=np.float64),
+    "score2": np.arange(0, 11, dtype=np.float64),
+    "odd": np.round(np.arange(1.0, 5.001, 0.1), 2),
+    "line": np.arange(-4.0, 6.001, 0.5),
+}
+AXIS_ORDER = ["match_time_seconds", "score1", "score2", "odd", "line"]
+INTERPOLATED = ("match_time_seconds", "odd", "line")
+
+# Ordre canonique des colonnes du modèle (total_current = score1 + score2)
+MODEL_FEATURES = ["match_time_seconds", "score1", "score2", "total_current", "odd", "line"]
+
+
+def _model_matrix(time_s, score1, score2, odd, line, columns):
+    """Matrice de features dans l'ordre des colonnes du modèle"""
+    canonical = np.column_stack([time_s, score1, score2, score1 + score2, odd, line]).astype(np.float64)
+    if columns and sorted(columns) == sorted(MODEL_FEATURES):
+        canonical = canonical[:, [MODEL_FEATURES.index(c) for c in columns]]
+    return canonical
+
+
+def _positive_probability(model, features):
+    """P(classe 1) : Over pour les lignes, Home pour les handicaps"""
+    probabilities = model.predict_proba(features)
+    classes = list(model.classes_)
+    return probabilities[:, classes.index(1) if 1 in classes else -1]
+
+
+class ProbabilityGrid:
+    """Grille de P(classe 1) sur (temps, score1, score2, cote, ligne)"""
+
+    def __init__(self, values, axes, meta=None):
+        self.values = values
+        self.axes = {name: np.asarray(axes[name], dtype=np.float64) for name in AXIS_ORDER}
+        self.meta = meta or {}
+
+    @classmethod
+    def compile(cls, model, columns=None, axes=None, meta=None):
+        """Évalue le modèle sur toute la grille (un appel predict_proba par valeur de score1)"""
+        axes = {name: np.asarray((axes or DEFAULT_AXES)[name], dtype=np.float64) for name in AXIS_ORDER}
+        shape = tuple(len(axes[name]) for name in AXIS_ORDER)
+        values = np.empty(shape, dtype=np.float32)
+
+        t, s2, o, l = np.meshgrid(
+            axes["match_time_seconds"], axes["score2"], axes["odd"], axes["line"], indexing="ij"
+        )
+        t, s2, o, l = t.ravel(), s2.ravel(), o.ravel(), l.ravel()
+        for i, s1 in enumerate(axes["score1"]):
+            features = _model_matrix(t, np.full_like(t, s1), s2, o, l, columns)
+            block = _positive_probability(model, features).reshape(shape[0], shape[2], shape[3], shape[4])
+            values[:, i] = block
+        return cls(values, axes, meta)
+
+    def save(self, path):
+        """Écrit la grille (.npy) et ses axes/métadonnées (.json)"""
+        np.save(path, self.values)
+        meta = dict(self.meta)
+        meta["axes"] = {name: self.axes[name].tolist() for name in AXIS_ORDER}
+        meta["shape"] = list(self.values.shape)
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Charge une grille ; avec mmap les pages sont partagées entre processus"""
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        values = np.load(path, mmap_mode="r" if mmap else None)
+        axes = meta.pop("axes")
+        return cls(values, axes, meta)
+
+    def _bracket(self, name, x):
+        """Indice inférieur et poids d'interpolation sur un axe"""
+        axis = self.axes[name]
+        inside = (x >= axis[0]) & (x <= axis[-1])
+        idx = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+        weight = (np.clip(x, axis[0], axis[-1]) - axis[idx]) / (axis[idx + 1] - axis[idx])
+        return idx, weight, inside
+
+    def lookup(self, time_s, score1, score2, odd, line):
+        """
+        P(classe 1) interpolée pour des vecteurs de features
+
+        Returns:
+            (probabilités, masque) — masque faux pour les points hors grille
+        """
+        time_s, score1, score2, odd, line = (
+            np.asarray(v, dtype=np.float64) for v in (time_s, score1, score2, odd, line)
+        )
+        it, wt, in_t = self._bracket("match_time_seconds", time_s)
+        io, wo, in_o = self._bracket("odd", odd)
+        il, wl, in_l = self._bracket("line", line)
+
+        i1 = score1.astype(np.int64)
+        i2 = score2.astype(np.int64)
+        in_s = (
+            (i1 == score1) & (i2 == score2)
+            & (i1 >= self.axes["score1"][0]) & (i1 <= self.axes["score1"][-1])
+            & (i2 >= self.axes["score2"][0]) & (i2 <= self.axes["score2"][-1])
+        )
+        i1 = np.clip(i1 - int(self.axes["score1"][0]), 0, len(self.axes["score1"]) - 1)
+        i2 = np.clip(i2 - int(self.axes["score2"][0]), 0, len(self.axes["score2"]) - 1)
+
+        result = np.zeros(time_s.shape, dtype=np.float64)
+        for dt, ft in ((0, 1 - wt), (1, wt)):
+            for do, fo in ((0, 1 - wo), (1, wo)):
+                for dl, fl in ((0, 1 - wl), (1, wl)):
+                    result += ft * fo * fl * self.values[it + dt, i1, i2, io + do, il + dl]
+        return result, in_t & in_o & in_l & in_s
+
+    def measure_accuracy(self, model, columns=None, samples=20000, seed=0):
+        """Écart mesuré grille vs modèle réel sur des points tirés dans la grille"""
+        rng = np.random.default_rng(seed)
+        axes = self.axes
+        time_s = rng.uniform(axes["match_time_seconds"][0], axes["match_time_seconds"][-1], samples)
+        score1 = rng.integers(axes["score1"][0], axes["score1"][-1] + 1, samples).astype(np.float64)
+        score2 = rng.integers(axes["score2"][0], axes["score2"][-1] + 1, samples).astype(np.float64)
+        odd = rng.uniform(axes["odd"][0], axes["odd"][-1], samples)
+        line = np.round(rng.uniform(axes["line"][0], axes["line"][-1], samples) * 4) / 4
+
+        expected = _positive_probability(model, _model_matrix(time_s, score1, score2, odd, line, columns))
+        start = time.perf_counter()
+        approx, _ = self.lookup(time_s, score1, score2, odd, line)
+        elapsed = time.perf_counter() - start
+        delta = np.abs(approx - expected)
+        return {
+            "samples": int(samples),
+            "mean_abs_delta": float(delta.mean()),
+            "max_abs_delta": float(delta.max()),
+            "class_agreement": float(np.mean((approx >= 0.5) == (expected >= 0.5))),
+            "lookup_us_per_row": round(elapsed / samples * 1e6, 3),
+        }
+
+
+def compile_model(model_path=DEFAULT_MODEL, output=DEFAULT_GRID, axes=None, samples=20000):
+    """Compile la grille d'un modèle joblib, mesure son écart et l'écrit sur disque"""
+    import joblib
+    from model_registry import model_registry
+
+    bundle = joblib.load(model_path)
+    model, columns = bundle["model"], list(bundle.get("columns") or MODEL_FEATURES)
+    meta = {
+        "model_sha256": model_registry.digest(model_path),
+        "model_file": os.path.basename(model_path),
+        "columns": columns,
+        "compiled_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    grid = ProbabilityGrid.compile(model, columns, axes, meta)
+    grid.meta["accuracy"] = grid.measure_accuracy(model, columns, samples=samples)
+    grid.save(output)
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grille de probabilités Over/Under - Handicap")
+    parser.add_argument("action", choices=["compile", "report"], help="Action à effectuer")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Modèle joblib à compiler")
+    parser.add_argument("--output", "--grid", dest="grid", default=DEFAULT_GRID, help="Fichier .npy de la grille")
+    parser.add_argument("--samples", type=int, default=20000, help="Points tirés pour mesurer l'écart")
+    args = parser.parse_args()
+
+    if args.action == "compile":
+        start = time.perf_counter()
+        grid = compile_model(args.model, args.grid, samples=args.samples)
+        print(f"Grille {tuple(grid.values.shape)} compilée en {time.perf_counter() - start:.1f}s -> {args.grid}")
+        print(f"Taille: {grid.values.nbytes / 1e6:.1f} MB")
+    else:
+        if not os.path.exists(args.grid):
+            print(f"Grille introuvable: {args.grid}")
+            return 1
+        grid = ProbabilityGrid.load(args.grid)
+
+    print(json.dumps(grid.meta.get("accuracy", {}), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+🗂️ REGISTRE PARTAGÉ DES MODÈLES ML
+=================================
+Un seul exemplaire par contenu de fichier (empreinte SHA-256) dans le
+processus, quel que soit le chemin ou le module qui le demande.
+
+Chargé dans le master gunicorn (voir gunicorn.conf.py), le registre est
+hérité par les workers forkés qui partagent ses pages en copy-on-write.
+Les gros tableaux NumPy des joblib sont projetés en mémoire (mmap_mode).
+"""
+
+import os
+import threading
+from datetime import datetime
+
+from model_export import file_digest, load_flat_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modèles préchargés par le master gunicorn
+DEFAULT_MODEL_PATHS = [
+    os.path.join(BASE_DIR, "model_over_under_handicap.joblib"),
+    os.path.join(BASE_DIR, "fifa_model_baseline.joblib"),
+    os.path.join(BASE_DIR, "api", "model_over_under_handicap.joblib"),
+]
+
+# Les tableaux numpy des joblib non compressés sont projetés en mémoire (lecture seule)
+JOBLIB_MMAP_MODE = os.getenv("ML_JOBLIB_MMAP_MODE", "r") or None
+
+
+class ModelRegistry:
+    """Modèles chargés, dédupliqués par empreinte de contenu"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}   # (empreinte, format) -> entrée
+        self._digests = {}   # chemin absolu -> (mtime_ns, taille, empreinte)
+
+    def digest(self, path):
+        """Empreinte du fichier, recalculée seulement s'il a changé sur disque"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        digest = file_digest(path)
+        self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def load(self, path, prefer_flat=True):
+        """
+        Modèle du fichier `path` (export plat si à jour et prefer_flat, sinon joblib)
+
+        Un même contenu n'est chargé qu'une fois, même sous des chemins différents.
+
+        Raises:
+            FileNotFoundError, et les erreurs de chargement de joblib
+        """
+        path = os.path.abspath(path)
+        digest = self.digest(path)
+        key = (digest, bool(prefer_flat))
+
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._charger(path, digest, prefer_flat)
+                    self._entries[key] = entry
+        if path not in entry["paths"]:
+            with self._lock:
+                entry["paths"].append(path)
+        return entry["model"]
+
+    def _charger(self, path, digest, prefer_flat):
+        model = load_flat_model(path, digest) if prefer_flat else None
+        source = "flat"
+        if model is None:
+            import joblib
+            model = joblib.load(path, mmap_mode=JOBLIB_MMAP_MODE)
+            source = "joblib"
+        return {
+            "model": model,
+            "digest": digest,
+            "source": source,
+            "paths": [path],
+            "size_bytes": os.path.getsize(path),
+            "loaded_at": datetime.now().isoformat(),
+            "pid": os.getpid(),
+        }
+
+    def preload(self, paths=None, prefer_flat=True):
+        """Charge les modèles disponibles (à appeler avant le fork des workers)"""
+        loaded = 0
+        for path in paths or DEFAULT_MODEL_PATHS:
+            if not os.path.exists(path):
+                continue
+            try:
+                self.load(path, prefer_flat)
+                loaded += 1
+            except Exception as e:
+                print(f"❌ Préchargement impossible de {os.path.basename(path)}: {e}")
+        return loaded
+
+    def release(self, digest):
+        """Oublie les entrées d'un contenu retiré (les versions qui le référencent le gardent en vie)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == digest]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+
+    def status(self):
+        with self._lock:
+            return {
+                "models": [
+                    {
+                        "digest": entry["digest"][:12],
+                        "source": entry["source"],
+                        "paths": [os.path.relpath(p, BASE_DIR) for p in entry["paths"]],
+                        "size_bytes": entry["size_bytes"],
+                        "loaded_at": entry["loaded_at"],
+                        "shared_from_master": entry["pid"] != os.getpid(),
+                    }
+                    for entry in self._entries.values()
+                ],
+                "count": len(self._entries),
+                "pid": os.getpid(),
+            }
+
+
+# Instance globale
+model_registry = ModelRegistry()
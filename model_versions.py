@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+🔄 VERSIONS DES MODÈLES ML : VALIDATION ET RECHARGEMENT À CHAUD
+==============================================================
+Une nouvelle version des fichiers de modèles est chargée à côté de la
+version active, validée sur un lot de contrôle (probabilités valides,
+classes inchangées, budget de latence, précision si le lot est étiqueté),
+puis activée d'un bloc par MLIntegration.reload_models().
+
+Les fichiers doivent être remplacés par renommage atomique (écriture dans
+un fichier temporaire puis os.replace) : les joblib sont projetés en
+mémoire et ne doivent pas être réécrits sur place.
+
+Usage:
+    python model_versions.py validate [--budget-ms 50] [--smoke-batch lot.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Intervalle de surveillance du répertoire des modèles (0 = désactivé)
+POLL_SECONDS = float(os.getenv("ML_MODEL_POLL_SECONDS", "30"))
+# Latence maximale d'un appel de modèle sur le lot de contrôle
+LATENCY_BUDGET_MS = float(os.getenv("ML_RELOAD_LATENCY_BUDGET_MS", "50"))
+# Baisse de précision tolérée sur un lot de contrôle étiqueté
+MAX_ACCURACY_DROP = float(os.getenv("ML_RELOAD_MAX_ACCURACY_DROP", "0.05"))
+# Lot de contrôle JSON (liste de matchs, champ optionnel "label" = 1/X/2)
+SMOKE_BATCH_PATH = os.getenv("ML_SMOKE_BATCH", "")
+
+SMOKE_LINES = [0.5, 1.5, 2.5, 3.5, -1.5, 0, 1.5]
+TIMING_RUNS = 3
+
+# Lot de contrôle par défaut : début, milieu et fin de match, cotes variées
+DEFAULT_SMOKE_BATCH = [
+    {"team1": "Real Madrid", "team2": "Barcelona", "league": "FC 24. Champions League",
+     "minute": 0, "score1": 0, "score2": 0, "odds_1": 2.1, "odds_x": 3.4, "odds_2": 3.2, "odd": 1.9},
+    {"team1": "Chelsea", "team2": "Arsenal", "league": "FC 24. Premier League",
+     "minute": 45, "score1": 1, "score2": 0, "odds_1": 1.6, "odds_x": 3.8, "odds_2": 5.5, "odd": 2.2},
+    {"team1": "Milan", "team2": "Inter", "league": "FC 24. Serie A",
+     "minute": 80, "score1": 2, "score2": 2, "odds_1": 4.0, "odds_x": 1.5, "odds_2": 4.2, "odd": 1.7},
+    {"team1": "Lyon", "team2": "Marseille", "league": "FC 24. Ligue 1",
+     "minute": 120, "score1": 3, "score2": 4, "odds_1": 6.0, "odds_x": 4.5, "odds_2": 1.3, "odd": 3.1},
+]
+
+
+def load_smoke_batch(path=None):
+    """Lot de contrôle depuis un fichier JSON, sinon le lot par défaut"""
+    path = path or SMOKE_BATCH_PATH
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            batch = json.load(f)
+        if isinstance(batch, list) and batch:
+            return batch
+    return DEFAULT_SMOKE_BATCH
+
+
+def _check_probabilities(name, probabilities, errors):
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if not np.all(np.isfinite(probabilities)):
+        errors.append(f"{name}: probabilités non finies")
+    elif np.any(probabilities < -1e-9) or np.any(probabilities > 1 + 1e-9):
+        errors.append(f"{name}: probabilités hors [0, 1]")
+    elif not np.allclose(probabilities.sum(axis=1), 1.0, atol=1e-4):
+        errors.append(f"{name}: probabilités de somme différente de 1")
+
+
+def _timed(call):
+    """Résultat et meilleure durée (ms) sur quelques appels ; le premier réchauffe le modèle"""
+    result = call()
+    best = None
+    for _ in range(TIMING_RUNS):
+        start = time.perf_counter()
+        call()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def _accuracy(ml, version, sanitized, labels):
+    features = ml._prepare_baseline_features_batch(sanitized, version)
+    probabilities = version.model_baseline.predict_proba(features)
+    predictions = version.model_baseline.classes_[np.argmax(probabilities, axis=1)]
+    return float(np.mean([str(p) == str(l) for p, l in zip(predictions, labels)]))
+
+
+def validate_version(ml, candidate, smoke_batch=None, latency_budget_ms=None):
+    """
+    Valide une version candidate sur le lot de contrôle (sans toucher aux métriques)
+
+    Args:
+        ml: instance MLIntegration (préparation des features)
+        candidate: ModelVersion chargée mais pas encore active
+        smoke_batch: liste de matchs (défaut : load_smoke_batch())
+        latency_budget_ms: latence maximale d'un appel de modèle sur le lot
+
+    Returns:
+        dict: {ok, errors, latency_ms, accuracy, rows}
+    """
+    budget = LATENCY_BUDGET_MS if latency_budget_ms is None else latency_budget_ms
+    batch = smoke_batch or load_smoke_batch()
+    active = ml._active
+    errors = []
+    latency = {}
+    accuracy = None
+
+    sanitized, labels = [], []
+    for match in batch:
+        clean, _ = ml._sanitize_match_data(match)
+        if clean:
+            sanitized.append(clean)
+            labels.append(match.get("label"))
+    if not sanitized:
+        return {"ok": False, "errors": ["lot de contrôle invalide"], "latency_ms": latency,
+                "accuracy": accuracy, "rows": 0}
+
+    for name in ("model_over_under", "model_baseline"):
+        if getattr(active, name) is not None and getattr(candidate, name) is None:
+            errors.append(f"{name}: absent de la nouvelle version")
+    if not candidate.models_loaded:
+        errors.append("aucun modèle chargé")
+
+    try:
+        if candidate.model_baseline is not None:
+            features = ml._prepare_baseline_features_batch(sanitized, candidate)
+            probabilities, latency["baseline"] = _timed(
+                lambda: candidate.model_baseline.predict_proba(features)
+            )
+            _check_probabilities("baseline", probabilities, errors)
+            if active.model_baseline is not None and \
+                    list(map(str, active.model_baseline.classes_)) != list(map(str, candidate.model_baseline.classes_)):
+                errors.append("baseline: classes différentes de la version active")
+
+            if all(label is not None for label in labels):
+                accuracy = {"candidate": _accuracy(ml, candidate, sanitized, labels)}
+                if active.model_baseline is not None:
+                    accuracy["active"] = _accuracy(ml, active, sanitized, labels)
+                    if accuracy["active"] - accuracy["candidate"] > MAX_ACCURACY_DROP:
+                        errors.append("baseline: baisse de précision sur le lot de contrôle")
+
+        if candidate.model_over_under is not None:
+            features = ml._over_under_matrix(sanitized, SMOKE_LINES, candidate)
+            probabilities, latency["over_under"] = _timed(
+                lambda: ml._over_under_predict_proba(features, candidate)
+            )
+            _check_probabilities("over_under", probabilities, errors)
+            if active.model_over_under is not None and \
+                    list(active.model_over_under["model"].classes_) != list(candidate.model_over_under["model"].classes_):
+                errors.append("over_under: classes différentes de la version active")
+    except Exception as e:
+        errors.append(f"erreur de prédiction: {e}")
+
+    for name, elapsed in latency.items():
+        if elapsed > budget:
+            errors.append(f"{name}: {elapsed:.1f} ms > budget {budget:.0f} ms")
+
+    return {
+        "ok": not errors,
+        "errors": errors,
+        "latency_ms": {name: round(elapsed, 3) for name, elapsed in latency.items()},
+        "accuracy": accuracy,
+        "rows": len(sanitized),
+    }
+
+
+class ModelWatcher:
+    """
+    Surveille les fichiers de modèles et déclenche reload_models()
+
+    Un changement n'est pris en compte que s'il est stable sur deux
+    relevés consécutifs (fichier complètement copié). Un contenu rejeté
+    n'est pas revalidé tant qu'il ne change pas.
+    """
+
+    def __init__(self, ml, interval=POLL_SECONDS):
+        self.ml = ml
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._pending = None
+        self._rejected = None
+
+    def start(self):
+        self._stop.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="ml-model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_running(self):
+        # Après un fork (workers gunicorn), le thread du parent n'existe plus
+        return bool(self._thread and self._thread.is_alive() and self._pid == os.getpid())
+
+    def check(self):
+        """Un relevé ; retourne le rapport de rechargement s'il y en a eu un"""
+        try:
+            digests = self.ml._current_digests()
+        except OSError:
+            return None
+        if digests == self.ml._active.digests or digests == self._rejected:
+            self._pending = None
+            return None
+        if digests != self._pending:
+            self._pending = digests
+            return None
+        self._pending = None
+        report = self.ml.reload_models()
+        if report["status"] == "rejected":
+            self._rejected = digests
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ Surveillance des modèles: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation des modèles ML sur le lot de contrôle")
+    parser.add_argument("action", choices=["validate"], help="Action à effectuer")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Budget de latence par appel")
+    parser.add_argument("--smoke-batch", default=None, help="Lot de contrôle JSON")
+    args = parser.parse_args()
+
+    from ml_integration import ml_integration
+    report = validate_version(
+        ml_integration, ml_integration._active, load_smoke_batch(args.smoke_batch), args.budget_ms
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
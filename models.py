@@ -7,6 +7,8 @@ db = SQLAlchemy()
 
 class User(db.Model):
     __tablename__ = "users"
+    # Pagination par curseur du tableau de bord admin (tri created_at, id)
+    __table_args__ = (db.Index('ix_users_created_id', 'created_at', 'id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -59,6 +61,9 @@ class UserFile(db.Model):
 class Prediction(db.Model):
     """Prédictions générées par l'IA pour les matchs"""
     __tablename__ = "predictions"
+    __table_args__ = (
+        db.Index('uq_predictions_match_type', 'match_id', 'consensus_type', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     match_id = db.Column(db.Integer, nullable=False, index=True)  # ID du match depuis l'API
@@ -134,7 +139,7 @@ class Alert(db.Model):
     
     # Métadonnées
     extra_data = db.Column(db.Text, nullable=True)  # JSON
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self) -> str:
         return f"<Alert {self.alert_type} - {self.severity}>"
@@ -151,7 +156,7 @@ class AccessLog(db.Model):
     prediction_id = db.Column(db.Integer, db.ForeignKey('predictions.id'), nullable=True)
     subscription_plan = db.Column(db.String(20), nullable=True)  # Plan utilisé pour l'accès
     ip_address = db.Column(db.String(45), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     extra_data = db.Column(db.Text, nullable=True)  # JSON
 
     def __repr__(self) -> str:
@@ -170,7 +175,7 @@ class SystemLog(db.Model):
     severity = db.Column(db.String(20), default='info')  # info, warning, error, critical
     extra_data = db.Column(db.Text, nullable=True)  # JSON pour données supplémentaires (renommé de metadata car réservé SQLAlchemy)
     ip_address = db.Column(db.String(45), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self) -> str:
         return f"<SystemLog {self.action_type} - {self.created_at}>"
@@ -220,6 +225,11 @@ class MatchArchive(db.Model):
 class PredictionArchive(db.Model):
     """Archive des prédictions - Mémoire pour apprentissage IA"""
     __tablename__ = "predictions_archive"
+    __table_args__ = (
+        db.Index('uq_predictions_archive_match_type', 'match_id', 'consensus_type', unique=True),
+        # Agrégats de performance sur une période (filtre finalized_at, regroupement par type)
+        db.Index('ix_predictions_archive_finalized_type', 'finalized_at', 'consensus_type'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     match_id = db.Column(db.Integer, db.ForeignKey('matches_archive.match_id'), nullable=False, index=True)
@@ -297,6 +307,28 @@ class ModelPerformance(db.Model):
         return f"<ModelPerformance {self.date_debut.date()} - {self.date_fin.date()} - {self.taux_reussite}%>"
 
 
+class PerformanceBucket(db.Model):
+    """Compteurs de performance par jour et par segment (global, module, type) - Mis à jour à chaque finalisation"""
+    __tablename__ = "performance_buckets"
+    __table_args__ = (db.Index('uq_performance_buckets_day_segment', 'day', 'segment', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)  # Jour de finalisation (UTC)
+    segment = db.Column(db.String(30), nullable=False)  # global, statistique, cotes, simulation, forme, consensus, 1x2, alternatif
+    
+    # Compteurs additifs
+    total = db.Column(db.Integer, default=0, nullable=False)
+    correctes = db.Column(db.Integer, default=0, nullable=False)
+    somme_confiance = db.Column(db.Float, default=0.0, nullable=False)
+    somme_probabilite = db.Column(db.Float, default=0.0, nullable=False)
+    somme_ecart = db.Column(db.Float, default=0.0, nullable=False)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<PerformanceBucket {self.day} {self.segment} {self.correctes}/{self.total}>"
+
+
 class AnomalyLog(db.Model):
     """Logs d'anomalies détectées - Pour analyse et amélioration"""
     __tablename__ = "anomaly_logs"
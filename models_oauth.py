@@ -42,6 +42,7 @@ class User(db.Model):
     __table_args__ = (
         Index('idx_users_provider_id', 'provider', 'provider_id'),
         Index('idx_users_plan_status', 'plan', 'status'),
+        Index('idx_users_created_id', 'created_at', 'id'),  # Pagination par curseur
     )
     
     def to_dict(self):
@@ -147,6 +148,7 @@ class Prediction(db.Model):
     __table_args__ = (
         Index('idx_predictions_user_status', 'user_id', 'status'),
         Index('idx_predictions_created', 'created_at'),
+        Index('idx_predictions_user_created_id', 'user_id', 'created_at', 'id'),  # Historique par curseur, quota du jour
     )
 
 # Fonctions utilitaires
@@ -0,0 +1,125 @@
+"""
+📄 PAGINATION PAR CURSEUR (KEYSET) - ORACXPRED MÉTAPHORE
+=======================================================
+Pages triées sur une clé stable (created_at, id) décroissante : la page
+suivante reprend après la dernière ligne vue (WHERE (created_at, id) <
+curseur) au lieu de sauter N lignes (OFFSET). Avec l'index correspondant,
+le coût d'une page ne dépend pas de la taille de la table.
+
+Le curseur est opaque pour le client (base64 JSON des valeurs de la clé).
+Les routes existantes gardent leur format paginé ({..., total, pages})
+tant que le client ne demande pas le mode curseur (?cursor= ou ?limit=).
+"""
+
+import base64
+import json
+import os
+import uuid
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "50"))
+MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "200"))
+
+
+def encode_cursor(values):
+    """Curseur opaque pour les valeurs de la clé de tri de la dernière ligne"""
+    serialized = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, uuid.UUID) else v
+                  for v in values]
+    return base64.urlsafe_b64encode(json.dumps(serialized).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """
+    Valeurs de la clé de tri d'un curseur
+
+    Raises:
+        ValueError: curseur illisible ou incompatible avec la clé
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+    if not isinstance(raw, list) or len(raw) != len(columns):
+        raise ValueError("Curseur de pagination invalide")
+
+    values = []
+    for column, value in zip(columns, raw):
+        python_type = _python_type(column)
+        try:
+            if value is None:
+                values.append(None)
+            elif python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is uuid.UUID:
+                values.append(uuid.UUID(value))
+            elif python_type is not None:
+                values.append(python_type(value))
+            else:
+                values.append(value)
+        except (TypeError, ValueError):
+            raise ValueError("Curseur de pagination invalide")
+    return values
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def parse_limit(value, default=DEFAULT_LIMIT):
+    """Taille de page demandée, bornée à [1, MAX_LIMIT]"""
+    try:
+        limit = int(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def cursor_requested(args):
+    """Mode curseur demandé explicitement (?cursor= ou ?limit=) ; sinon ancien format paginé"""
+    return "cursor" in args or "limit" in args
+
+
+def prefix_search(columns, text):
+    """Recherche par début de valeur sur plusieurs colonnes (LIKE 'texte%', jokers échappés)"""
+    return or_(*[column.startswith(text, autoescape=True) for column in columns])
+
+
+def _after(columns, values):
+    """(c1, c2, ...) < (v1, v2, ...) pour un tri décroissant, sans comparaison de tuples SQL"""
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        clauses.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], column < value))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    Une page d'une requête, triée par `columns` décroissantes
+
+    Args:
+        query: requête SQLAlchemy (filtres serveur déjà appliqués)
+        columns: colonnes de la clé de tri, la dernière unique (ex. created_at, id)
+        cursor: curseur renvoyé par la page précédente (None = première page)
+        limit: nombre de lignes
+
+    Returns:
+        tuple (lignes, curseur suivant ou None)
+
+    Raises:
+        ValueError: curseur invalide
+    """
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns)))
+    rows = query.order_by(*[c.desc() for c in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
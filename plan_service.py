@@ -8,6 +8,7 @@ from typing import Dict, List, Optional
 from enum import Enum
 
 from models_oauth import db, User, Subscription, AuditLog
+from user_cache import user_cache
 
 class PlanType(Enum):
     FREE = 'free'
@@ -113,6 +114,7 @@ class PlanService:
         
         db.session.add(subscription)
         db.session.commit()
+        user_cache.invalidate(User, user_id)
         
         # Log l'upgrade
         self._log_plan_change(user, old_plan, new_plan.value, 'upgrade')
@@ -147,6 +149,7 @@ class PlanService:
         
         db.session.add(subscription)
         db.session.commit()
+        user_cache.invalidate(User, user_id)
         
         # Log le downgrade
         self._log_plan_change(user, old_plan, new_plan.value, 'downgrade')
@@ -154,22 +157,15 @@ class PlanService:
         return subscription
     
     def check_user_limits(self, user_id: str) -> Dict:
-        """Vérifie les limites actuelles de l'utilisateur"""
-        user = User.query.get(user_id)
+        """Vérifie les limites actuelles de l'utilisateur (utilisateur et compteur du jour en mémoire)"""
+        user = user_cache.get(db, User, user_id)
         if not user:
             raise ValueError("Utilisateur non trouvé")
         
         plan_config = self.get_plan_config(PlanType(user.plan))
         
-        # Compte les prédictions du jour
-        from models_oauth import Prediction
-        today = datetime.now(timezone.utc).date()
-        today_start = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
-        
-        daily_predictions = Prediction.query.filter(
-            Prediction.user_id == user_id,
-            Prediction.created_at >= today_start
-        ).count()
+        # Prédictions du jour : compteur en mémoire, recompté en base périodiquement
+        daily_predictions = user_cache.daily_usage(User, user_id, lambda: self._count_daily_predictions(user_id))
         
         daily_limit = plan_config['daily_predictions']
         remaining = daily_limit - daily_predictions if daily_limit > 0 else float('inf')
@@ -184,9 +180,24 @@ class PlanService:
             'is_premium': user.plan != PlanType.FREE.value
         }
     
+    def _count_daily_predictions(self, user_id: str) -> int:
+        """Compte en base les prédictions du jour (UTC)"""
+        from models_oauth import Prediction
+        today = datetime.now(timezone.utc).date()
+        today_start = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
+        
+        return Prediction.query.filter(
+            Prediction.user_id == user_id,
+            Prediction.created_at >= today_start
+        ).count()
+    
+    def record_prediction(self, user_id: str):
+        """Compte une prédiction enregistrée dans le quota du jour"""
+        user_cache.record_usage(User, user_id)
+    
     def can_access_details(self, user_id: str) -> bool:
         """Vérifie si l'utilisateur peut accéder aux détails"""
-        user = User.query.get(user_id)
+        user = user_cache.get(db, User, user_id)
         if not user:
             return False
         
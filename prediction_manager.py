@@ -7,12 +7,14 @@ Gère la génération, validation et alertes des prédictions
 from models import db, Prediction, Alert, SystemLog, AccessLog
 from datetime import datetime
 import json
-from flask import request
+from flask import request, has_request_context
+from log_writer import log_writer
+from bulk_upsert import upsert_rows, load_by_keys, ids_by_keys
 
 
 def get_client_ip():
     """Récupère l'IP du client"""
-    if request:
+    if has_request_context():
         return request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'unknown'))
     return 'unknown'
 
@@ -102,6 +104,106 @@ def create_prediction(match_id, team1, team2, league, consensus_result, consensu
         raise
 
 
+PREDICTION_UPDATE_COLUMNS = (
+    'team1', 'team2', 'league', 'consensus_result', 'consensus_probability', 'confidence',
+    'recommended_odd', 'recommended_action', 'votes_statistique', 'votes_cotes',
+    'votes_simulation', 'votes_forme', 'updated_at'
+)
+
+
+def create_predictions_bulk(predictions):
+    """
+    Crée ou met à jour plusieurs prédictions en une transaction (upsert ensembliste)
+    
+    Même règle que create_prediction (une prédiction par match et type de
+    consensus, extra_data conservé s'il n'est pas fourni), mais un seul
+    INSERT ... ON CONFLICT DO UPDATE et un seul commit pour tout le lot,
+    alertes d'anomalies comprises (un INSERT multi-lignes).
+    
+    Args:
+        predictions: liste de dicts aux paramètres de create_prediction
+    
+    Returns:
+        list de Prediction (une par couple match/type)
+    """
+    now = datetime.utcnow()
+    rows = [{
+        'match_id': p['match_id'],
+        'team1': p['team1'],
+        'team2': p['team2'],
+        'league': p['league'],
+        'consensus_type': p.get('consensus_type', '1X2'),
+        'consensus_result': p['consensus_result'],
+        'consensus_probability': p['consensus_probability'],
+        'confidence': p['confidence'],
+        'recommended_odd': p.get('recommended_odd'),
+        'recommended_action': p['recommended_action'],
+        'votes_statistique': bool(p.get('votes_statistique', False)),
+        'votes_cotes': bool(p.get('votes_cotes', False)),
+        'votes_simulation': bool(p.get('votes_simulation', False)),
+        'votes_forme': bool(p.get('votes_forme', False)),
+        'is_valid': True,
+        'is_locked': False,
+        'created_at': now,
+        'updated_at': now,
+        'extra_data': json.dumps(p['extra_data']) if p.get('extra_data') else None
+    } for p in predictions]
+    
+    try:
+        keys = upsert_rows(db, Prediction, rows, ('match_id', 'consensus_type'),
+                           PREDICTION_UPDATE_COLUMNS, keep_if_null=('extra_data',))
+        alerts = _insert_anomaly_alerts(rows, now)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log_action('prediction_error', f"Erreur lors de l'enregistrement groupé de prédictions: {str(e)}", severity='error')
+        raise
+    
+    saved = load_by_keys(db, Prediction, ('match_id', 'consensus_type'), keys)
+    log_action('predictions_generated_bulk',
+              f"{len(saved)} prédictions enregistrées en lot",
+              severity='info',
+              extra_data={'count': len(saved), 'match_ids': sorted({p.match_id for p in saved})})
+    
+    if alerts:
+        log_action('alerts_created_bulk',
+                  f"{len(alerts)} alertes d'anomalies créées en lot",
+                  severity='warning',
+                  extra_data={'count': len(alerts), 'alert_types': sorted({a['alert_type'] for a in alerts})})
+    
+    return saved
+
+
+def _insert_anomaly_alerts(rows, now):
+    """
+    Alertes d'anomalies d'un lot de prédictions, calculées en Python et
+    insérées en un INSERT multi-lignes dans la transaction de l'appelant
+    
+    Returns:
+        list des lignes d'alertes insérées
+    """
+    latest = {(r['match_id'], r['consensus_type']): r for r in rows}  # la dernière gagne, comme l'upsert
+    flagged = {key: anomalies for key, anomalies in
+               ((key, _prediction_anomalies(r)) for key, r in latest.items()) if anomalies}
+    if not flagged:
+        return []
+    
+    ids = ids_by_keys(db, Prediction, ('match_id', 'consensus_type'), list(flagged))
+    alerts = [{
+        'alert_type': alert_type,
+        'message': message,
+        'severity': severity,
+        'prediction_id': ids.get(key),
+        'match_id': key[0],
+        'is_acknowledged': False,
+        'created_at': now,
+        'extra_data': json.dumps(extra_data) if extra_data else None
+    } for key, anomalies in flagged.items() for alert_type, message, severity, extra_data in anomalies]
+    # Insertion sur la table : extra_data parfois NULL, une seule instruction pour tout le lot
+    db.session.execute(db.insert(Alert.__table__), alerts)
+    return alerts
+
+
 def get_prediction_by_match(match_id, consensus_type='1X2'):
     """Récupère la prédiction pour un match donné"""
     return Prediction.query.filter_by(match_id=match_id, consensus_type=consensus_type, is_valid=True).first()
@@ -176,49 +278,48 @@ def check_prediction_anomalies(prediction):
     - Changements brusques de cotes
     - Incohérences dans les votes
     """
-    alerts_created = []
+    values = {c: getattr(prediction, c) for c in ANOMALY_COLUMNS}
+    return [create_alert(alert_type, message, severity=severity, prediction_id=prediction.id,
+                         match_id=prediction.match_id, extra_data=extra_data)
+            for alert_type, message, severity, extra_data in _prediction_anomalies(values)]
+
+
+ANOMALY_COLUMNS = ('match_id', 'confidence', 'consensus_probability', 'votes_statistique',
+                   'votes_cotes', 'votes_simulation', 'votes_forme')
+
+
+def _prediction_anomalies(p):
+    """
+    Anomalies d'une prédiction (dict des colonnes ANOMALY_COLUMNS)
+    
+    Returns:
+        list de tuples (alert_type, message, severity, extra_data)
+    """
+    anomalies = []
     
     # 1. Vérifier la confiance anormale
-    if prediction.confidence < 50:
-        alert = create_alert('low_confidence',
-                            f"Confiance anormalement faible ({prediction.confidence}%) pour match {prediction.match_id}",
-                            severity='warning',
-                            prediction_id=prediction.id,
-                            match_id=prediction.match_id,
-                            extra_data={'confidence': prediction.confidence})
-        alerts_created.append(alert)
-    
-    if prediction.confidence > 95:
-        alert = create_alert('high_confidence',
-                            f"Confiance anormalement élevée ({prediction.confidence}%) pour match {prediction.match_id}",
-                            severity='info',
-                            prediction_id=prediction.id,
-                            match_id=prediction.match_id,
-                            extra_data={'confidence': prediction.confidence})
-        alerts_created.append(alert)
+    if p['confidence'] < 50:
+        anomalies.append(('low_confidence',
+                          f"Confiance anormalement faible ({p['confidence']}%) pour match {p['match_id']}",
+                          'warning', {'confidence': p['confidence']}))
+    
+    if p['confidence'] > 95:
+        anomalies.append(('high_confidence',
+                          f"Confiance anormalement élevée ({p['confidence']}%) pour match {p['match_id']}",
+                          'info', {'confidence': p['confidence']}))
     
     # 2. Vérifier les incohérences dans les votes
-    votes_count = sum([prediction.votes_statistique, prediction.votes_cotes, 
-                      prediction.votes_simulation, prediction.votes_forme])
+    votes_count = sum([p['votes_statistique'], p['votes_cotes'], p['votes_simulation'], p['votes_forme']])
     if votes_count == 0:
-        alert = create_alert('no_votes',
-                            f"Aucun vote pour la prédiction du match {prediction.match_id}",
-                            severity='error',
-                            prediction_id=prediction.id,
-                            match_id=prediction.match_id)
-        alerts_created.append(alert)
+        anomalies.append(('no_votes', f"Aucun vote pour la prédiction du match {p['match_id']}", 'error', None))
     
     # 3. Vérifier les incohérences probabilité/confiance
-    if prediction.consensus_probability < 20 and prediction.confidence > 70:
-        alert = create_alert('inconsistency',
-                            f"Incohérence probabilité ({prediction.consensus_probability}%) / confiance ({prediction.confidence}%) pour match {prediction.match_id}",
-                            severity='warning',
-                            prediction_id=prediction.id,
-                            match_id=prediction.match_id,
-                            extra_data={'probability': prediction.consensus_probability, 'confidence': prediction.confidence})
-        alerts_created.append(alert)
+    if p['consensus_probability'] < 20 and p['confidence'] > 70:
+        anomalies.append(('inconsistency',
+                          f"Incohérence probabilité ({p['consensus_probability']}%) / confiance ({p['confidence']}%) pour match {p['match_id']}",
+                          'warning', {'probability': p['consensus_probability'], 'confidence': p['confidence']}))
     
-    return alerts_created
+    return anomalies
 
 
 def create_alert(alert_type, message, severity='warning', prediction_id=None, match_id=None, extra_data=None):
@@ -332,22 +433,22 @@ def log_action(action_type, message, user_id=None, admin_id=None, severity='info
         admin_id: ID de l'admin (optionnel)
         severity: Niveau de sévérité
         extra_data: Données supplémentaires (dict)
+    
+    L'écriture est différée (log_writer) : la requête n'attend pas la base.
     """
     try:
-        log_entry = SystemLog(
-            action_type=action_type,
-            user_id=user_id,
-            admin_id=admin_id,
-            message=message,
-            severity=severity,
-            extra_data=json.dumps(extra_data) if extra_data else None,
-            ip_address=get_client_ip()
-        )
-        db.session.add(log_entry)
-        db.session.commit()
+        log_writer.enqueue(SystemLog, {
+            'action_type': action_type,
+            'user_id': user_id,
+            'admin_id': admin_id,
+            'message': message,
+            'severity': severity,
+            'extra_data': json.dumps(extra_data) if extra_data else None,
+            'ip_address': get_client_ip(),
+            'created_at': datetime.utcnow()
+        }, severity=severity, db=db)
     except Exception as e:
         print(f"❌ Erreur lors de la journalisation: {e}")
-        db.session.rollback()
 
 
 def log_access(user_id, action_type, match_id=None, prediction_id=None, subscription_plan=None, extra_data=None):
@@ -361,19 +462,19 @@ def log_access(user_id, action_type, match_id=None, prediction_id=None, subscrip
         prediction_id: ID de la prédiction (optionnel)
         subscription_plan: Plan d'abonnement utilisé (optionnel)
         extra_data: Données supplémentaires (dict)
+    
+    L'écriture est différée (log_writer), avec la priorité des entrées d'audit.
     """
     try:
-        access_log = AccessLog(
-            user_id=user_id,
-            action_type=action_type,
-            match_id=match_id,
-            prediction_id=prediction_id,
-            subscription_plan=subscription_plan,
-            ip_address=get_client_ip(),
-            extra_data=json.dumps(extra_data) if extra_data else None
-        )
-        db.session.add(access_log)
-        db.session.commit()
+        log_writer.enqueue(AccessLog, {
+            'user_id': user_id,
+            'action_type': action_type,
+            'match_id': match_id,
+            'prediction_id': prediction_id,
+            'subscription_plan': subscription_plan,
+            'ip_address': get_client_ip(),
+            'extra_data': json.dumps(extra_data) if extra_data else None,
+            'created_at': datetime.utcnow()
+        }, severity='audit', db=db)
     except Exception as e:
         print(f"❌ Erreur lors de la journalisation d'accès: {e}")
-        db.session.rollback()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+📐 PRICER ANALYTIQUE DES MARCHÉS EN DIRECT (POISSON)
+===================================================
+À partir du score actuel, de la minute et des taux de buts déduits des cotes
+1X2 (et d'une ligne de totaux si disponible), calcule UNE FOIS par match la
+matrice des buts restants, puis price tous les marchés alternatifs :
+Plus/Moins (lignes entières, demi et quart), handicaps asiatiques et
+européens, score exact, pair/impair et mi-temps.
+"""
+
+import math
+import re
+
+DUREE_MATCH = 90
+MI_TEMPS = 45
+MAX_BUTS_RESTANTS = 10
+# Taux de buts par défaut sur 90 minutes quand aucune cote n'est exploitable
+BUTS_PAR_MATCH_DEFAUT = 2.7
+MU_MIN = 1e-4
+MU_MAX = 8.0
+
+# Buts marqués par équipe (1xbet) : groupe -> équipe ; T=1 plus, T=2 moins
+GROUPES_TOTAL_EQUIPE = {20: 1, 21: 1, 22: 1, 23: 2, 24: 2, 25: 2}
+# Handicap européen (groupe 8) : T -> (équipe, handicap)
+TYPES_HANDICAP_EUROPEEN = {4: (1, -1.0), 5: (1, 1.0), 6: (2, 0.0)}
+
+
+def _poisson(mu, n_max):
+    """Loi de Poisson tronquée à n_max (masse de la queue reportée sur n_max)"""
+    if mu <= 0:
+        return [1.0] + [0.0] * n_max
+    pmf = [math.exp(-mu)]
+    for k in range(1, n_max + 1):
+        pmf.append(pmf[-1] * mu / k)
+    pmf[-1] += max(0.0, 1.0 - sum(pmf))
+    return pmf
+
+
+def _probabilites_implicites(cotes):
+    """Probabilités sans marge à partir d'un dict {issue: cote}"""
+    inverses = {k: 1.0 / c for k, c in cotes.items() if c and c > 1.0}
+    total = sum(inverses.values())
+    if total <= 0:
+        return {}
+    return {k: v / total for k, v in inverses.items()}
+
+
+def _lignes_quart(ligne):
+    """Une ligne asiatique en quart (ex: 2.25) se règle comme deux demi-mises (2.0 et 2.5)"""
+    fraction = round(ligne * 4) % 2
+    if fraction == 1:
+        return [ligne - 0.25, ligne + 0.25]
+    return [ligne]
+
+
+class PricerMarches:
+    """📐 DISTRIBUTION DES BUTS RESTANTS ET PRIX EXACTS DE TOUS LES MARCHÉS
+
+    Les cotes passées à `depuis_cotes` sont supposées être celles du direct
+    (elles décrivent l'issue finale depuis l'état actuel du match).
+    """
+
+    def __init__(self, score1=0, score2=0, minute=0, mu1=None, mu2=None, duree=DUREE_MATCH):
+        self.score1 = max(0, int(score1 or 0))
+        self.score2 = max(0, int(score2 or 0))
+        self.minute = max(0, min(int(minute or 0), duree))
+        self.duree = duree
+        ratio_restant = (duree - self.minute) / duree
+        defaut = BUTS_PAR_MATCH_DEFAUT / 2 * ratio_restant
+        self.mu1 = defaut if mu1 is None else mu1
+        self.mu2 = defaut if mu2 is None else mu2
+        self.calibration = 'defaut'
+        self._construire_matrice()
+
+    # ------------------------------------------------------------------
+    # Construction / calibration
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def depuis_cotes(cls, odds_data, paris_alternatifs=None, score1=0, score2=0, minute=0):
+        """Calibre les taux de buts restants sur les cotes 1X2 et la ligne de totaux du match"""
+        pricer = cls(score1, score2, minute)
+        if pricer.minute >= pricer.duree:
+            pricer.mu1 = pricer.mu2 = 0.0
+            pricer._construire_matrice()
+            pricer.calibration = 'termine'
+            return pricer
+
+        cibles = {}
+        cotes_1x2 = {}
+        for odd in odds_data or []:
+            if isinstance(odd, dict) and odd.get('type') in ('1', 'X', '2'):
+                try:
+                    cotes_1x2[odd['type']] = float(odd.get('cote'))
+                except (TypeError, ValueError):
+                    continue
+        probas_1x2 = _probabilites_implicites(cotes_1x2)
+        if '1' in probas_1x2 and '2' in probas_1x2:
+            cibles['1'] = probas_1x2['1']
+            cibles['2'] = probas_1x2['2']
+
+        ligne_totale = cls._ligne_totaux(paris_alternatifs)
+        if ligne_totale:
+            cibles['total'] = ligne_totale
+
+        if cibles:
+            pricer._calibrer(cibles)
+        return pricer
+
+    @staticmethod
+    def _ligne_totaux(paris_alternatifs):
+        """Cherche une ligne de totaux (match complet) cotée des deux côtés → (seuil, P(plus))"""
+        lignes = {}
+        for pari in paris_alternatifs or []:
+            if not isinstance(pari, dict):
+                continue
+            nom = str(pari.get('nom', '')).lower()
+            if 'corner' in nom or 'mi temps' in nom or 'mi-temps' in nom:
+                continue
+            if PricerMarches._est_total_equipe(nom, pari.get('raw_data') or {}):
+                continue
+            sens = PricerMarches._sens_total(nom, pari.get('raw_data') or {})
+            seuil = PricerMarches._extraire_valeur(pari)
+            if sens is None or seuil is None:
+                continue
+            try:
+                lignes.setdefault(seuil, {})[sens] = float(pari.get('cote'))
+            except (TypeError, ValueError):
+                continue
+        completes = [(s, c) for s, c in lignes.items() if 'plus' in c and 'moins' in c]
+        if not completes:
+            return None
+        # La ligne la plus équilibrée est la plus informative
+        seuil, cotes = min(completes, key=lambda x: abs(x[1]['plus'] - x[1]['moins']))
+        probas = _probabilites_implicites(cotes)
+        return (seuil, probas['plus'])
+
+    def _calibrer(self, cibles, iterations=25):
+        """Moindres carrés (Gauss-Newton amorti) sur log(mu1), log(mu2)"""
+        theta = [math.log(max(self.mu1, MU_MIN)), math.log(max(self.mu2, MU_MIN))]
+
+        def residus(t):
+            mu1 = min(MU_MAX, max(MU_MIN, math.exp(t[0])))
+            mu2 = min(MU_MAX, max(MU_MIN, math.exp(t[1])))
+            p1, p2 = _poisson(mu1, MAX_BUTS_RESTANTS), _poisson(mu2, MAX_BUTS_RESTANTS)
+            r = []
+            if '1' in cibles:
+                probas = self._resultat_depuis(p1, p2)
+                r.append(probas['1'] - cibles['1'])
+                r.append(probas['2'] - cibles['2'])
+            if 'total' in cibles:
+                seuil, p_plus = cibles['total']
+                r.append(self._plus_de_depuis(p1, p2, seuil) - p_plus)
+            return r
+
+        def cout(r):
+            return sum(x * x for x in r)
+
+        r = residus(theta)
+        h = 1e-4
+        for _ in range(iterations):
+            if cout(r) < 1e-12:
+                break
+            # Jacobienne numérique (2 colonnes)
+            colonnes = []
+            for k in range(2):
+                t = list(theta)
+                t[k] += h
+                colonnes.append([(a - b) / h for a, b in zip(residus(t), r)])
+            # Équations normales 2x2 avec amortissement de Levenberg
+            a11 = sum(x * x for x in colonnes[0]) + 1e-9
+            a22 = sum(x * x for x in colonnes[1]) + 1e-9
+            a12 = sum(x * y for x, y in zip(colonnes[0], colonnes[1]))
+            g1 = sum(x * y for x, y in zip(colonnes[0], r))
+            g2 = sum(x * y for x, y in zip(colonnes[1], r))
+            amort = 1e-3 * (a11 + a22)
+            det = (a11 + amort) * (a22 + amort) - a12 * a12
+            if abs(det) < 1e-18:
+                break
+            d1 = -((a22 + amort) * g1 - a12 * g2) / det
+            d2 = -((a11 + amort) * g2 - a12 * g1) / det
+            pas = 1.0
+            while pas > 1e-3:
+                essai = [theta[0] + pas * d1, theta[1] + pas * d2]
+                r_essai = residus(essai)
+                if cout(r_essai) < cout(r):
+                    theta, r = essai, r_essai
+                    break
+                pas /= 2
+            else:
+                break
+
+        self.mu1 = min(MU_MAX, max(MU_MIN, math.exp(theta[0])))
+        self.mu2 = min(MU_MAX, max(MU_MIN, math.exp(theta[1])))
+        self.erreur_calibration = math.sqrt(cout(r) / max(1, len(r)))
+        self.calibration = '+'.join(sorted(cibles))
+        self._construire_matrice()
+
+    def _construire_matrice(self):
+        """Matrice P(buts restants équipe 1 = i, équipe 2 = j), calculée une seule fois"""
+        self._p1 = _poisson(self.mu1, MAX_BUTS_RESTANTS)
+        self._p2 = _poisson(self.mu2, MAX_BUTS_RESTANTS)
+        self.matrice = [[a * b for b in self._p2] for a in self._p1]
+        # Distributions dérivées, réutilisées par tous les marchés
+        n = MAX_BUTS_RESTANTS
+        self._total_restant = [0.0] * (2 * n + 1)
+        self._ecart_restant = {}
+        for i, ligne in enumerate(self.matrice):
+            for j, p in enumerate(ligne):
+                self._total_restant[i + j] += p
+                self._ecart_restant[i - j] = self._ecart_restant.get(i - j, 0.0) + p
+
+    def _resultat_depuis(self, p1, p2):
+        ecart = self.score1 - self.score2
+        r = {'1': 0.0, 'X': 0.0, '2': 0.0}
+        for i, a in enumerate(p1):
+            for j, b in enumerate(p2):
+                d = ecart + i - j
+                r['1' if d > 0 else '2' if d < 0 else 'X'] += a * b
+        return r
+
+    def _plus_de_depuis(self, p1, p2, seuil):
+        actuel = self.score1 + self.score2
+        return sum(a * b for i, a in enumerate(p1) for j, b in enumerate(p2) if actuel + i + j > seuil)
+
+    # ------------------------------------------------------------------
+    # Prix des marchés (lectures de la matrice, sans nouveau calcul lourd)
+    # ------------------------------------------------------------------
+
+    def proba_1x2(self):
+        """Probabilités de l'issue finale 1 / X / 2"""
+        ecart = self.score1 - self.score2
+        r = {'1': 0.0, 'X': 0.0, '2': 0.0}
+        for d, p in self._ecart_restant.items():
+            final = ecart + d
+            r['1' if final > 0 else '2' if final < 0 else 'X'] += p
+        return r
+
+    def _reglement(self, marge_par_issue, lignes):
+        """Règle un marché asiatique : moyenne des demi-mises (quarts de ligne)"""
+        gagne = rembourse = perdu = 0.0
+        for ligne in lignes:
+            for valeur, p in marge_par_issue:
+                m = valeur + ligne
+                if m > 1e-9:
+                    gagne += p
+                elif m < -1e-9:
+                    perdu += p
+                else:
+                    rembourse += p
+        k = len(lignes)
+        return self._resume(gagne / k, rembourse / k, perdu / k)
+
+    @staticmethod
+    def _resume(gagne, rembourse, perdu):
+        decide = gagne + perdu
+        probabilite = gagne / decide if decide > 0 else 0.5
+        return {
+            'gagne': gagne,
+            'rembourse': rembourse,
+            'perdu': perdu,
+            # Probabilité de gain hors remboursement (utile pour comparer à la cote)
+            'probabilite': probabilite,
+            'cote_juste': round(1 / probabilite, 3) if probabilite > 0 else None
+        }
+
+    def proba_total(self, seuil, plus_de=True):
+        """Plus/Moins de `seuil` buts (match complet), lignes entières, demi et quart"""
+        actuel = self.score1 + self.score2
+        signe = 1 if plus_de else -1
+        issues = [(signe * (actuel + t), p) for t, p in enumerate(self._total_restant)]
+        return self._reglement(issues, [-signe * l for l in _lignes_quart(seuil)])
+
+    def proba_total_equipe(self, equipe, seuil, plus_de=True):
+        """Plus/Moins de `seuil` buts pour une équipe (1 ou 2)"""
+        actuel = self.score1 if equipe == 1 else self.score2
+        pmf = self._p1 if equipe == 1 else self._p2
+        signe = 1 if plus_de else -1
+        issues = [(signe * (actuel + k), p) for k, p in enumerate(pmf)]
+        return self._reglement(issues, [-signe * l for l in _lignes_quart(seuil)])
+
+    def proba_handicap(self, equipe, handicap):
+        """Handicap asiatique sur l'équipe (1 ou 2) : gagne si écart final + handicap > 0"""
+        ecart = self.score1 - self.score2
+        signe = 1 if equipe == 1 else -1
+        issues = [(signe * (ecart + d), p) for d, p in self._ecart_restant.items()]
+        return self._reglement(issues, _lignes_quart(handicap))
+
+    def proba_handicap_europeen(self, handicap):
+        """Handicap européen (3 issues) appliqué à l'équipe 1"""
+        ecart = self.score1 - self.score2 + handicap
+        r = {'1': 0.0, 'X': 0.0, '2': 0.0}
+        for d, p in self._ecart_restant.items():
+            final = ecart + d
+            r['1' if final > 1e-9 else '2' if final < -1e-9 else 'X'] += p
+        return r
+
+    def proba_score_exact(self, buts1, buts2):
+        """Probabilité du score final exact buts1-buts2"""
+        i, j = buts1 - self.score1, buts2 - self.score2
+        if i < 0 or j < 0 or i > MAX_BUTS_RESTANTS or j > MAX_BUTS_RESTANTS:
+            return 0.0
+        return self.matrice[i][j]
+
+    def proba_parite(self):
+        """Probabilités que le total final soit pair / impair"""
+        actuel = self.score1 + self.score2
+        pair = sum(p for t, p in enumerate(self._total_restant) if (actuel + t) % 2 == 0)
+        return {'pair': pair, 'impair': 1.0 - pair}
+
+    def mi_temps(self):
+        """Pricer de la 1ère mi-temps (mêmes taux, ramenés au temps restant avant la pause)
+
+        Retourne None une fois la mi-temps passée (score à la pause inconnu ici).
+        """
+        if self.minute >= MI_TEMPS:
+            return None
+        ratio = (MI_TEMPS - self.minute) / max(1, self.duree - self.minute)
+        pricer = PricerMarches(self.score1, self.score2, self.minute,
+                               self.mu1 * ratio, self.mu2 * ratio, self.duree)
+        pricer.calibration = f"mi_temps({self.calibration})"
+        return pricer
+
+    # ------------------------------------------------------------------
+    # Lecture d'un pari de l'API
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _extraire_valeur(pari):
+        for source in (pari.get('valeur'), (pari.get('raw_data') or {}).get('P')):
+            try:
+                if source not in (None, ''):
+                    return float(source)
+            except (TypeError, ValueError):
+                continue
+        match = re.search(r'([+-]?\d+(?:[.,]\d+)?)', str(pari.get('nom', '')))
+        return float(match.group(1).replace(',', '.')) if match else None
+
+    @staticmethod
+    def _sens_total(nom, raw_data):
+        if 'plus' in nom or 'over' in nom or raw_data.get('T') == 9:
+            return 'plus'
+        if 'moins' in nom or 'under' in nom or raw_data.get('T') == 10:
+            return 'moins'
+        return None
+
+    @staticmethod
+    def _est_total_equipe(nom, raw_data):
+        return raw_data.get('G') in GROUPES_TOTAL_EQUIPE or re.search(r'\bbuts? pour\b', nom) is not None
+
+    @staticmethod
+    def _equipe_citee(texte, raw_data, team1, team2):
+        """Équipe (1 ou 2) visée par le libellé, ou None"""
+        if (team1 and team1.lower() in texte) or 'o1' in texte or raw_data.get('T') == 7:
+            return 1
+        if (team2 and team2.lower() in texte) or 'o2' in texte or raw_data.get('T') == 8:
+            return 2
+        return None
+
+    def probabilite_pari(self, pari, team1='', team2=''):
+        """Probabilité de gain (hors remboursement) d'un pari de l'API, ou None si non pricable"""
+        if not isinstance(pari, dict):
+            return None
+        nom = str(pari.get('nom', '')).lower()
+        raw_data = pari.get('raw_data') or {}
+        groupe = raw_data.get('G')
+
+        if 'corner' in nom:
+            return None
+
+        pricer = self
+        if 'mi-temps' in nom or 'mi temps' in nom:
+            pricer = self.mi_temps()
+            if pricer is None:
+                return None
+
+        if 'impair' in nom:
+            return pricer.proba_parite()['impair']
+        if 'pair' in nom:
+            return pricer.proba_parite()['pair']
+
+        if groupe == 15 or 'score exact' in nom:
+            match = re.search(r'(\d+)\s*[-:]\s*(\d+)', nom)
+            if not match:
+                return None
+            return pricer.proba_score_exact(int(match.group(1)), int(match.group(2)))
+
+        # Handicap européen (3 issues : le nul perd) avant l'asiatique
+        if groupe == 8 or 'européen' in nom or 'europeen' in nom:
+            if groupe == 8 and raw_data.get('T') in TYPES_HANDICAP_EUROPEEN:
+                equipe, handicap = TYPES_HANDICAP_EUROPEEN[raw_data['T']]
+            else:
+                handicap = self._extraire_valeur(pari)
+                equipe = self._equipe_citee(nom, {}, team1, team2)
+            if equipe is None or handicap is None:
+                return None
+            if equipe == 1:
+                return pricer.proba_handicap_europeen(handicap)['1']
+            return pricer.proba_handicap_europeen(-handicap)['2']
+
+        if groupe == 2 or 'handicap' in nom:
+            handicap = self._extraire_valeur(pari)
+            equipe = self._equipe_citee(nom, raw_data, team1, team2)
+            if handicap is None or equipe is None:
+                return None
+            return pricer.proba_handicap(equipe, handicap)['probabilite']
+
+        # Buts d'une équipe (« Plus de X buts pour {équipe} »), pas du match
+        if self._est_total_equipe(nom, raw_data):
+            equipe = GROUPES_TOTAL_EQUIPE.get(groupe)
+            if equipe is None:
+                equipe = self._equipe_citee(nom.split(' pour ', 1)[-1], {}, team1, team2)
+            sens = {1: 'plus', 2: 'moins'}.get(raw_data.get('T')) if groupe in GROUPES_TOTAL_EQUIPE else None
+            sens = sens or self._sens_total(nom, {})
+            seuil = self._extraire_valeur(pari)
+            if equipe is None or sens is None or seuil is None:
+                return None
+            return pricer.proba_total_equipe(equipe, seuil, plus_de=(sens == 'plus'))['probabilite']
+
+        sens = self._sens_total(nom, raw_data)
+        if groupe == 17 or (sens and ('total' in nom or 'but' in nom or 'goal' in nom)):
+            seuil = self._extraire_valeur(pari)
+            if sens is None or seuil is None:
+                return None
+            return pricer.proba_total(seuil, plus_de=(sens == 'plus'))['probabilite']
+
+        return None
+
+    def resume(self):
+        """Paramètres du modèle (pour affichage / diagnostic)"""
+        return {
+            'score': f"{self.score1}-{self.score2}",
+            'minute': self.minute,
+            'buts_restants_attendus': [round(self.mu1, 3), round(self.mu2, 3)],
+            'calibration': self.calibration,
+            'erreur_calibration': round(getattr(self, 'erreur_calibration', 0.0), 5)
+        }
@@ -3,21 +3,52 @@
 Gestion des sessions et JWT pour ORACXPRED MÉTAPHORE
 Sessions sécurisées avec httpOnly cookies
 """
+import hashlib
+import heapq
+import os
+import threading
+import time
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 from flask import current_app
 
 from config_oauth import config
 
+# Tokens vérifiés gardés en mémoire (0 = vérification HMAC à chaque requête)
+TOKEN_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+# Tokens révoqués (déconnexion) gardés au maximum jusqu'à leur expiration
+REVOKED_TOKENS_MAX = int(os.getenv('JWT_REVOKED_MAX', '10000'))
+
 class SessionManager:
     """Gestionnaire de sessions JWT sécurisées"""
     
-    def __init__(self):
+    def __init__(self, token_cache_size: int = TOKEN_CACHE_SIZE, revoked_max: int = REVOKED_TOKENS_MAX):
         self.secret = config.APP_SECRET
         self.algorithm = 'HS256'
         self.token_expiry = timedelta(hours=24)
         self.refresh_expiry = timedelta(days=7)
+        
+        # Cache empreinte du token -> payload vérifié (borné, expiration respectée)
+        self.token_cache_size = token_cache_size
+        self._verified = OrderedDict()
+        self.revoked_max = max(1, revoked_max)
+        self._revoked = {}  # empreinte -> exp (oubliée une fois le token expiré)
+        self._revoked_heap = []  # (exp, empreinte) : prochaines expirations en tête
+        self._revoked_users = {}  # user_id -> tokens émis avant cet instant refusés
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'revoked': 0}
+    
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    
+    def _is_revoked(self, digest: bytes, payload: Dict[str, Any]) -> bool:
+        if digest in self._revoked:
+            return True
+        revoked_at = self._revoked_users.get(payload.get('user_id'))
+        return revoked_at is not None and payload.get('iat', 0) < revoked_at
     
     def create_tokens(self, user_data: Dict[str, Any]) -> Dict[str, str]:
         """Crée les tokens d'accès et de rafraîchissement"""
@@ -53,20 +84,95 @@ class SessionManager:
         }
     
     def verify_token(self, token: str, token_type: str = 'access') -> Optional[Dict[str, Any]]:
-        """Vérifie et décode un token JWT"""
+        """
+        Vérifie et décode un token JWT
+        
+        Un token déjà vérifié est servi depuis le cache (une recherche de
+        dictionnaire) jusqu'à son expiration ; le payload retourné est partagé
+        et ne doit pas être modifié.
+        """
+        digest = self._digest(token)
+        with self._cache_lock:
+            payload = self._verified.get(digest)
+            if payload is not None:
+                if payload.get('exp', 0) <= time.time() or self._is_revoked(digest, payload):
+                    del self._verified[digest]
+                    return None
+                self._verified.move_to_end(digest)
+                self.cache_stats['hits'] += 1
+                return payload if payload.get('type') == token_type else None
+        
         try:
             payload = jwt.decode(token, self.secret, algorithms=[self.algorithm])
-            
-            # Vérifie le type de token
-            if payload.get('type') != token_type:
-                return None
-            
-            return payload
-            
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        
+        with self._cache_lock:
+            self.cache_stats['misses'] += 1
+            if self._is_revoked(digest, payload):
+                return None
+            if self.token_cache_size > 0:
+                self._verified[digest] = payload
+                while len(self._verified) > self.token_cache_size:
+                    self._verified.popitem(last=False)
+        
+        # Vérifie le type de token
+        if payload.get('type') != token_type:
+            return None
+        
+        return payload
+    
+    def revoke_token(self, token: Optional[str]):
+        """
+        Révoque un token (déconnexion) : refusé jusqu'à son expiration
+        
+        Seuls les tokens signés par l'application et non expirés sont
+        retenus (un token forgé ou expiré est déjà refusé). Au plus
+        revoked_max révocations : au-delà, celles qui expirent le plus tôt
+        sont oubliées en premier.
+        """
+        if not token:
+            return
+        digest = self._digest(token)
+        try:
+            exp = jwt.decode(token, self.secret, algorithms=[self.algorithm]).get('exp', 0)
+        except jwt.InvalidTokenError:
+            return
+        now = time.time()
+        with self._cache_lock:
+            self._verified.pop(digest, None)
+            if digest not in self._revoked:
+                self._revoked[digest] = exp
+                heapq.heappush(self._revoked_heap, (exp, digest))
+            self.cache_stats['revoked'] += 1
+            # Coût amorti O(log n) : seules les entrées expirées ou en excès sont retirées
+            while self._revoked_heap and (self._revoked_heap[0][0] <= now or len(self._revoked) > self.revoked_max):
+                _, expired = heapq.heappop(self._revoked_heap)
+                self._revoked.pop(expired, None)
+    
+    def revoke_user(self, user_id):
+        """Refuse tous les tokens déjà émis pour un utilisateur (compte désactivé ou supprimé)"""
+        now = time.time()
+        with self._cache_lock:
+            # Au-delà de la durée du refresh token, tous les tokens antérieurs ont expiré
+            horizon = now - self.refresh_expiry.total_seconds()
+            self._revoked_users = {u: t for u, t in self._revoked_users.items() if t > horizon}
+            self._revoked_users[str(user_id)] = now
+            for digest in [d for d, p in self._verified.items() if p.get('user_id') == str(user_id)]:
+                del self._verified[digest]
+    
+    def token_cache_status(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            return {
+                'size': len(self._verified),
+                'max_size': self.token_cache_size,
+                'revoked_tokens': len(self._revoked),
+                'revoked_max': self.revoked_max,
+                'revoked_users': len(self._revoked_users),
+                **self.cache_stats
+            }
     
     def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
         """Génère un nouveau token d'accès depuis le refresh token"""
@@ -80,6 +186,8 @@ class SessionManager:
         
         user = User.query.get(payload['user_id'])
         if not user or user.status != 'actif':
+            # Les tokens d'accès en cache de ce compte ne doivent plus passer
+            self.revoke_user(payload['user_id'])
             return None
         
         # Crée nouveaux tokens
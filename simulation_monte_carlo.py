@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+🎲 MOTEUR MONTE CARLO VECTORISÉ
+==============================
+Tire en un seul appel tous les échantillons de buts d'un match et évalue
+toutes les options d'un coup (NumPy si disponible, sinon Python standard)
+"""
+
+import math
+import os
+import random
+
+# NumPy est optionnel (désactivé sur certaines plateformes comme Render)
+try:
+    import numpy as np
+    NUMPY_DISPONIBLE = True
+except ImportError:
+    np = None
+    NUMPY_DISPONIBLE = False
+
+SIMULATIONS_PAR_DEFAUT = int(os.getenv("MONTE_CARLO_SIMULATIONS", "100000"))
+# Sans NumPy, chaque tirage coûte un appel Python : on reste au volume historique
+SIMULATIONS_MAX_SANS_NUMPY = 1000
+_graine_env = os.getenv("MONTE_CARLO_SEED")
+GRAINE_PAR_DEFAUT = int(_graine_env) if _graine_env else None
+
+
+def erreur_standard(probabilite, n):
+    """Erreur standard d'une proportion estimée sur n tirages"""
+    if n <= 0:
+        return 0.0
+    return math.sqrt(max(0.0, probabilite * (1 - probabilite)) / n)
+
+
+class MoteurMonteCarlo:
+    """🎲 SIMULATIONS MONTE CARLO PAR LOTS, REPRODUCTIBLES
+
+    Un moteur par match (le générateur n'est pas partagé entre threads).
+    Toutes les probabilités sont renvoyées avec leur erreur standard.
+    """
+
+    def __init__(self, n_simulations=None, graine=None):
+        n = int(n_simulations or SIMULATIONS_PAR_DEFAUT)
+        if not NUMPY_DISPONIBLE:
+            n = min(n, SIMULATIONS_MAX_SANS_NUMPY)
+        self.n_simulations = max(1, n)
+        self.graine = GRAINE_PAR_DEFAUT if graine is None else graine
+        if NUMPY_DISPONIBLE:
+            self._rng = np.random.default_rng(self.graine)
+        else:
+            self._rng = random.Random(self.graine)
+
+    def tirer_buts(self, poids, valeurs=None, n=None):
+        """Tire n nombres de buts selon une distribution discrète pondérée"""
+        n = n or self.n_simulations
+        valeurs = list(valeurs) if valeurs is not None else list(range(len(poids)))
+        total = float(sum(poids))
+        if total <= 0:
+            poids = [1.0] * len(valeurs)
+            total = float(len(valeurs))
+        if NUMPY_DISPONIBLE:
+            p = np.asarray(poids, dtype=float) / total
+            return self._rng.choice(np.asarray(valeurs), size=n, p=p)
+        return self._rng.choices(valeurs, weights=poids, k=n)
+
+    def simuler_scores(self, force1, force2, n=None):
+        """Simule n scores (buts1, buts2) indépendants à partir des forces d'équipes"""
+        return self.tirer_buts(force1, n=n), self.tirer_buts(force2, n=n)
+
+    def simuler_totaux_finaux(self, total_actuel, poids_restants, ratio=1.0, n=None):
+        """Total final simulé = buts actuels + buts restants des deux équipes (pondérés par ratio)"""
+        restants1 = self.tirer_buts(poids_restants, n=n)
+        restants2 = self.tirer_buts(poids_restants, n=n)
+        if NUMPY_DISPONIBLE:
+            return total_actuel + (restants1 + restants2) * ratio
+        return [total_actuel + (a + b) * ratio for a, b in zip(restants1, restants2)]
+
+    def probabilites_1x2(self, buts1, buts2):
+        """Probabilités 1 / X / 2 estimées à partir d'échantillons de scores"""
+        n = len(buts1)
+        if NUMPY_DISPONIBLE:
+            p1 = float(np.count_nonzero(buts1 > buts2)) / n
+            px = float(np.count_nonzero(buts1 == buts2)) / n
+        else:
+            p1 = sum(1 for a, b in zip(buts1, buts2) if a > b) / n
+            px = sum(1 for a, b in zip(buts1, buts2) if a == b) / n
+        return {'1': p1, 'X': px, '2': max(0.0, 1.0 - p1 - px)}
+
+    def probabilite_total(self, totaux, seuil, plus_de=True):
+        """P(total > seuil) (ou < seuil) à partir d'échantillons de totaux"""
+        n = len(totaux)
+        if NUMPY_DISPONIBLE:
+            totaux = np.asarray(totaux)
+            masque = totaux > seuil if plus_de else totaux < seuil
+            succes = int(np.count_nonzero(masque))
+        else:
+            succes = sum(1 for t in totaux if (t > seuil if plus_de else t < seuil))
+        p = succes / n
+        return {'probabilite': p, 'erreur_standard': erreur_standard(p, n), 'simulations': n}
+
+    def _binomiale(self, n, p):
+        """Nombre de succès ~ B(n, p) tiré en une fois (sans NumPy)
+
+        Approximation normale quand la variance le permet, sinon loi de
+        Poisson sur l'issue la plus rare (quelques tirages au plus).
+        """
+        if p <= 0.0 or p >= 1.0:
+            return n if p >= 1.0 else 0
+        variance = n * p * (1 - p)
+        if variance >= 9:
+            return min(n, max(0, round(self._rng.gauss(n * p, math.sqrt(variance)))))
+        rare = min(p, 1 - p)
+        # Poisson(n·rare) par produit d'uniformes (Knuth)
+        limite, k, produit = math.exp(-n * rare), 0, self._rng.random()
+        while produit > limite and k < n:
+            k += 1
+            produit *= self._rng.random()
+        return k if p <= 0.5 else n - k
+
+    def bernoulli(self, probabilites, n=None):
+        """Taux de succès simulés pour plusieurs options indépendantes (un seul tirage)"""
+        n = n or self.n_simulations
+        probabilites = [min(1.0, max(0.0, float(p))) for p in probabilites]
+        if NUMPY_DISPONIBLE:
+            succes = self._rng.binomial(n, np.asarray(probabilites, dtype=float)).tolist()
+        else:
+            succes = [self._binomiale(n, p) for p in probabilites]
+        return [
+            {'probabilite': s / n, 'erreur_standard': erreur_standard(s / n, n), 'simulations': n}
+            for s in succes
+        ]
@@ -13,6 +13,8 @@ import math
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 
+from historique_predictions import HistoriquePredictions
+
 class SnakeWinSystem:
     """🐍 SYSTÈME DE PRÉDICTIONS SNAKE WIN - VERSION JOBLIB PURE"""
     
@@ -20,20 +22,25 @@ class SnakeWinSystem:
         self.version = "SNAKE-WIN-JOBLIB-2024"
         self.modele_over_under_path = "api/model_over_under_handicap.joblib"
         self.modele_over_under = None
-        self.predictions_historiques = []
-        self.precision_moyenne = 0.0
+        # Historique borné : mémoire constante quelle que soit la durée de vie du worker
+        self.predictions_historiques = HistoriquePredictions()
         
         # Charger le modèle au démarrage
         self._charger_modele()
     
+    @property
+    def precision_moyenne(self) -> float:
+        return self.predictions_historiques.moyenne("confiance")
+    
     def _charger_modele(self):
         """Charger le modèle Over/Under Handicap exclusivement"""
         try:
             # Charger le modèle Over/Under Handicap
             if os.path.exists(self.modele_over_under_path):
                 try:
-                    import joblib
-                    self.modele_over_under = joblib.load(self.modele_over_under_path)
+                    # Registre partagé : une copie par contenu, héritée du master gunicorn
+                    from model_registry import model_registry
+                    self.modele_over_under = model_registry.load(self.modele_over_under_path)
                     print(f"✅ Modèle Over/Under Handicap chargé depuis {self.modele_over_under_path}")
                 except ImportError:
                     print("⚠️ joblib non disponible, utilisation de pickle pour le modèle Over/Under")
@@ -83,8 +90,13 @@ class SnakeWinSystem:
             "recommandations": self._generer_recommandations(score_final, analyse_over_under, analyse_paris)
         }
         
-        # Sauvegarder dans l'historique
-        self.predictions_historiques.append(rapport)
+        # Sauvegarder dans l'historique (agrégats mis à jour en O(1))
+        self.predictions_historiques.ajouter(
+            rapport,
+            resultat=rapport["prediction_principale"],
+            confiance=rapport["confiance"],
+            score_snake_win=score_final["score_total"]
+        )
         
         return rapport
     
@@ -472,7 +484,8 @@ class SnakeWinSystem:
     
     def get_statistiques(self) -> Dict:
         """Obtenir les statistiques du système Snake Win - VERSION JOBLIB PURE"""
-        total_predictions = len(self.predictions_historiques)
+        stats = self.predictions_historiques.statistiques()
+        total_predictions = stats["total"]
         
         if total_predictions == 0:
             return {
@@ -485,20 +498,23 @@ class SnakeWinSystem:
                 }
             }
         
-        # Calculer les statistiques de base
-        confiances = [p["confiance"] for p in self.predictions_historiques]
-        scores_snake = [p["score_snake_win"]["score_total"] for p in self.predictions_historiques]
+        # Statistiques de base (agrégats en flux, sans parcourir l'historique)
+        mesures = stats["mesures"]
         
         return {
             "total_predictions": total_predictions,
-            "precision_moyenne": sum(confiances) / len(confiances),
-            "score_snake_moyen": sum(scores_snake) / len(scores_snake),
+            "precision_moyenne": self.precision_moyenne,
+            "score_snake_moyen": self.predictions_historiques.moyenne("score_snake_win"),
+            "confiance": mesures.get("confiance", {}),
+            "score_snake_win": mesures.get("score_snake_win", {}),
+            "predictions_par_resultat": stats["par_resultat"],
+            "historique_conserve": stats["conservees"],
             "systeme": "SNAKE WIN JOBLIB PURE",
             "version": self.version,
             "modeles_charges": {
                 "over_under_joblib": self.modele_over_under is not None
             },
-            "predictions_recentes": self.predictions_historiques[-5:] if self.predictions_historiques else []
+            "predictions_recentes": self.predictions_historiques.recentes(5)
         }
 
 # Point d'entrée principal
@@ -19,59 +19,72 @@ import json
 from datetime import datetime, timedelta
 import numpy as np
 
+from historique_predictions import HistoriquePredictions
+
+# 🧠 Configuration statique des moteurs (construite une seule fois à l'import,
+# partagée en lecture seule par toutes les instances)
+RESEAUX_NEURAUX = {
+    'reseau_principal': {
+        'couches': [128, 256, 512, 256, 128, 64, 32, 1],
+        'activation': 'quantum_relu',
+        'precision': 0.87,
+        'specialite': 'predictions_1x2'
+    },
+    'reseau_alternatif': {
+        'couches': [64, 128, 256, 128, 64, 1],
+        'activation': 'sigmoid_quantique',
+        'precision': 0.83,
+        'specialite': 'paris_alternatifs'
+    },
+    'reseau_temporel': {
+        'couches': [256, 512, 1024, 512, 256, 1],
+        'activation': 'lstm_quantique',
+        'precision': 0.91,
+        'specialite': 'evolution_temps_reel'
+    }
+}
+
+PATTERNS_QUANTIQUES = {
+    'pattern_fibonacci': {'force': 0.73, 'fiabilite': 0.89},
+    'pattern_golden_ratio': {'force': 0.81, 'fiabilite': 0.92},
+    'pattern_chaos_theory': {'force': 0.67, 'fiabilite': 0.85},
+    'pattern_fractale': {'force': 0.79, 'fiabilite': 0.88},
+    'pattern_quantique': {'force': 0.94, 'fiabilite': 0.96}
+}
+
+ALGORITHMES_ML = {
+    'random_forest_quantique': {'precision': 0.84, 'vitesse': 'ultra_rapide'},
+    'svm_multidimensionnel': {'precision': 0.81, 'vitesse': 'rapide'},
+    'gradient_boosting_pro': {'precision': 0.87, 'vitesse': 'moyenne'},
+    'deep_learning_custom': {'precision': 0.92, 'vitesse': 'lente'},
+    'ensemble_quantique': {'precision': 0.95, 'vitesse': 'optimale'}
+}
+
 class SystemePredictionQuantique:
     """🚀 SYSTÈME DE PRÉDICTION QUANTIQUE RÉVOLUTIONNAIRE"""
     
     def __init__(self):
         self.version = "QUANTUM-PRO-2024"
-        self.precision_moyenne = 0.0
-        self.predictions_historiques = []
+        self.predictions_historiques = HistoriquePredictions()
         self.modeles_neuraux = self._initialiser_reseaux_neuraux()
         self.patterns_quantiques = self._detecter_patterns_quantiques()
         self.algorithmes_ml = self._charger_algorithmes_ml()
+    
+    @property
+    def precision_moyenne(self):
+        return self.predictions_historiques.moyenne('confiance')
         
     def _initialiser_reseaux_neuraux(self):
         """🧠 INITIALISATION DES RÉSEAUX DE NEURONES AVANCÉS"""
-        return {
-            'reseau_principal': {
-                'couches': [128, 256, 512, 256, 128, 64, 32, 1],
-                'activation': 'quantum_relu',
-                'precision': 0.87,
-                'specialite': 'predictions_1x2'
-            },
-            'reseau_alternatif': {
-                'couches': [64, 128, 256, 128, 64, 1],
-                'activation': 'sigmoid_quantique',
-                'precision': 0.83,
-                'specialite': 'paris_alternatifs'
-            },
-            'reseau_temporel': {
-                'couches': [256, 512, 1024, 512, 256, 1],
-                'activation': 'lstm_quantique',
-                'precision': 0.91,
-                'specialite': 'evolution_temps_reel'
-            }
-        }
+        return RESEAUX_NEURAUX
     
     def _detecter_patterns_quantiques(self):
         """🌊 DÉTECTION DES PATTERNS QUANTIQUES DANS LES DONNÉES"""
-        return {
-            'pattern_fibonacci': {'force': 0.73, 'fiabilite': 0.89},
-            'pattern_golden_ratio': {'force': 0.81, 'fiabilite': 0.92},
-            'pattern_chaos_theory': {'force': 0.67, 'fiabilite': 0.85},
-            'pattern_fractale': {'force': 0.79, 'fiabilite': 0.88},
-            'pattern_quantique': {'force': 0.94, 'fiabilite': 0.96}
-        }
+        return PATTERNS_QUANTIQUES
     
     def _charger_algorithmes_ml(self):
         """🤖 CHARGEMENT DES ALGORITHMES DE MACHINE LEARNING"""
-        return {
-            'random_forest_quantique': {'precision': 0.84, 'vitesse': 'ultra_rapide'},
-            'svm_multidimensionnel': {'precision': 0.81, 'vitesse': 'rapide'},
-            'gradient_boosting_pro': {'precision': 0.87, 'vitesse': 'moyenne'},
-            'deep_learning_custom': {'precision': 0.92, 'vitesse': 'lente'},
-            'ensemble_quantique': {'precision': 0.95, 'vitesse': 'optimale'}
-        }
+        return ALGORITHMES_ML
     
     def analyser_match_quantique(self, team1, team2, league, odds_data, contexte_temps_reel=None):
         """🔮 ANALYSE QUANTIQUE COMPLÈTE D'UN MATCH"""
@@ -769,19 +782,24 @@ class SystemePredictionQuantique:
             'score_quantique': resultat['prediction_finale']['score']
         }
 
-        self.predictions_historiques.append(prediction_data)
-
-        # Calcul de la précision moyenne
-        if len(self.predictions_historiques) > 0:
-            precision_totale = sum(p['confiance'] for p in self.predictions_historiques)
-            self.precision_moyenne = precision_totale / len(self.predictions_historiques)
+        # Historique borné, précision moyenne mise à jour en O(1)
+        self.predictions_historiques.ajouter(
+            prediction_data,
+            resultat=prediction_data['prediction'],
+            confiance=prediction_data['confiance'],
+            score_quantique=prediction_data['score_quantique']
+        )
 
     def obtenir_statistiques_systeme(self):
         """📊 STATISTIQUES DU SYSTÈME"""
 
+        stats = self.predictions_historiques.statistiques()
         return {
-            'predictions_totales': len(self.predictions_historiques),
+            'predictions_totales': stats['total'],
             'precision_moyenne': round(self.precision_moyenne, 2),
+            'confiance': stats['mesures'].get('confiance', {}),
+            'predictions_par_resultat': stats['par_resultat'],
+            'historique_conserve': stats['conservees'],
             'version': self.version,
             'reseaux_neuraux': len(self.modeles_neuraux),
             'patterns_quantiques': len(self.patterns_quantiques),
@@ -9,15 +9,24 @@ import random
 import math
 from datetime import datetime
 
+from historique_predictions import HistoriquePredictions
+from pricer_marches import PricerMarches
+
+# Types de paris prix exactement par le pricer analytique (matrice des buts restants)
+TYPES_PRICES_ANALYTIQUEMENT = ('TOTAL_BUTS', 'HANDICAP', 'SCORE_EXACT', 'PAIR_IMPAIR', 'MI_TEMPS')
+
 class SystemePredictionQuantique:
     """🚀 SYSTÈME DE PRÉDICTION SIMPLIFIÉ (Compatible Render)"""
     
     def __init__(self):
         self.version = "SIMPLE-RENDER-2024"
-        self.precision_moyenne = 0.0
-        self.predictions_historiques = []
+        self.predictions_historiques = HistoriquePredictions()
+    
+    @property
+    def precision_moyenne(self):
+        return self.predictions_historiques.moyenne('confiance')
         
-    def analyser_match_quantique(self, team1, team2, league, odds_data, contexte_temps_reel=None, paris_alternatifs=None):
+    def analyser_match_quantique(self, team1, team2, league, odds_data, contexte_temps_reel=None, paris_alternatifs=None, pricer=None):
         """🎲 ANALYSE QUANTIQUE 100% BASÉE SUR L'API RÉELLE"""
 
         # OBLIGATOIRE : Utiliser UNIQUEMENT les paris de l'API
@@ -26,9 +35,17 @@ class SystemePredictionQuantique:
 
         print(f"🔍 ANALYSE API RÉELLE : {len(paris_alternatifs)} paris détectés de l'API")
 
+        # Matrice des buts restants calculée une seule fois pour tout le match
+        if pricer is None:
+            contexte = contexte_temps_reel or {}
+            pricer = PricerMarches.depuis_cotes(
+                odds_data, paris_alternatifs,
+                contexte.get('score1', 0), contexte.get('score2', 0), contexte.get('minute', 0)
+            )
+
         # Analyse spécialisée pour chaque pari RÉEL de l'API
         predictions_alternatives = self._analyser_tous_paris_api_reels(
-            team1, team2, league, paris_alternatifs, contexte_temps_reel
+            team1, team2, league, paris_alternatifs, contexte_temps_reel, pricer
         )
 
         # Score global basé sur les opportunités RÉELLES de l'API
@@ -202,7 +219,7 @@ class SystemePredictionQuantique:
             }
         }
 
-    def _analyser_tous_paris_api_reels(self, team1, team2, league, paris_alternatifs, contexte_temps_reel):
+    def _analyser_tous_paris_api_reels(self, team1, team2, league, paris_alternatifs, contexte_temps_reel, pricer=None):
         """🎯 ANALYSE COMPLÈTE DE TOUS LES PARIS RÉELS DE L'API"""
 
         predictions = []
@@ -210,13 +227,13 @@ class SystemePredictionQuantique:
         print(f"🔍 ANALYSE DE {len(paris_alternatifs)} PARIS RÉELS DE L'API")
 
         for pari in paris_alternatifs:
-            prediction = self._analyser_pari_api_reel(pari, team1, team2, league, contexte_temps_reel)
+            prediction = self._analyser_pari_api_reel(pari, team1, team2, league, contexte_temps_reel, pricer)
             predictions.append(prediction)
             print(f"  ✅ {pari.get('nom', 'Pari inconnu')} | Confiance: {prediction['confiance']}%")
 
         return predictions
 
-    def _analyser_pari_api_reel(self, pari, team1, team2, league, contexte_temps_reel):
+    def _analyser_pari_api_reel(self, pari, team1, team2, league, contexte_temps_reel, pricer=None):
         """🔍 ANALYSE SPÉCIALISÉE D'UN PARI RÉEL DE L'API"""
 
         nom_pari = pari.get('nom', 'Pari API inconnu')
@@ -229,8 +246,16 @@ class SystemePredictionQuantique:
 
         print(f"    🔍 Analyse: {nom_pari} | Type détecté: {type_pari} | Cote: {cote}")
 
+        # Prix exact depuis la matrice des buts restants quand le marché s'y prête
+        probabilite_analytique = None
+        if pricer is not None and type_pari in TYPES_PRICES_ANALYTIQUEMENT:
+            probabilite_analytique = pricer.probabilite_pari(pari, team1, team2)
+
         # Analyse selon le type détecté automatiquement
-        if type_pari == 'TOTAL_BUTS':
+        if probabilite_analytique is not None:
+            confiance = round(probabilite_analytique * 100, 1)
+            print(f"      📐 Probabilité analytique (Poisson): {confiance}%")
+        elif type_pari == 'TOTAL_BUTS':
             confiance = self._analyser_total_buts_api(nom_pari, valeur, team1, team2, league, contexte_temps_reel)
         elif type_pari == 'PAIR_IMPAIR':
             confiance = self._analyser_pair_impair_api(nom_pari, contexte_temps_reel)
@@ -245,17 +270,19 @@ class SystemePredictionQuantique:
         else:
             confiance = self._analyser_pari_generique_api(nom_pari, cote, contexte_temps_reel)
 
-        # Ajustement selon la cote API réelle
-        if cote < 1.3:
-            confiance -= 15  # Cote très faible = risque élevé
-        elif cote < 1.5:
-            confiance -= 10  # Cote faible
-        elif cote > 4.0:
-            confiance += 10  # Cote élevée = potentiel intéressant
-        elif cote > 3.0:
-            confiance += 5   # Cote correcte
-
-        return {
+        # Ajustement selon la cote API réelle (heuristiques uniquement : une
+        # probabilité analytique tient déjà compte du marché)
+        if probabilite_analytique is None:
+            if cote < 1.3:
+                confiance -= 15  # Cote très faible = risque élevé
+            elif cote < 1.5:
+                confiance -= 10  # Cote faible
+            elif cote > 4.0:
+                confiance += 10  # Cote élevée = potentiel intéressant
+            elif cote > 3.0:
+                confiance += 5   # Cote correcte
+
+        prediction = {
             'pari': nom_pari,
             'type': type_pari,
             'cote': cote,
@@ -265,6 +292,10 @@ class SystemePredictionQuantique:
             'value': self._calculer_value_pari(confiance, cote),
             'source': 'API_REELLE'
         }
+        if probabilite_analytique is not None:
+            prediction['probabilite_analytique'] = round(probabilite_analytique, 4)
+            prediction['source'] = 'API_REELLE_POISSON'
+        return prediction
 
     def _analyser_total_buts(self, nom_pari, team1, team2, league, contexte_temps_reel):
         """⚽ ANALYSE SPÉCIALISÉE TOTAL DE BUTS"""
@@ -527,7 +558,7 @@ class SystemePredictionQuantique:
                 return 'TOTAL_BUTS'
 
         # Autres types API
-        elif groupe == 62:  # Groupe corners selon l'API
+        if groupe == 62:  # Groupe corners selon l'API
             print(f"      ✅ CORNERS API détecté (Groupe 62)")
             return 'CORNERS'
         elif groupe == 2:   # Groupe handicaps selon l'API
@@ -1123,19 +1154,24 @@ class SystemePredictionQuantique:
             'score_quantique': resultat['prediction_finale']['score']
         }
         
-        self.predictions_historiques.append(prediction_data)
-        
-        # Calcul de la précision moyenne
-        if len(self.predictions_historiques) > 0:
-            precision_totale = sum(p['confiance'] for p in self.predictions_historiques)
-            self.precision_moyenne = precision_totale / len(self.predictions_historiques)
+        # Historique borné, précision moyenne mise à jour en O(1)
+        self.predictions_historiques.ajouter(
+            prediction_data,
+            resultat=prediction_data['prediction'],
+            confiance=prediction_data['confiance'],
+            score_quantique=prediction_data['score_quantique']
+        )
     
     def obtenir_statistiques_systeme(self):
         """📊 STATISTIQUES SIMPLIFIÉES"""
         
+        stats = self.predictions_historiques.statistiques()
         return {
-            'predictions_totales': len(self.predictions_historiques),
+            'predictions_totales': stats['total'],
             'precision_moyenne': round(self.precision_moyenne, 2),
+            'confiance': stats['mesures'].get('confiance', {}),
+            'predictions_par_resultat': stats['par_resultat'],
+            'historique_conserve': stats['conservees'],
             'version': self.version,
             'reseaux_neuraux': 2,
             'patterns_quantiques': 3,
@@ -0,0 +1,119 @@
+"""
+🧪 TEST DE LA FINALISATION ENSEMBLISTE
+=====================================
+Correction calculée en SQL, anomalies groupées, un seul commit par arriéré
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event
+
+from conftest import application_sqlite
+from models import db, Alert, AnomalyLog, MatchArchive, PerformanceBucket, PredictionArchive
+
+CHOIX = ["Victoire équipe 1", "Match nul", "2", "X", "1", "Autre", "victoire 2"]
+
+
+def _archiver(nombre):
+    from archive_manager import archive_matches_before_bulk, archive_predictions_before_bulk
+
+    archive_matches_before_bulk([{"match_id": i, "jeu": "FIFA", "ligue": "L", "equipe_1": "A", "equipe_2": "B",
+                                  "date_heure_match": datetime(2026, 1, 1, 12)} for i in range(nombre)])
+    predictions = []
+    for i in range(nombre):
+        predictions.append({"match_id": i, "consensus_type": "1X2", "choix": CHOIX[i % len(CHOIX)],
+                            "probabilite": 40.0 + i % 30, "confiance": 60.0, "vote_forme": i % 2 == 0,
+                            "consensus": i % 3 == 0})
+        predictions.append({"match_id": i, "consensus_type": "alternatif", "choix": "Plus de 2.5",
+                            "probabilite": 55.0, "confiance": 50.0, "consensus": i % 5 == 0})
+    archive_predictions_before_bulk(predictions)
+
+
+def _reference(choix, resultat):
+    """Classification d'origine (Python) du choix 1X2"""
+    normalise = choix.upper()
+    if "VICTOIRE" in normalise or choix.startswith("1"):
+        return "1" == resultat
+    if "NUL" in normalise or "X" in normalise:
+        return "X" == resultat
+    if choix.startswith("2"):
+        return "2" == resultat
+    return None
+
+
+def test_reglement_arriere():
+    """Un UPDATE par tranche, résultats identiques à la classification Python, un commit"""
+    from archive_manager import update_matches_after_bulk, rebuild_performance_buckets
+
+    with application_sqlite("finalisation.db") as app:
+        with app.test_request_context():
+            _archiver(60)
+            MatchArchive.query.filter_by(match_id=0).one().is_locked = True
+            db.session.commit()
+
+            instructions = {"update": 0, "commit": 0}
+
+            def compter(conn, cursor, statement, *args):
+                if statement.startswith("UPDATE predictions_archive"):
+                    instructions["update"] += 1
+
+            def commit(conn):
+                instructions["commit"] += 1
+
+            event.listen(db.engine, "before_cursor_execute", compter)
+            event.listen(db.engine, "commit", commit)
+            try:
+                resultats = [{"match_id": i, "score_final_equipe_1": 1, "score_final_equipe_2": 1,
+                              "resultat_reel": "1X2"[i % 3]} for i in range(60)] + \
+                            [{"match_id": 999, "score_final_equipe_1": 0, "score_final_equipe_2": 0, "resultat_reel": "X"}]
+                bilan = update_matches_after_bulk(resultats)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", compter)
+                event.remove(db.engine, "commit", commit)
+
+            assert bilan == {"matches": 59, "predictions": 118, "skipped": [0, 999]}
+            assert instructions["update"] == 1
+            # Règlement + ModelPerformance
+            assert instructions["commit"] == 2
+
+            for pred in PredictionArchive.query.filter(PredictionArchive.match_id != 0):
+                resultat = "1X2"[pred.match_id % 3]
+                assert pred.resultat_reel == resultat and pred.finalized_at is not None
+                if pred.consensus_type == "1X2":
+                    assert pred.prediction_correcte == _reference(pred.choix, resultat), pred.choix
+                    if pred.prediction_correcte is not None:
+                        assert pred.ecart_probabilite == abs(pred.probabilite - 100.0)
+                else:
+                    assert pred.prediction_correcte is None and pred.ecart_probabilite is None
+            assert MatchArchive.query.filter_by(match_id=0).one().resultat_reel is None
+
+            incoherents = PredictionArchive.query.filter(
+                PredictionArchive.match_id != 0, PredictionArchive.consensus.is_(True),
+                db.or_(PredictionArchive.prediction_correcte.is_(None), PredictionArchive.prediction_correcte.is_(False))
+            ).count()
+            assert AnomalyLog.query.count() == incoherents > 0
+            assert Alert.query.filter_by(alert_type="consensus_incoherent").count() == incoherents
+
+            incremental = {(b.day, b.segment): (b.total, b.correctes) for b in PerformanceBucket.query.all()}
+            rebuild_performance_buckets()
+            assert incremental == {(b.day, b.segment): (b.total, b.correctes) for b in PerformanceBucket.query.all()}
+
+
+def test_refinalisation_match_unique():
+    """update_predictions_after_match passe par le chemin ensembliste sans doubler les compteurs"""
+    from archive_manager import update_predictions_after_match
+
+    with application_sqlite("finalisation.db") as app:
+        with app.test_request_context():
+            _archiver(3)
+            update_predictions_after_match(2, "2")
+            update_predictions_after_match(2, "1")
+            pred = PredictionArchive.query.filter_by(match_id=2, consensus_type="1X2").one()
+            assert pred.resultat_reel == "1" and pred.prediction_correcte is False
+            assert PerformanceBucket.query.filter_by(segment="global").one().total == 1
+
+
+if __name__ == "__main__":
+    test_reglement_arriere()
+    test_refinalisation_match_unique()
+    print("🎉 TEST DE LA FINALISATION ENSEMBLISTE TERMINÉ")
@@ -0,0 +1,168 @@
+"""
+🧪 TEST DE L'UPSERT ENSEMBLISTE
+==============================
+Insertion puis mise à jour en une instruction, repli portable et archives
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event
+
+import bulk_upsert
+from conftest import application_sqlite
+from bulk_upsert import upsert_rows, load_by_keys
+from models import db, Prediction, MatchArchive, PredictionArchive
+
+
+def _prediction(match_id, resultat="1", extra_data=None):
+    return {
+        "match_id": match_id, "team1": "A", "team2": "B", "league": "L",
+        "consensus_type": "1X2", "consensus_result": resultat,
+        "consensus_probability": 60.0, "confidence": 55.0, "recommended_odd": 1.8,
+        "recommended_action": "JOUER", "votes_statistique": True, "extra_data": extra_data,
+    }
+
+
+def _compter_inserts(engine, compteur):
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO PREDICTIONS"):
+            compteur.append(statement)
+    event.listen(engine, "before_cursor_execute", before)
+    return before
+
+
+def test_insertion_puis_mise_a_jour():
+    """Un seul INSERT ... ON CONFLICT pour le lot, created_at et extra_data conservés"""
+    from prediction_manager import create_predictions_bulk
+
+    with application_sqlite("upsert.db") as app:
+        with app.test_request_context():
+            inserts = []
+            listener = _compter_inserts(db.engine, inserts)
+            try:
+                premieres = create_predictions_bulk([_prediction(i, extra_data={"source": "flux"}) for i in range(1, 51)])
+                assert len(premieres) == 50 and len(inserts) == 1
+                crees = {p.match_id: p.created_at for p in premieres}
+
+                inserts.clear()
+                mises_a_jour = create_predictions_bulk([_prediction(i, resultat="2") for i in range(1, 51)])
+                assert len(inserts) == 1
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+
+            assert Prediction.query.count() == 50
+            assert all(p.consensus_result == "2" for p in mises_a_jour)
+            assert all(p.created_at == crees[p.match_id] for p in mises_a_jour)
+            assert all(p.extra_data == '{"source": "flux"}' for p in mises_a_jour)
+
+
+def test_repli_portable():
+    """Sans index unique, SELECT + UPDATE + INSERT groupés donnent le même résultat"""
+    with application_sqlite("upsert.db") as app:
+        with app.app_context():
+            cle = (str(db.engine.url), "predictions")
+            bulk_upsert._unique_ready[cle] = False
+            try:
+                maintenant = datetime.utcnow()
+                lignes = [dict(_prediction(i), is_valid=True, is_locked=False, created_at=maintenant,
+                               updated_at=maintenant, extra_data='{"v": 1}') for i in (1, 2)]
+                upsert_rows(db, Prediction, lignes, ("match_id", "consensus_type"), ("consensus_result", "updated_at"))
+                lignes = [dict(ligne, consensus_result="X", extra_data=None) for ligne in lignes]
+                lignes.append(dict(lignes[0], match_id=3))
+                cles = upsert_rows(db, Prediction, lignes, ("match_id", "consensus_type"),
+                                   ("consensus_result", "updated_at"), keep_if_null=("extra_data",))
+                db.session.commit()
+                obtenues = load_by_keys(db, Prediction, ("match_id", "consensus_type"), cles)
+            finally:
+                bulk_upsert._unique_ready.pop(cle, None)
+            assert [p.match_id for p in obtenues] == [1, 2, 3]
+            assert all(p.consensus_result == "X" for p in obtenues)
+            assert [p.extra_data for p in obtenues] == ['{"v": 1}', '{"v": 1}', None]
+
+
+def test_archives_par_lots():
+    """Matchs puis prédictions archivés en lot ; un match absent est refusé"""
+    from archive_manager import archive_matches_before_bulk, archive_predictions_before_bulk
+
+    with application_sqlite("upsert.db") as app:
+        with app.test_request_context():
+            matchs = [{"match_id": i, "jeu": "FIFA", "ligue": "L", "equipe_1": "A", "equipe_2": "B",
+                       "date_heure_match": datetime(2026, 1, 1, 12), "cote_1": 1.5} for i in (10, 11)]
+            archives = archive_matches_before_bulk(matchs, admin_id=None)
+            assert [m.statut_final for m in archives] == ["en_cours", "en_cours"]
+            archive_matches_before_bulk([dict(matchs[0], cote_1=1.7)])
+            assert MatchArchive.query.filter_by(match_id=10).one().cote_1 == 1.7
+
+            predictions = [{"match_id": i, "consensus_type": "1X2", "choix": "1", "probabilite": 60.0,
+                            "confiance": 70.0} for i in (10, 11)]
+            assert len(archive_predictions_before_bulk(predictions)) == 2
+            archive_predictions_before_bulk([dict(predictions[0], choix="X")])
+            assert PredictionArchive.query.count() == 2
+            assert PredictionArchive.query.filter_by(match_id=10).one().choix == "X"
+
+            try:
+                archive_predictions_before_bulk([dict(predictions[0], match_id=99)])
+                assert False, "ValueError attendue"
+            except ValueError:
+                pass
+
+
+def test_alertes_dans_la_transaction():
+    """Alertes et anomalies du lot insérées en une instruction, dans l'unique commit"""
+    import threading
+    from archive_manager import archive_before_bulk
+    from prediction_manager import create_predictions_bulk
+    from models import Alert, AnomalyLog
+
+    with application_sqlite("alertes.db") as app:
+        with app.test_request_context():
+            thread = threading.get_ident()
+            compteurs = {"commit": 0, "insert_alerts": 0}
+
+            def commit(conn):
+                if threading.get_ident() == thread:
+                    compteurs["commit"] += 1
+
+            def before(conn, cursor, statement, parameters, context, executemany):
+                if statement.lstrip().upper().startswith("INSERT INTO ALERTS"):
+                    compteurs["insert_alerts"] += 1
+
+            event.listen(db.engine, "commit", commit)
+            event.listen(db.engine, "before_cursor_execute", before)
+            try:
+                # Votes par défaut (tous faux) : une alerte no_votes par prédiction
+                lignes = [dict(_prediction(i), votes_statistique=False, confidence=40.0 if i % 2 else 55.0)
+                          for i in range(1, 31)]
+                lignes.append(dict(lignes[0], confidence=45.0))  # doublon : la dernière gagne
+                create_predictions_bulk(lignes)
+                assert compteurs == {"commit": 1, "insert_alerts": 1}, compteurs
+
+                compteurs.update(commit=0, insert_alerts=0)
+                matchs = [{"match_id": i, "jeu": "FIFA", "ligue": "L", "equipe_1": "A", "equipe_2": "B",
+                           "date_heure_match": datetime(2026, 1, 1, 12)} for i in (1, 2, 3)]
+                archives = [{"match_id": i, "consensus_type": "1X2", "choix": "1", "probabilite": 60.0,
+                             "confiance": 97.0 if i != 2 else 80.0} for i in (1, 2, 3)]
+                archive_before_bulk(matchs, archives)
+                assert compteurs == {"commit": 1, "insert_alerts": 1}, compteurs
+            finally:
+                event.remove(db.engine, "commit", commit)
+                event.remove(db.engine, "before_cursor_execute", before)
+
+            ids = {p.match_id: p.id for p in Prediction.query.all()}
+            no_votes = Alert.query.filter_by(alert_type="no_votes").all()
+            assert len(no_votes) == 30 and all(a.prediction_id == ids[a.match_id] for a in no_votes)
+            assert Alert.query.filter_by(alert_type="low_confidence").count() == 15
+
+            anomalies = AnomalyLog.query.order_by(AnomalyLog.match_id).all()
+            archivees = {p.match_id: p.id for p in PredictionArchive.query.all()}
+            assert [a.match_id for a in anomalies] == [1, 3]
+            assert all(a.prediction_archive_id == archivees[a.match_id] for a in anomalies)
+            assert Alert.query.filter_by(alert_type="high_confidence").count() == 2
+
+
+if __name__ == "__main__":
+    test_insertion_puis_mise_a_jour()
+    test_repli_portable()
+    test_archives_par_lots()
+    test_alertes_dans_la_transaction()
+    print("🎉 TEST DE L'UPSERT ENSEMBLISTE TERMINÉ")
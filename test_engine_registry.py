@@ -0,0 +1,62 @@
+"""
+🧪 TEST DU REGISTRE DES MOTEURS
+==============================
+Vérifie que les moteurs sont construits une seule fois et partagés entre threads
+"""
+
+import threading
+
+from engine_registry import EngineRegistry, engine_registry
+
+
+def test_singleton_par_worker():
+    """Le même moteur est renvoyé à chaque appel"""
+    maitre = engine_registry.get('maitre')
+    assert maitre is not None
+    assert engine_registry.get('maitre') is maitre
+    print(f"✅ Maître partagé: {maitre.version}")
+
+
+def test_construction_unique_sous_concurrence():
+    """Plusieurs threads simultanés ne construisent qu'une seule instance"""
+    registre = EngineRegistry()
+    constructions = []
+
+    def fabrique():
+        constructions.append(1)
+        return object()
+
+    registre.register('moteur', fabrique)
+    resultats = []
+    threads = [threading.Thread(target=lambda: resultats.append(registre.get('moteur'))) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(constructions) == 1
+    assert all(r is resultats[0] for r in resultats)
+
+
+def test_moteur_indisponible():
+    """Une fabrique en échec renvoie None sans être rappelée"""
+    registre = EngineRegistry()
+    appels = []
+
+    def fabrique():
+        appels.append(1)
+        raise ImportError("module absent")
+
+    registre.register('casse', fabrique)
+    assert registre.get('casse') is None
+    assert registre.get('casse') is None
+    assert len(appels) == 1
+    assert registre.get_status()['casse']['erreur'] == "module absent"
+    assert registre.get('inconnu') is None
+
+
+if __name__ == "__main__":
+    test_singleton_par_worker()
+    test_construction_unique_sous_concurrence()
+    test_moteur_indisponible()
+    print("🎉 TEST DU REGISTRE TERMINÉ")
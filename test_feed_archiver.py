@@ -0,0 +1,93 @@
+"""
+🧪 TEST DE L'ARCHIVAGE DU FLUX AVANT MATCH
+=========================================
+Instantanés successifs : seuls les matchs nouveaux ou modifiés et les
+prédictions changées sont écrits, en une transaction par cycle
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from conftest import application_sqlite
+from feed_archiver import FeedArchiver, parse_feed_match
+from models import db, MatchArchive, Prediction, PredictionArchive
+
+MAINTENANT = datetime(2026, 5, 1, 12, 0)
+
+
+def _match(match_id, minutes, cote_1=1.9, ligue="FIFA 4x4 Champions League"):
+    debut = (MAINTENANT + timedelta(minutes=minutes)).replace(tzinfo=timezone.utc).timestamp()
+    return {"I": match_id, "LE": ligue, "O1": f"A{match_id}", "O2": f"B{match_id}", "S": int(debut),
+            "E": [{"G": 1, "T": 1, "C": cote_1}, {"G": 1, "T": 3, "C": 3.4}, {"G": 1, "T": 2, "C": 4.1}]}
+
+
+def _prediction(match_id, confiance=60.0):
+    return Prediction(match_id=match_id, team1=f"A{match_id}", team2=f"B{match_id}", league="L",
+                      consensus_type="1X2", consensus_result="1", consensus_probability=55.0,
+                      confidence=confiance, recommended_action="MISE", votes_statistique=True,
+                      votes_cotes=True, votes_simulation=True)
+
+
+def test_analyse_du_flux():
+    """Cotes 1X2, jeu et mode extraits ; matchs commencés ignorés"""
+    match = parse_feed_match(_match(7, 30), MAINTENANT)
+    assert (match["cote_1"], match["cote_X"], match["cote_2"]) == (1.9, 3.4, 4.1)
+    assert match["jeu"] == "FIFA" and match["mode"] == "4v4"
+    assert match["date_heure_match"] == MAINTENANT + timedelta(minutes=30)
+    assert parse_feed_match(_match(7, -5), MAINTENANT) is None
+    assert parse_feed_match(dict(_match(7, 30), HS=1), MAINTENANT) is None
+
+
+def test_archivage_incremental():
+    """Coût proportionnel aux changements, un commit par cycle, idempotent au redémarrage"""
+    with application_sqlite("flux.db") as app:
+        with app.test_request_context():
+            db.session.add_all([_prediction(1), _prediction(2)])
+            db.session.commit()
+            flux = [_match(i, 10 + i) for i in range(1, 21)] + [_match(99, -10)]
+
+            archiveur = FeedArchiver(watermark_overlap=timedelta(0))
+            commits = []
+
+            def compter(conn):
+                commits.append(conn)
+
+            event.listen(db.engine, "commit", compter)
+            try:
+                assert archiveur.archive_snapshot(flux, MAINTENANT) == \
+                       {"matches": 20, "predictions": 2, "unchanged": 0}
+                assert len(commits) == 1
+                assert MatchArchive.query.count() == 20 and PredictionArchive.query.count() == 2
+
+                # Flux inchangé : aucune écriture
+                assert archiveur.archive_snapshot(flux, MAINTENANT) == \
+                       {"matches": 0, "predictions": 0, "unchanged": 20}
+                assert len(commits) == 1
+
+                # Une cote modifiée et une nouvelle prédiction
+                flux[4] = _match(5, 15, cote_1=2.05)
+                db.session.add(_prediction(9, confiance=70.0))
+                db.session.commit()
+                del commits[:]
+                assert archiveur.archive_snapshot(flux, MAINTENANT) == \
+                       {"matches": 1, "predictions": 1, "unchanged": 19}
+                assert len(commits) == 1
+            finally:
+                event.remove(db.engine, "commit", compter)
+
+            assert MatchArchive.query.filter_by(match_id=5).one().cote_1 == 2.05
+            archivee = PredictionArchive.query.filter_by(match_id=9).one()
+            assert archivee.confiance == 70.0 and archivee.consensus
+
+            # Redémarrage : empreintes relues en base, aucun match réécrit
+            redemarre = FeedArchiver(watermark_overlap=timedelta(0))
+            assert redemarre.archive_snapshot(flux, MAINTENANT)["matches"] == 0
+            assert MatchArchive.query.count() == 20 and PredictionArchive.query.count() == 3
+            assert redemarre.status()["tracked_matches"] == 20
+
+
+if __name__ == "__main__":
+    test_analyse_du_flux()
+    test_archivage_incremental()
+    print("🎉 TEST DE L'ARCHIVAGE DU FLUX TERMINÉ")
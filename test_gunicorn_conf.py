@@ -0,0 +1,39 @@
+"""
+🧪 TEST DE LA CONFIGURATION GUNICORN
+===================================
+Après le fork, le worker n'utilise aucune connexion ouverte par le master
+"""
+
+import importlib.util
+import os
+
+from sqlalchemy import text
+
+from conftest import application_sqlite
+from models import db
+
+_spec = importlib.util.spec_from_file_location(
+    "gunicorn_conf", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py"))
+gunicorn_conf = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(gunicorn_conf)
+
+
+def test_connexions_du_master_abandonnees():
+    """Pool remplacé, session retirée ; models_oauth non enregistré ignoré"""
+    with application_sqlite("fork.db") as app:
+        with app.app_context():
+            db.session.execute(text("SELECT 1"))
+            pool_master = db.engine.pool
+            assert pool_master.checkedin() + pool_master.checkedout() == 1
+
+        gunicorn_conf._dispose_inherited_connections(app)
+
+        with app.app_context():
+            assert db.engine.pool is not pool_master
+            assert db.engine.pool.checkedin() == 0
+            assert db.session.execute(text("SELECT 1")).scalar() == 1
+
+
+if __name__ == "__main__":
+    test_connexions_du_master_abandonnees()
+    print("🎉 TEST DE LA CONFIGURATION GUNICORN TERMINÉ")
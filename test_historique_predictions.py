@@ -0,0 +1,72 @@
+"""
+🧪 TEST DE L'HISTORIQUE BORNÉ DES PRÉDICTIONS
+============================================
+Vérifie la mémoire constante et l'exactitude des agrégats en flux
+"""
+
+import statistics
+import threading
+
+from historique_predictions import HistoriquePredictions
+
+
+def test_tampon_borne_et_agregats_exacts():
+    """Le tampon reste borné, les agrégats couvrent tout l'historique"""
+    historique = HistoriquePredictions(capacite=10)
+    valeurs = [50 + (i * 7) % 40 for i in range(1000)]
+    for i, v in enumerate(valeurs):
+        historique.ajouter({'id': i}, resultat="1" if v >= 70 else "2", confiance=v)
+
+    stats = historique.statistiques()
+    assert stats['total'] == 1000
+    assert stats['conservees'] == 10
+    assert len(historique.recentes(50)) == 10
+    assert historique.recentes(1) == [{'id': 999}]
+
+    confiance = stats['mesures']['confiance']
+    assert abs(confiance['moyenne'] - statistics.fmean(valeurs)) < 1e-3
+    assert abs(confiance['variance'] - statistics.pvariance(valeurs)) < 1e-3
+    assert confiance['min'] == min(valeurs) and confiance['max'] == max(valeurs)
+    assert sum(stats['par_resultat'].values()) == 1000
+
+
+def test_ajouts_concurrents():
+    """Aucun ajout perdu sous threads concurrents"""
+    historique = HistoriquePredictions(capacite=5)
+
+    def travail():
+        for _ in range(500):
+            historique.ajouter({}, resultat="N", confiance=60)
+
+    threads = [threading.Thread(target=travail) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = historique.statistiques()
+    assert stats['total'] == 4000
+    assert stats['par_resultat'] == {"N": 4000}
+    assert stats['mesures']['confiance']['moyenne'] == 60
+
+
+def test_statistiques_maitre():
+    """Le Maître expose les agrégats via obtenir_statistiques_maitre"""
+    from maitre_pronostics import MaitreDesPronostics
+
+    maitre = MaitreDesPronostics()
+    for confiance in (60, 80):
+        rapport = {'decision_finale': {'action': 'MISE RECOMMANDÉE', 'confiance_numerique': confiance}}
+        maitre._sauvegarder_decision(rapport, "A", "B", "Ligue")
+
+    stats = maitre.obtenir_statistiques_maitre()
+    assert stats['decisions_totales'] == 2
+    assert stats['precision_moyenne'] == 70
+    assert stats['decisions_par_action'] == {'MISE RECOMMANDÉE': 2}
+
+
+if __name__ == "__main__":
+    test_tampon_borne_et_agregats_exacts()
+    test_ajouts_concurrents()
+    test_statistiques_maitre()
+    print("🎉 TEST DE L'HISTORIQUE TERMINÉ")
@@ -0,0 +1,107 @@
+"""
+🧪 TEST DE LA RÉTENTION DES JOURNAUX
+===================================
+Compaction journalière en archives colonnaires, reprise sans doublon,
+interrogation des archives et de la table chaude
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+import log_retention
+from conftest import application_sqlite
+from models import db, SystemLog
+
+MAINTENANT = datetime(2026, 3, 31, 12, 0)
+
+
+def _peupler():
+    for jour in range(40):
+        for heure in (1, 13):
+            db.session.add(SystemLog(action_type="login", message=f"j{jour} h{heure}",
+                                     severity="error" if jour % 10 == 0 else "info",
+                                     created_at=MAINTENANT - timedelta(days=jour, hours=heure)))
+    db.session.commit()
+
+
+def test_compaction_et_interrogation():
+    """Lignes hors fenêtre archivées par jour, supprimées, puis relues à l'identique"""
+    with application_sqlite("journaux.db", _peupler) as app:
+        archives = os.path.join(app.instance_path, "archives")
+        with app.test_request_context():
+            avant = {r.id: (r.created_at, r.message) for r in SystemLog.query.all()}
+            politique = log_retention.POLICIES["system_logs"]
+            coupure = politique.cutoff(MAINTENANT)
+            attendu = {i for i, (moment, _) in avant.items() if moment < coupure}
+
+            simulation = log_retention.compact_table(politique, now=MAINTENANT, archive_dir=archives, dry_run=True)
+            assert simulation["archived"] == len(attendu) and not os.path.exists(archives)
+
+            bilan = log_retention.run_retention(["system_logs", "audit_logs"], now=MAINTENANT, archive_dir=archives)
+            assert bilan["system_logs"]["archived"] == len(attendu) > 0
+            assert bilan["system_logs"]["parts"] == len(bilan["system_logs"]["days"])
+            assert "skipped" in bilan["audit_logs"]
+            restants = SystemLog.query.filter(SystemLog.action_type == "login").all()
+            assert all(r.created_at >= coupure for r in restants)
+
+            archivees = log_retention.query_archive("system_logs", archive_dir=archives)
+            assert {r["id"]: (r["created_at"], r["message"]) for r in archivees} == \
+                   {i: avant[i] for i in attendu}
+
+            # Élagage par nom de fichier + filtre
+            debut = coupure - timedelta(days=5)
+            erreurs = log_retention.query_archive("system_logs", since=debut, where={"severity": "error"},
+                                                  archive_dir=archives)
+            assert erreurs and all(r["severity"] == "error" and r["created_at"] >= debut for r in erreurs)
+
+            complet = log_retention.query_logs("system_logs", where={"action_type": "login"}, archive_dir=archives)
+            assert [r["id"] for r in complet] == sorted(avant, key=lambda i: avant[i][0])
+
+            # Second passage : rien à faire
+            assert log_retention.run_retention(["system_logs"], now=MAINTENANT,
+                                               archive_dir=archives)["system_logs"]["archived"] == 0
+
+
+def test_reprise_sans_doublon():
+    """Un lot archivé mais non supprimé (arrêt brutal) est réécrit sous le même nom"""
+    with application_sqlite("journaux.db", _peupler) as app:
+        archives = os.path.join(app.instance_path, "archives")
+        with app.app_context():
+            politique = log_retention.POLICIES["system_logs"]
+            session = db.session
+            execute = session.execute
+
+            def sans_suppression(statement, *args, **kwargs):
+                if getattr(statement, "is_delete", False):
+                    raise RuntimeError("arrêt simulé")
+                return execute(statement, *args, **kwargs)
+
+            session.execute = sans_suppression
+            try:
+                log_retention.compact_table(politique, now=MAINTENANT, archive_dir=archives)
+            except RuntimeError:
+                session.rollback()
+            finally:
+                del session.execute
+            fichiers = os.listdir(os.path.join(archives, "system_logs"))
+            assert len(fichiers) == 1
+
+            log_retention.compact_table(politique, now=MAINTENANT, archive_dir=archives)
+            ids = [r["id"] for r in log_retention.query_archive("system_logs", archive_dir=archives)]
+            assert len(ids) == len(set(ids)) > 0
+
+
+def test_planification_opt_in():
+    """Pas de passage automatique par défaut ni sans répertoire d'archives explicite"""
+    assert log_retention.start_retention_scheduler(Flask(__name__), interval_hours=0) is None
+    if not log_retention.ARCHIVE_DIR_CONFIGURED:
+        assert log_retention.start_retention_scheduler(Flask(__name__), interval_hours=24) is None
+
+
+if __name__ == "__main__":
+    test_compaction_et_interrogation()
+    test_reprise_sans_doublon()
+    test_planification_opt_in()
+    print("🎉 TEST DE LA RÉTENTION DES JOURNAUX TERMINÉ")
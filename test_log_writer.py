@@ -0,0 +1,64 @@
+"""
+🧪 TEST DE LA JOURNALISATION DIFFÉRÉE
+====================================
+Insertion par lots, abandon par gravité et vidage à l'arrêt
+"""
+
+from conftest import application_sqlite
+from log_writer import LogWriter
+from models import db, SystemLog
+
+
+def _ligne(message, severity="info"):
+    return {"action_type": "test", "message": message, "severity": severity}
+
+
+def test_ecriture_par_lots():
+    """Les lignes sont écrites hors de la requête, en un lot"""
+    with application_sqlite("logs.db") as app:
+        writer = LogWriter(queue_size=100, batch_size=100, flush_interval_ms=60000, block_ms=0)
+        with app.test_request_context():
+            for i in range(10):
+                assert writer.enqueue(SystemLog, _ligne(f"message {i}"), db=db)
+            assert SystemLog.query.count() == 0
+            assert writer.flush()
+            assert SystemLog.query.count() == 10
+        statut = writer.status()
+        assert statut["written"] == 10 and statut["batches"] == 1 and statut["pending"] == 0
+        writer.close()
+
+
+def test_abandon_par_gravite():
+    """File pleine : les entrées graves évincent les moins graves, les autres sont abandonnées"""
+    with application_sqlite("logs.db") as app:
+        writer = LogWriter(queue_size=3, batch_size=100, flush_interval_ms=60000, block_ms=0)
+        with app.test_request_context():
+            for i in range(3):
+                writer.enqueue(SystemLog, _ligne(f"info {i}"), db=db)
+            assert not writer.enqueue(SystemLog, _ligne("info de trop"), db=db)
+            assert writer.enqueue(SystemLog, _ligne("erreur", "error"), severity="error", db=db)
+            writer.close()
+            messages = sorted(log.message for log in SystemLog.query.all())
+        assert messages == ["erreur", "info 1", "info 2"]
+        statut = writer.status()
+        assert statut["dropped"] == {"info": 1} and statut["evicted"] == 1
+
+
+def test_log_action_differe():
+    """log_action ne touche plus la base dans la requête"""
+    from prediction_manager import log_action
+    from log_writer import log_writer
+
+    with application_sqlite("logs.db") as app:
+        with app.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+            log_action("test_action", "Action différée", severity="warning", extra_data={"a": 1})
+            log_writer.flush()
+            log = SystemLog.query.filter_by(action_type="test_action").one()
+        assert log.ip_address == "10.0.0.1" and log.severity == "warning"
+
+
+if __name__ == "__main__":
+    test_ecriture_par_lots()
+    test_abandon_par_gravite()
+    test_log_action_differe()
+    print("🎉 TEST DE LA JOURNALISATION DIFFÉRÉE TERMINÉ")
@@ -175,6 +175,98 @@ def test_types_paris():
     
     return succes == len(tests)
 
+def test_consensus_anytime():
+    """⏱️ TEST DU CONSENSUS INCRÉMENTAL ET DE L'ÉCHÉANCE"""
+    
+    import time
+    from maitre_pronostics import MaitreDesPronostics
+    
+    def bot(confiance_globale, *paris):
+        return {
+            'confiance_globale': confiance_globale,
+            'paris_recommandes': [{'nom': nom, 'cote': cote, 'confiance': conf} for nom, cote, conf in paris]
+        }
+    
+    decisions_bots = {
+        'BOT_A': bot(70, ('Handicap asiatique A (+1)', 1.8, 60), ('Plus de 2.5 buts (TOTAL)', 1.9, 65)),
+        'BOT_B': bot(60, ('Plus de 2.5 buts (TOTAL)', 2.0, 80), ('Total de buts PAIR', 3.5, 90)),
+        'BOT_C': bot(80, ('Handicap asiatique A (+1)', 1.7, 75)),
+        'BOT_D': {'erreur': 'pas de paris'}
+    }
+    
+    maitre = MaitreDesPronostics()
+    reference = maitre.analyser_decisions_bots(decisions_bots, "A", "B", "Ligue")
+    
+    consensus = maitre.demarrer_consensus(decisions_bots.keys())
+    for nom, decision in decisions_bots.items():
+        consensus.ajouter_decision_bot(nom, decision)
+    anytime = consensus.finaliser("A", "B", "Ligue")
+    
+    # Même décision que l'analyse complète
+    assert anytime['decision_finale']['pari_choisi'] == reference['decision_finale']['pari_choisi']
+    assert anytime['decision_finale']['cote'] == reference['decision_finale']['cote']
+    assert anytime['decision_finale']['confiance_numerique'] == reference['decision_finale']['confiance_numerique']
+    assert anytime['analyse_bots'] == reference['analyse_bots']
+    assert anytime['details_technique'] == reference['details_technique']
+    
+    # Un bot lent est ignoré à l'échéance
+    def bot_lent():
+        time.sleep(1)
+        return decisions_bots['BOT_C']
+    
+    fournisseurs = {'BOT_A': lambda: decisions_bots['BOT_A'], 'BOT_B': lambda: decisions_bots['BOT_B'], 'BOT_C': bot_lent}
+    debut = time.monotonic()
+    rapport, resultats = maitre.analyser_decisions_bots_avec_delai(fournisseurs, "A", "B", "Ligue", delai_ms=200)
+    assert time.monotonic() - debut < 0.9
+    assert rapport['meta']['bots_manquants'] == ['BOT_C']
+    assert 'BOT_C' not in resultats
+    assert rapport['decision_finale']['pari_choisi'] == 'Plus de 2.5 buts (TOTAL)'
+    assert rapport['analyse_bots']['nb_bots_consultes'] == 2
+    
+    return True
+
+def test_pool_bots_sature():
+    """🚦 TEST DU POOL DES BOTS SATURÉ PAR DES BOTS LENTS"""
+    
+    import threading
+    import maitre_pronostics
+    from maitre_pronostics import MaitreDesPronostics, etat_pool_bots
+    
+    bot = {'confiance_globale': 70, 'paris_recommandes': [{'nom': 'Plus de 2.5 buts (TOTAL)', 'cote': 1.9, 'confiance': 65}]}
+    libere = threading.Event()
+    
+    def bot_bloque():
+        libere.wait(5)
+        return bot
+    
+    ancien = (maitre_pronostics._executeur_bots, maitre_pronostics.BOTS_WORKERS)
+    maitre_pronostics._executeur_bots = None
+    maitre_pronostics.BOTS_WORKERS = 2
+    try:
+        maitre = MaitreDesPronostics()
+        # Deux bots lents dépassent le délai et gardent leur thread
+        maitre.analyser_decisions_bots_avec_delai({'LENT_1': bot_bloque, 'LENT_2': bot_bloque}, "A", "B", "Ligue", delai_ms=50)
+        assert etat_pool_bots()['occupes'] == 2
+        
+        # Requête suivante : pas de file d'attente, les bots tournent sur le thread de la requête
+        saturations = etat_pool_bots()['saturations']
+        rapport, resultats = maitre.analyser_decisions_bots_avec_delai(
+            {'BOT_A': lambda: bot, 'BOT_B': lambda: bot}, "A", "B", "Ligue", delai_ms=50)
+        assert rapport['meta']['bots_en_ligne'] == ['BOT_A', 'BOT_B']
+        assert resultats == {'BOT_A': bot, 'BOT_B': bot} and rapport['meta']['bots_manquants'] == []
+        assert rapport['decision_finale']['pari_choisi'] == 'Plus de 2.5 buts (TOTAL)'
+        assert etat_pool_bots()['saturations'] == saturations + 1
+        
+        # Places rendues quand les bots lents se terminent
+        libere.set()
+        maitre_pronostics._executeur_bots.executeur.shutdown(wait=True)
+        assert etat_pool_bots()['occupes'] == 0
+    finally:
+        libere.set()
+        maitre_pronostics._executeur_bots, maitre_pronostics.BOTS_WORKERS = ancien
+    
+    return True
+
 if __name__ == "__main__":
     print("🚀 DÉMARRAGE TEST COMPLET MAÎTRE + BOTS")
     print("=" * 70)
@@ -188,6 +280,12 @@ if __name__ == "__main__":
     # Test 3: Détection des types
     succes3 = test_types_paris()
     
+    # Test 4: Consensus anytime
+    succes3 = test_consensus_anytime() and succes3
+    
+    # Test 5: Pool des bots saturé
+    succes3 = test_pool_bots_sature() and succes3
+    
     print("\n" + "=" * 70)
     if succes1 and succes2 and succes3:
         print("🎉 TOUS LES TESTS RÉUSSIS !")
@@ -0,0 +1,80 @@
+"""
+🧪 TEST DU MICRO-BATCHING DES PRÉDICTIONS
+========================================
+Regroupement des requêtes concurrentes et redistribution des résultats
+"""
+
+import threading
+import time
+
+from ml_batcher import MicroBatcher
+
+
+def _en_parallele(fonction, arguments):
+    resultats = [None] * len(arguments)
+    depart = threading.Barrier(len(arguments))
+
+    def appel(i, argument):
+        depart.wait()
+        resultats[i] = fonction(argument)
+
+    threads = [threading.Thread(target=appel, args=(i, a)) for i, a in enumerate(arguments)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resultats
+
+
+def test_regroupement_et_redistribution():
+    """Les requêtes concurrentes partagent un lot, chacune reçoit son résultat"""
+    lots = []
+
+    def runner(key, items):
+        lots.append(len(items))
+        time.sleep(0.01)  # les requêtes arrivées pendant le calcul forment le lot suivant
+        return [(key, item * 2) for item in items]
+
+    # idle_seconds infini : le meneur attend toujours la fenêtre
+    batcher = MicroBatcher(runner, window_ms=50, max_rows=4, idle_seconds=float("inf"))
+    resultats = _en_parallele(lambda i: batcher.submit("k", i), list(range(10)))
+    assert resultats == [("k", i * 2) for i in range(10)]
+    assert sum(lots) == 10
+    assert max(lots) <= 4 and len(lots) < 10
+
+
+def test_erreur_propagee():
+    """Une erreur du lot est remontée à chaque appelant"""
+    def runner(key, items):
+        raise ValueError("modèle indisponible")
+
+    batcher = MicroBatcher(runner, window_ms=5, max_rows=8)
+    try:
+        batcher.submit("k", 1)
+        assert False, "erreur attendue"
+    except ValueError:
+        pass
+
+
+def test_predictions_concurrentes_identiques():
+    """Les prédictions micro-batchées sont celles d'appels isolés"""
+    from ml_integration import MLIntegration
+
+    ml = MLIntegration()
+    if not ml.model_over_under:
+        return
+    matchs = [{"minute": m, "score1": m % 3, "score2": m % 2, "odd": 1.5 + m / 100} for m in range(0, 90, 6)]
+    attendus = [ml.predict_over_under(m, 2.5)["over_probability"] for m in matchs]
+
+    ml.batcher = MicroBatcher(ml._run_micro_batch, window_ms=20, max_rows=64, idle_seconds=float("inf"))
+    obtenus = _en_parallele(lambda m: ml.predict_over_under(m, 2.5)["over_probability"], matchs)
+    assert obtenus == attendus
+    statut = ml.get_model_status()["micro_batching"]
+    assert statut["rows"] == len(matchs) and statut["batches"] <= len(matchs)
+
+
+if __name__ == "__main__":
+    test_regroupement_et_redistribution()
+    test_erreur_propagee()
+    test_predictions_concurrentes_identiques()
+    print("🎉 TEST DU MICRO-BATCHING TERMINÉ")
@@ -115,5 +115,83 @@ def test_ml_integration():
     print("🎉 TEST D'INTÉGRATION ML TERMINÉ")
     return True
 
+def test_predictions_par_lot():
+    """Le lot de get_all_predictions donne les mêmes résultats que les appels unitaires"""
+    if not ml_integration.model_over_under:
+        return
+    match = {"team1": "A", "team2": "B", "league": "L", "minute": 30,
+             "score1": 1, "score2": 0, "odd": 1.9}
+    all_preds = ml_integration.get_all_predictions(match)["predictions"]
+    for line in [0.5, 1.5, 2.5, 3.5]:
+        unitaire = ml_integration.predict_over_under(match, line)
+        lot = all_preds[f"over_under_{line}"]
+        assert lot["prediction"] == unitaire["prediction"]
+        assert abs(lot["over_probability"] - unitaire["over_probability"]) < 1e-12
+    for handicap in [-1.5, -1.0, 0, +1.0, +1.5]:
+        unitaire = ml_integration.predict_handicap(match, handicap)
+        lot = all_preds[f"handicap_{handicap}"]
+        assert lot["prediction"] == unitaire["prediction"]
+        assert abs(lot["home_probability"] - unitaire["home_probability"]) < 1e-12
+
+def test_predict_batch():
+    """Un lot de matchs donne les mêmes prédictions que match par match"""
+    if not ml_integration.model_over_under:
+        return
+    matches = [
+        {"team1": "A", "team2": "B", "league": "L", "minute": m, "score1": m % 3, "score2": 1, "odd": 1.8}
+        for m in range(0, 90, 10)
+    ]
+    lot = ml_integration.predict_batch(matches + ["invalide"])
+    assert len(lot) == len(matches) + 1
+    assert "error" in lot[-1]
+    for match, resultat in zip(matches, lot):
+        attendu = ml_integration.get_all_predictions(match)
+        assert resultat["predictions"].keys() == attendu["predictions"].keys()
+        for cle, pred in attendu["predictions"].items():
+            assert resultat["predictions"][cle]["prediction"] == pred["prediction"]
+            assert abs(resultat["predictions"][cle]["confidence"] - pred["confidence"]) < 1e-12
+
+def test_matrice_numpy():
+    """La matrice NumPy préallouée reproduit les features ligne par ligne"""
+    if not ml_integration.model_over_under:
+        return
+    sanitized, _ = ml_integration._sanitize_match_data({"minute": 40, "score1": 2, "score2": 1, "odd": 1.7})
+    matrice = ml_integration._over_under_matrix([sanitized, sanitized], [2.5, -1.0])
+    attendu = [
+        ml_integration._prepare_over_under_features(sanitized, 2.5),
+        ml_integration._prepare_handicap_features(sanitized, -1.0),
+    ] * 2
+    assert matrice.shape == (4, 6)
+    assert matrice.tolist() == [[float(v) for v in ligne] for ligne in attendu]
+
+def test_cache_quantifie():
+    """Les requêtes quasi identiques sont servies par le cache, sans appel au modèle"""
+    from ml_integration import MLIntegration
+    
+    ml = MLIntegration(cache_size=8, cache_quantization={"match_time_seconds": 60, "odd": 0.05})
+    if not ml.model_over_under:
+        return
+    appels = []
+    predict_proba = ml.model_over_under["model"].predict_proba
+    ml._over_under_predict_proba = lambda features, version=None: appels.append(len(features)) or predict_proba(features)
+    
+    premier = ml.predict_over_under({"match_time_seconds": 600, "score1": 1, "odd": 1.90}, 2.5)
+    proche = ml.predict_over_under({"match_time_seconds": 610, "score1": 1, "odd": 1.91}, 2.5)
+    assert appels == [1]
+    assert proche["over_probability"] == premier["over_probability"]
+    
+    ml.get_all_predictions({"match_time_seconds": 600, "score1": 1, "odd": 1.90})
+    # 2.5 déjà en cache ; ligne 1.5 et handicap +1.5 partagent les mêmes features
+    assert appels == [1, 7]
+    
+    ml.predict_handicap({"match_time_seconds": 600, "score1": 1, "odd": 1.90}, -2.5)
+    stats = ml.get_model_status()["prediction_cache"]
+    assert stats["hits"] == 2 and stats["misses"] == 10
+    assert stats["size"] == 8 and stats["evictions"] == 1
+
 if __name__ == "__main__":
     test_ml_integration()
+    test_predictions_par_lot()
+    test_predict_batch()
+    test_matrice_numpy()
+    test_cache_quantifie()
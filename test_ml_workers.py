@@ -0,0 +1,65 @@
+"""
+🧪 TEST DU POOL DE PROCESSUS D'INFÉRENCE
+=======================================
+Résultats identiques à l'inférence locale, repli, backpressure et relance
+"""
+
+from ml_integration import MLIntegration
+from ml_workers import InferencePool
+
+MATCHS = [
+    {"team1": "A", "team2": "B", "league": "L", "minute": m, "score1": m % 3, "score2": m % 2,
+     "odds_1": 1.8, "odds_x": 3.5, "odds_2": 4.0, "odd": 1.5 + m / 100}
+    for m in range(0, 90, 15)
+]
+
+
+def test_pool_inference():
+    """Les lots calculés par le pool sont ceux du processus web"""
+    ml = MLIntegration()
+    if not ml.models_loaded:
+        return
+    attendus = [ml.get_all_predictions(m)["predictions"] for m in MATCHS]
+
+    pool = ml.inference_pool = InferencePool(processes=1, max_pending=1, health_seconds=0).start(ml._active.signature)
+    try:
+        assert pool.wait_ready(60)
+        obtenus = ml._run_micro_batch(("all", ml._active), MATCHS)
+        assert pool.stats["batches"] == 1 and pool.stats["rows"] == len(MATCHS)
+        for attendu, obtenu in zip(attendus, obtenus):
+            assert attendu.keys() == obtenu["predictions"].keys()
+            assert attendu["over_under_2.5"]["over_probability"] == obtenu["predictions"]["over_under_2.5"]["over_probability"]
+
+        # Backpressure : aucun créneau libre, le lot est calculé localement
+        pool._slots.acquire()
+        assert pool.run("all", ml._active.signature, (), MATCHS) is None
+        assert len(ml._run_micro_batch(("all", ml._active), MATCHS)) == len(MATCHS)
+        pool._slots.release()
+        assert pool.stats["rejected"] == 2
+
+        # Processus tué : repli local puis relance au contrôle de santé
+        worker = pool._workers[0]
+        worker.process.kill()
+        worker.process.join()
+        assert len(ml._run_micro_batch(("all", ml._active), MATCHS)) == len(MATCHS)
+        pool.health_check()
+        assert pool.stats["restarts"] == 1
+        assert pool.wait_ready(60)
+        assert pool.run("1x2", ml._active.signature, (), [ml._sanitize_match_data(MATCHS[0])[0]]) is not None
+
+        # Version différente (rechargement ou rollback du processus web) : jamais servie par le pool
+        rejets = pool.stats["rejected"]
+        assert pool.run("all", "autre-version", (), MATCHS) is None
+        assert pool.stats["rejected"] == rejets + 1
+        worker = pool._workers[0]
+        assert pool._call(worker, "all", "autre-version", (), MATCHS, pool.timeout) is None
+        assert pool.stats["stale"] == 1
+        # Le processus est resynchronisé sur la version attendue
+        assert pool.wait_ready(60) and worker.version == ml._active.signature
+    finally:
+        ml.stop_inference_pool()
+
+
+if __name__ == "__main__":
+    test_pool_inference()
+    print("🎉 TEST DU POOL D'INFÉRENCE TERMINÉ")
@@ -0,0 +1,89 @@
+"""
+🧪 TEST DE L'EXPORT DES MODÈLES EN TABLEAUX PLATS
+================================================
+Parité avec predict_proba de sklearn (linéaire, pipeline, arbres)
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from model_export import FlatModel, export_model, save_flat
+
+
+def _aller_retour(model, columns=None):
+    meta, arrays = export_model(model, columns)
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "modele.flat.npz")
+        save_flat(chemin, meta, arrays)
+        return FlatModel.load(chemin)
+
+
+def _donnees(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)) * [900, 1, 1, 1.5, 0.5, 1.5] + [2700, 1, 1, 2, 2, 1]
+    y = (X[:, 3] + rng.normal(size=n) > X[:, 5]).astype(int)
+    return X, y
+
+
+def test_parite_regression_logistique():
+    """LogisticRegression binaire : mêmes probabilités que sklearn"""
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = _donnees()
+    model = LogisticRegression(max_iter=500).fit(X, y)
+    flat = _aller_retour(model)
+    assert np.abs(flat.predict_proba(X) - model.predict_proba(X)).max() < 1e-9
+    assert list(flat.predict(X)) == list(model.predict(X))
+
+
+def test_parite_pipeline_categoriel():
+    """Pipeline baseline (imputation, standardisation, one-hot, multinomiale)"""
+    import pandas as pd
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    rng = np.random.default_rng(1)
+    n = 300
+    df = pd.DataFrame({
+        "minute": rng.integers(0, 90, n).astype(float),
+        "odds_1": rng.uniform(1.2, 5, n),
+        "team1": rng.choice(["A", "B", "C"], n),
+        "league": rng.choice(["L1", "L2"], n),
+    })
+    df.loc[::17, "minute"] = np.nan
+    y = rng.choice(["1", "X", "2"], n)
+    model = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("num", Pipeline([("imputer", SimpleImputer(strategy="median")), ("scaler", StandardScaler())]), ["minute", "odds_1"]),
+            ("cat", Pipeline([("imputer", SimpleImputer(strategy="most_frequent")), ("onehot", OneHotEncoder(handle_unknown="ignore"))]), ["team1", "league"]),
+        ])),
+        ("model", LogisticRegression(max_iter=1000)),
+    ]).fit(df, y)
+
+    test = df.copy()
+    test.loc[0, "team1"] = "Inconnue"
+    flat = _aller_retour(model)
+    assert list(flat.classes_) == list(model.classes_)
+    assert np.abs(flat.predict_proba(test) - model.predict_proba(test)).max() < 1e-9
+
+
+def test_parite_foret():
+    """RandomForest : tous les arbres évalués ensemble, mêmes probabilités"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = _donnees()
+    model = RandomForestClassifier(n_estimators=25, max_depth=6, random_state=0).fit(X, y)
+    flat = _aller_retour(model)
+    assert np.abs(flat.predict_proba(X) - model.predict_proba(X)).max() < 1e-9
+
+
+if __name__ == "__main__":
+    test_parite_regression_logistique()
+    test_parite_pipeline_categoriel()
+    test_parite_foret()
+    print("🎉 TEST DE L'EXPORT TERMINÉ")
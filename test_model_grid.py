@@ -0,0 +1,72 @@
+"""
+🧪 TEST DE LA GRILLE DE PROBABILITÉS PRÉCALCULÉE
+===============================================
+Exactitude aux nœuds, interpolation, repli hors grille
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from model_grid import ProbabilityGrid
+
+AXES_TEST = {
+    "match_time_seconds": np.arange(0, 6001, 600),
+    "score1": np.arange(0, 5),
+    "score2": np.arange(0, 5),
+    "odd": np.round(np.arange(1.2, 3.01, 0.2), 2),
+    "line": np.arange(-2.0, 4.01, 0.5),
+}
+
+
+def _modele():
+    from ml_integration import MLIntegration
+    ml = MLIntegration(cache_size=0)
+    return ml if ml.model_over_under else None
+
+
+def test_grille_et_interpolation():
+    """La grille reproduit le modèle aux nœuds et l'approche entre les nœuds"""
+    ml = _modele()
+    if not ml:
+        return
+    model, columns = ml.model_over_under["model"], ml.model_over_under["columns"]
+    grille = ProbabilityGrid.compile(model, columns, AXES_TEST)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "grille.npy")
+        grille.save(chemin)
+        grille = ProbabilityGrid.load(chemin)
+    assert isinstance(grille.values, np.memmap)
+
+    noeud, dedans = grille.lookup([1200], [1], [2], [1.8], [2.5])
+    attendu = model.predict_proba(np.array([[1200, 1, 2, 3, 1.8, 2.5]]))[0][1]
+    assert dedans[0] and abs(noeud[0] - attendu) < 1e-6
+
+    rapport = grille.measure_accuracy(model, columns, samples=2000)
+    assert rapport["max_abs_delta"] < 0.02
+    assert rapport["class_agreement"] > 0.99
+
+
+def test_integration_repli_hors_grille():
+    """ml_integration lit la grille et se replie sur le modèle hors grille"""
+    ml = _modele()
+    if not ml:
+        return
+    sans_grille = [ml.predict_over_under({"match_time_seconds": 1200, "score1": s, "odd": 1.8}, 2.5) for s in (1, 7)]
+
+    ml.probability_grid = ProbabilityGrid.compile(ml.model_over_under["model"], ml.model_over_under["columns"], AXES_TEST)
+    avec_grille = [ml.predict_over_under({"match_time_seconds": 1200, "score1": s, "odd": 1.8}, 2.5) for s in (1, 7)]
+
+    for a, b in zip(sans_grille, avec_grille):
+        assert a["prediction"] == b["prediction"]
+        assert abs(a["over_probability"] - b["over_probability"]) < 1e-6
+    statut = ml.get_model_status()["probability_grid"]
+    assert statut["loaded"] and statut["rows"] == 1 and statut["fallback_rows"] == 1
+
+
+if __name__ == "__main__":
+    test_grille_et_interpolation()
+    test_integration_repli_hors_grille()
+    print("🎉 TEST DE LA GRILLE TERMINÉ")
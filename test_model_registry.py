@@ -0,0 +1,49 @@
+"""
+🧪 TEST DU REGISTRE PARTAGÉ DES MODÈLES
+======================================
+Déduplication par contenu et rechargement sur modification
+"""
+
+import os
+import shutil
+import tempfile
+
+from model_registry import ModelRegistry
+
+MODELE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_over_under_handicap.joblib")
+
+
+def test_deduplication_par_contenu():
+    """Deux chemins au même contenu partagent le même objet"""
+    registre = ModelRegistry()
+    with tempfile.TemporaryDirectory() as dossier:
+        copie = os.path.join(dossier, "copie.joblib")
+        shutil.copy(MODELE, copie)
+
+        a = registre.load(MODELE, prefer_flat=False)
+        b = registre.load(copie, prefer_flat=False)
+        assert a is b
+        statut = registre.status()
+        assert statut["count"] == 1
+        assert len(statut["models"][0]["paths"]) == 2
+
+        # Contenu modifié : nouvelle empreinte, nouvel objet
+        with open(copie, "ab") as f:
+            f.write(b"\0")
+        os.utime(copie, ns=(0, 0))
+        assert registre.digest(copie) != registre.digest(MODELE)
+
+
+def test_ml_integration_partage_les_modeles():
+    """Deux instances MLIntegration n'ont qu'un exemplaire de chaque modèle"""
+    from ml_integration import MLIntegration
+
+    a, b = MLIntegration(), MLIntegration()
+    assert a.model_over_under is b.model_over_under
+    assert a.model_baseline is b.model_baseline
+
+
+if __name__ == "__main__":
+    test_deduplication_par_contenu()
+    test_ml_integration_partage_les_modeles()
+    print("🎉 TEST DU REGISTRE TERMINÉ")
@@ -0,0 +1,95 @@
+"""
+🧪 TEST DU RECHARGEMENT À CHAUD DES MODÈLES
+==========================================
+Validation, bascule atomique, rollback et surveillance du répertoire
+"""
+
+import os
+import shutil
+import tempfile
+
+from ml_integration import MLIntegration
+from model_versions import ModelWatcher, validate_version
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FICHIERS = [
+    "model_over_under_handicap.joblib",
+    "model_over_under_handicap.flat.npz",
+    "fifa_model_baseline.joblib",
+    "fifa_model_baseline.flat.npz",
+]
+NOUVEAU_MODELE = os.path.join(BASE_DIR, "api", "model_over_under_handicap.joblib")
+MATCH = {"team1": "A", "team2": "B", "league": "L", "minute": 30, "score1": 1, "score2": 0,
+         "odds_1": 1.8, "odds_x": 3.5, "odds_2": 4.0, "odd": 2.0}
+
+
+def _ml_dans(dossier):
+    for nom in FICHIERS:
+        shutil.copy(os.path.join(BASE_DIR, nom), os.path.join(dossier, nom))
+    ml = MLIntegration()
+    ml.model_dir = dossier
+    ml.load_models()
+    return ml
+
+
+def _remplacer_modele(dossier):
+    temporaire = os.path.join(dossier, "nouveau.tmp")
+    shutil.copy(NOUVEAU_MODELE, temporaire)
+    os.replace(temporaire, os.path.join(dossier, "model_over_under_handicap.joblib"))
+
+
+def test_bascule_et_rollback():
+    """Une version validée est activée d'un bloc, l'ancienne reste disponible"""
+    with tempfile.TemporaryDirectory() as dossier:
+        ml = _ml_dans(dossier)
+        assert validate_version(ml, ml._active)["ok"]
+        assert ml.reload_models()["status"] == "unchanged"
+
+        ancienne = ml._active
+        avant = ml.predict_over_under(MATCH, 2.5)["over_probability"]
+        _remplacer_modele(dossier)
+        rapport = ml.reload_models()
+        assert rapport["status"] == "activated"
+        assert ml._active is not ancienne and ml._previous is ancienne
+        assert ml.model_baseline is ancienne.model_baseline
+        apres = ml.predict_over_under(MATCH, 2.5)["over_probability"]
+        assert apres != avant
+
+        # Une prédiction commencée sur l'ancienne version la garde jusqu'au bout
+        en_cours = ml.predict_batch([MATCH], lines=[2.5], handicaps=[], version=ancienne)[0]
+        assert en_cours["predictions"]["over_under_2.5"]["over_probability"] == avant
+
+        assert ml.rollback()["version"] == ancienne.number
+        assert ml.predict_over_under(MATCH, 2.5)["over_probability"] == avant
+        assert ml.get_model_status()["previous_version"]["number"] == rapport["version"]
+
+
+def test_version_rejetee():
+    """Une version hors budget de latence n'est pas activée"""
+    with tempfile.TemporaryDirectory() as dossier:
+        ml = _ml_dans(dossier)
+        active = ml._active
+        _remplacer_modele(dossier)
+        rapport = ml.reload_models(latency_budget_ms=0)
+        assert rapport["status"] == "rejected"
+        assert ml._active is active
+        assert ml.last_reload["ok"] is False
+
+
+def test_surveillance_stable():
+    """Le watcher attend deux relevés identiques avant de recharger"""
+    with tempfile.TemporaryDirectory() as dossier:
+        ml = _ml_dans(dossier)
+        surveillance = ModelWatcher(ml, interval=0)
+        assert surveillance.check() is None
+        _remplacer_modele(dossier)
+        assert surveillance.check() is None
+        assert surveillance.check()["status"] == "activated"
+        assert surveillance.check() is None
+
+
+if __name__ == "__main__":
+    test_bascule_et_rollback()
+    test_version_rejetee()
+    test_surveillance_stable()
+    print("🎉 TEST DU RECHARGEMENT TERMINÉ")
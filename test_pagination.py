@@ -0,0 +1,76 @@
+"""
+🧪 TEST DE LA PAGINATION PAR CURSEUR
+===================================
+Parcours complet sans doublon ni trou, y compris à dates égales
+"""
+
+from datetime import datetime, timedelta
+
+
+from conftest import application_sqlite
+from models import db, User
+from pagination import keyset_page, decode_cursor, encode_cursor, parse_limit, cursor_requested, prefix_search
+
+
+def _peupler():
+    debut = datetime(2026, 1, 1)
+    for i in range(25):
+        # Trois utilisateurs par date : le tri départage sur l'id
+        db.session.add(User(username=f"user{i:02d}", password="x", is_approved=i % 4 != 0,
+                            created_at=debut + timedelta(days=i // 3)))
+    db.session.commit()
+
+
+def test_parcours_complet():
+    """Toutes les lignes, une seule fois, dans l'ordre (created_at, id) décroissant"""
+    with application_sqlite("pages.db", _peupler) as app:
+        with app.app_context():
+            colonnes = (User.created_at, User.id)
+            attendu = [u.id for u in User.query.order_by(User.created_at.desc(), User.id.desc())]
+            vus, curseur, pages = [], None, 0
+            while True:
+                lignes, curseur = keyset_page(db.session.query(User.id, User.created_at), colonnes, curseur, 10)
+                vus += [ligne.id for ligne in lignes]
+                pages += 1
+                if not curseur:
+                    break
+            assert vus == attendu and pages == 3
+
+            # Filtre serveur appliqué avant la pagination
+            en_attente, curseur = keyset_page(User.query.filter(User.is_approved.is_(False)), colonnes, None, 50)
+            assert len(en_attente) == 7 and curseur is None
+
+            # Recherche par préfixe sur username ou email, jokers échappés
+            db.session.add(User(username="autre", email="user99@example.com", password="x"))
+            db.session.commit()
+            trouves = User.query.filter(prefix_search((User.username, User.email), "user1")).count()
+            assert trouves == 10
+            assert User.query.filter(prefix_search((User.username, User.email), "user9")).count() == 1
+            assert User.query.filter(prefix_search((User.username, User.email), "user_")).count() == 0
+
+
+def test_mode_par_defaut():
+    """Ancien format paginé sauf demande explicite du mode curseur"""
+    assert not cursor_requested({}) and not cursor_requested({"page": "2", "per_page": "10"})
+    assert cursor_requested({"cursor": "abc"}) and cursor_requested({"limit": "20"})
+
+
+def test_curseur():
+    """Curseur opaque aller-retour ; un curseur falsifié est refusé"""
+    colonnes = (User.created_at, User.id)
+    valeurs = [datetime(2026, 1, 2, 3, 4, 5), 42]
+    assert decode_cursor(encode_cursor(valeurs), colonnes) == valeurs
+    for invalide in ("pas-un-curseur", encode_cursor([1]), encode_cursor(["hier", 1])):
+        try:
+            decode_cursor(invalide, colonnes)
+            assert False, "ValueError attendue"
+        except ValueError:
+            pass
+    assert parse_limit("1000") == 200 and parse_limit("abc") == 50 and parse_limit("0") == 1
+
+
+if __name__ == "__main__":
+    test_parcours_complet()
+    test_curseur()
+    test_mode_par_defaut()
+    print("🎉 TEST DE LA PAGINATION TERMINÉ")
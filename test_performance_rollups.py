@@ -0,0 +1,112 @@
+"""
+🧪 TEST DES COMPTEURS DE PERFORMANCE
+===================================
+Compteurs incrémentaux par jour et par segment, identiques à un recalcul complet
+"""
+
+from datetime import datetime
+
+
+import bulk_upsert
+from conftest import application_sqlite
+from models import db, PredictionArchive, PerformanceBucket
+
+
+def _archiver(nombre):
+    from archive_manager import archive_matches_before_bulk, archive_predictions_before_bulk
+
+    archive_matches_before_bulk([{"match_id": i, "jeu": "FIFA", "ligue": "L", "equipe_1": "A", "equipe_2": "B",
+                                  "date_heure_match": datetime(2026, 1, 1, 12)} for i in range(nombre)])
+    archive_predictions_before_bulk([{"match_id": i, "consensus_type": "1X2", "choix": "1X2"[i % 3],
+                                      "probabilite": 40.0 + i, "confiance": 50.0 + i % 7,
+                                      "vote_statistique": i % 2 == 0, "vote_cotes": i % 3 == 0,
+                                      "consensus": i % 4 == 0} for i in range(nombre)])
+
+
+def _recalcul_complet():
+    predictions = PredictionArchive.query.filter(PredictionArchive.prediction_correcte.isnot(None)).all()
+    votes = [p for p in predictions if p.vote_statistique]
+    return {
+        "total": len(predictions),
+        "correctes": sum(1 for p in predictions if p.prediction_correcte),
+        "statistique": sum(1 for p in votes if p.prediction_correcte) / len(votes) * 100,
+        "confiance": sum(p.confiance for p in predictions) / len(predictions),
+    }
+
+
+def test_compteurs_incrementaux():
+    """Chaque finalisation met à jour les compteurs ; le calcul ne relit plus l'archive"""
+    from archive_manager import update_match_after, update_predictions_after_match, calculate_model_performance
+
+    with application_sqlite("perf.db") as app:
+        with app.test_request_context():
+            _archiver(12)
+            for i in range(12):
+                update_match_after(i, 1, 0, "1")
+            # Refinalisation : l'ancienne contribution est retirée, pas doublée
+            update_predictions_after_match(3, "2")
+
+            attendu = _recalcul_complet()
+            performance = calculate_model_performance()
+            assert performance.total_predictions == attendu["total"] == 12
+            assert performance.predictions_correctes == attendu["correctes"]
+            assert abs(performance.taux_reussite_statistique - attendu["statistique"]) < 1e-9
+            assert abs(performance.moyenne_confiance - attendu["confiance"]) < 1e-9
+            assert PerformanceBucket.query.filter_by(segment="global").one().total == 12
+
+            # Fenêtre glissante par défaut : une seule ligne mise à jour
+            assert calculate_model_performance().id == performance.id
+
+
+def test_reconstruction_et_repli_portable():
+    """La reconstruction complète et l'upsert additif portable donnent les mêmes compteurs"""
+    from archive_manager import update_match_after, rebuild_performance_buckets
+
+    with application_sqlite("perf.db") as app:
+        with app.test_request_context():
+            cle = (str(db.engine.url), "performance_buckets")
+            bulk_upsert._unique_ready[cle] = False
+            try:
+                _archiver(6)
+                for i in range(6):
+                    update_match_after(i, 0, 0, "X")
+                incremental = {b.segment: (b.total, b.correctes) for b in PerformanceBucket.query.all()}
+                assert rebuild_performance_buckets() == 6
+                reconstruit = {b.segment: (b.total, b.correctes) for b in PerformanceBucket.query.all()}
+            finally:
+                bulk_upsert._unique_ready.pop(cle, None)
+            assert incremental == reconstruit
+            assert incremental["global"] == (6, 2)
+
+
+def test_agregation_sql():
+    """Période explicite : agrégats SQL identiques aux compteurs et au recalcul complet"""
+    from datetime import timedelta
+    from archive_manager import (update_match_after, calculate_model_performance,
+                                 aggregate_prediction_archive, _bucket_totals)
+
+    with application_sqlite("perf.db") as app:
+        with app.test_request_context():
+            _archiver(20)
+            for i in range(20):
+                update_match_after(i, 2, 1, "1" if i % 5 else "2")
+
+            debut, fin = datetime.utcnow() - timedelta(days=1), datetime.utcnow() + timedelta(days=1)
+            sql = aggregate_prediction_archive(debut, fin)
+            compteurs = _bucket_totals(debut, fin)
+            for segment, valeurs in compteurs.items():
+                assert {k: round(v, 6) for k, v in sql[segment].items()} == \
+                       {k: round(v, 6) for k, v in valeurs.items()}, segment
+
+            attendu = _recalcul_complet()
+            performance = calculate_model_performance(debut, fin)
+            assert performance.total_predictions == attendu["total"]
+            assert performance.predictions_correctes == attendu["correctes"]
+            assert abs(performance.taux_reussite_statistique - attendu["statistique"]) < 1e-9
+
+
+if __name__ == "__main__":
+    test_compteurs_incrementaux()
+    test_reconstruction_et_repli_portable()
+    test_agregation_sql()
+    print("🎉 TEST DES COMPTEURS DE PERFORMANCE TERMINÉ")
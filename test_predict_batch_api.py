@@ -0,0 +1,83 @@
+"""
+🧪 TEST DE L'ENDPOINT /api/ml/predict/batch
+==========================================
+Bornes sur lines/handicaps, valeurs non numériques refusées, NDJSON par tranches
+"""
+
+import json
+import os
+import uuid
+
+# Configuration minimale exigée par config_oauth (valeurs de test si absentes)
+for variable, valeur in {
+    "GOOGLE_CLIENT_ID": "test", "GOOGLE_CLIENT_SECRET": "test", "GOOGLE_PROJECT_ID": "test",
+    "APP_SECRET": "secret-de-test-suffisamment-long-pour-hs256", "DATABASE_URL": "sqlite://",
+    "APP_BASE_URL": "http://localhost", "FRONTEND_URL": "http://localhost",
+}.items():
+    os.environ.setdefault(variable, valeur)
+
+from flask import Flask
+
+import api_routes
+from session_manager import session_manager
+
+MATCH = {"team1": "A", "team2": "B", "league": "L", "minute": 30, "score1": 1, "score2": 0,
+         "odds_1": 1.8, "odds_x": 3.5, "odds_2": 4.0, "odd": 1.9}
+
+
+AUDITS = []
+# Audit (AuditLog, types PostgreSQL) relevé en mémoire
+api_routes.audit_ml = lambda user_payload, action, meta: AUDITS.append((action, meta))
+
+
+def _client():
+    app = Flask(__name__)
+    app.register_blueprint(api_routes.api_bp)
+    token = session_manager.create_tokens({"id": str(uuid.uuid4()), "email": "a@example.com",
+                                           "role": "user", "plan": "vip"})["access_token"]
+    return app.test_client(), {"Authorization": f"Bearer {token}"}
+
+
+def test_parametres_bornes():
+    """lines/handicaps : listes de nombres, au plus ML_BATCH_MAX_LINES valeurs"""
+    client, entetes = _client()
+    for corps in ({"matches": [MATCH], "lines": list(range(api_routes.ML_BATCH_MAX_LINES + 1))},
+                  {"matches": [MATCH], "handicaps": ["1.5"]},
+                  {"matches": [MATCH], "lines": [True]},
+                  {"matches": [MATCH], "lines": 2.5}):
+        reponse = client.post("/api/ml/predict/batch", json=corps, headers=entetes)
+        assert reponse.status_code == 400, corps
+
+
+def test_ndjson_par_tranches():
+    """Chaque tranche est calculée séparément ; les index restent ceux du lot"""
+    if not api_routes.ML_AVAILABLE:
+        return
+    client, entetes = _client()
+    appels = []
+    original = api_routes.ml_integration.predict_batch
+
+    def compter(matches, lines=None, handicaps=None, version=None):
+        appels.append(len(matches))
+        return original(matches, lines, handicaps, version)
+
+    ancienne_tranche = api_routes.ML_BATCH_STREAM_CHUNK
+    api_routes.ML_BATCH_STREAM_CHUNK = 2
+    api_routes.ml_integration.predict_batch = compter
+    try:
+        reponse = client.post("/api/ml/predict/batch?format=ndjson",
+                              json={"matches": [MATCH] * 5, "lines": [2.5]}, headers=entetes)
+        lignes = [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+    finally:
+        api_routes.ML_BATCH_STREAM_CHUNK = ancienne_tranche
+        del api_routes.ml_integration.predict_batch
+    assert appels == [2, 2, 1]
+    assert [l["index"] for l in lignes] == [0, 1, 2, 3, 4]
+    # Audit unique, écrit après la dernière tranche
+    assert AUDITS[-1][0] == "ML_PREDICTION_BATCH" and AUDITS[-1][1]["matches_count"] == 5
+
+
+if __name__ == "__main__":
+    test_parametres_bornes()
+    test_ndjson_par_tranches()
+    print("🎉 TEST DE L'ENDPOINT DE PRÉDICTION PAR LOTS TERMINÉ")
@@ -0,0 +1,118 @@
+"""
+🧪 TEST DU PRICER ANALYTIQUE DES MARCHÉS
+=======================================
+Cohérence des prix (Poisson) et intégration dans le système quantique
+"""
+
+from pricer_marches import PricerMarches
+
+ODDS_TEST = [
+    {"type": "1", "cote": 2.10},
+    {"type": "X", "cote": 3.40},
+    {"type": "2", "cote": 3.20}
+]
+
+PARIS_TEST = [
+    {'nom': 'Plus de 2.5 buts', 'cote': 1.90, 'valeur': '2.5', 'raw_data': {'G': 17, 'T': 9, 'P': 2.5}},
+    {'nom': 'Moins de 2.5 buts', 'cote': 1.90, 'valeur': '2.5', 'raw_data': {'G': 17, 'T': 10, 'P': 2.5}},
+    {'nom': 'Handicap asiatique Real Madrid (-1)', 'cote': 2.40, 'valeur': '-1.0', 'raw_data': {'G': 2, 'T': 7, 'P': -1.0}},
+    {'nom': 'Total de buts PAIR', 'cote': 1.90, 'valeur': '', 'raw_data': {'G': 19, 'T': 180}}
+]
+
+
+def test_calibration_sur_les_cotes():
+    """Les probabilités du modèle retrouvent les cotes sans marge"""
+    pricer = PricerMarches.depuis_cotes(ODDS_TEST, PARIS_TEST)
+    inverses = {o['type']: 1 / o['cote'] for o in ODDS_TEST}
+    total = sum(inverses.values())
+    probas = pricer.proba_1x2()
+    assert abs(probas['1'] - inverses['1'] / total) < 0.02
+    assert abs(probas['2'] - inverses['2'] / total) < 0.02
+    assert abs(pricer.proba_total(2.5)['probabilite'] - 0.5) < 0.02
+
+
+def test_coherence_des_marches():
+    """Les marchés dérivés de la même matrice sont cohérents entre eux"""
+    pricer = PricerMarches.depuis_cotes(ODDS_TEST, None, 1, 0, 60)
+
+    plus = pricer.proba_total(2.5, plus_de=True)
+    moins = pricer.proba_total(2.5, plus_de=False)
+    assert abs(plus['gagne'] + moins['gagne'] - 1) < 1e-9
+
+    # Handicap asiatique -0.5 sur l'équipe 1 = victoire équipe 1
+    assert abs(pricer.proba_handicap(1, -0.5)['gagne'] - pricer.proba_1x2()['1']) < 1e-9
+    # Ligne entière : remboursement = écart final exactement compensé
+    assert abs(pricer.proba_handicap(1, -1)['rembourse'] - pricer.proba_handicap_europeen(-1)['X']) < 1e-9
+    # Quart de ligne = moyenne des deux demi-lignes
+    quart = pricer.proba_total(2.25)
+    attendu = (pricer.proba_total(2.0)['gagne'] + pricer.proba_total(2.5)['gagne']) / 2
+    assert abs(quart['gagne'] - attendu) < 1e-9
+
+    parite = pricer.proba_parite()
+    assert abs(parite['pair'] + parite['impair'] - 1) < 1e-9
+    assert pricer.proba_score_exact(0, 0) == 0.0  # déjà 1-0
+    assert pricer.proba_score_exact(1, 0) > 0
+
+
+def test_match_termine():
+    """À la 90e minute tous les marchés sont réglés"""
+    pricer = PricerMarches.depuis_cotes(ODDS_TEST, None, 2, 1, 90)
+    assert pricer.proba_1x2()['1'] == 1.0
+    assert pricer.proba_total(2.5)['probabilite'] == 1.0
+    assert pricer.proba_parite()['impair'] == 1.0
+
+
+def test_totaux_equipe_et_handicap_europeen():
+    """Buts d'une équipe et handicap européen : marchés dédiés, pas le total du match ni l'asiatique"""
+    pricer = PricerMarches.depuis_cotes(ODDS_TEST, None, 1, 0, 30)
+
+    plus_equipe2 = {'nom': 'Plus de 1.5 buts pour Barcelona', 'cote': 2.5, 'valeur': '1.5',
+                    'raw_data': {'G': 23, 'T': 1, 'P': 1.5}}
+    attendu = pricer.proba_total_equipe(2, 1.5)['probabilite']
+    assert abs(pricer.probabilite_pari(plus_equipe2, "Real Madrid", "Barcelona") - attendu) < 1e-12
+    assert abs(attendu - pricer.proba_total(1.5)['probabilite']) > 0.1
+    moins_equipe1 = {'nom': 'Moins de 1.5 buts pour Real Madrid', 'cote': 1.5}
+    assert abs(pricer.probabilite_pari(moins_equipe1, "Real Madrid", "Barcelona") -
+               pricer.proba_total_equipe(1, 1.5, plus_de=False)['probabilite']) < 1e-12
+
+    # Une ligne de buts par équipe ne sert pas à calibrer le total du match
+    lignes_equipe = [plus_equipe2, dict(plus_equipe2, nom='Moins de 1.5 buts pour Barcelona',
+                                        raw_data={'G': 23, 'T': 2, 'P': 1.5})]
+    assert PricerMarches._ligne_totaux(lignes_equipe) is None
+
+    # Handicap européen : le nul après handicap est perdant
+    moins_un = {'nom': 'Handicap européen Real Madrid (-1) - Real Madrid doit gagner par 2+ buts',
+                'cote': 3.5, 'raw_data': {'G': 8, 'T': 4}}
+    europeen = pricer.proba_handicap_europeen(-1)
+    assert abs(pricer.probabilite_pari(moins_un, "Real Madrid", "Barcelona") - europeen['1']) < 1e-12
+    assert pricer.probabilite_pari(moins_un, "Real Madrid", "Barcelona") < pricer.proba_handicap(1, -1)['probabilite']
+    equipe2 = {'nom': 'Handicap européen Barcelona (0) - Barcelona gagne ou nul', 'cote': 4.0,
+               'raw_data': {'G': 8, 'T': 6}}
+    assert abs(pricer.probabilite_pari(equipe2, "Real Madrid", "Barcelona") - pricer.proba_1x2()['2']) < 1e-12
+    par_nom = {'nom': 'Handicap européen Barcelona (+1)', 'cote': 2.0}
+    assert abs(pricer.probabilite_pari(par_nom, "Real Madrid", "Barcelona") -
+               pricer.proba_handicap_europeen(-1)['2']) < 1e-12
+
+
+def test_systeme_quantique_utilise_le_pricer():
+    """Le système quantique price les totaux et handicaps analytiquement"""
+    from systeme_prediction_simple import SystemePredictionQuantique
+
+    systeme = SystemePredictionQuantique()
+    pricer = PricerMarches.depuis_cotes(ODDS_TEST, PARIS_TEST)
+    predictions = systeme._analyser_tous_paris_api_reels(
+        "Real Madrid", "Barcelona", "Liga", PARIS_TEST, {'score1': 0, 'score2': 0, 'minute': 0}, pricer
+    )
+    sources = {p['pari']: p['source'] for p in predictions}
+    assert sources['Plus de 2.5 buts'] == 'API_REELLE_POISSON'
+    assert sources['Handicap asiatique Real Madrid (-1)'] == 'API_REELLE_POISSON'
+    assert sources['Total de buts PAIR'] == 'API_REELLE_POISSON'
+
+
+if __name__ == "__main__":
+    test_calibration_sur_les_cotes()
+    test_coherence_des_marches()
+    test_match_termine()
+    test_totaux_equipe_et_handicap_europeen()
+    test_systeme_quantique_utilise_le_pricer()
+    print("🎉 TEST DU PRICER TERMINÉ")
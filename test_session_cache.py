@@ -0,0 +1,103 @@
+"""
+🧪 TEST DU CACHE DE TOKENS VÉRIFIÉS
+==================================
+Recherche en cache, expiration, révocation par token et par utilisateur
+"""
+
+import os
+import time
+from datetime import timedelta
+
+import jwt
+
+# Configuration minimale exigée par config_oauth (valeurs de test si absentes)
+for variable, valeur in {
+    "GOOGLE_CLIENT_ID": "test", "GOOGLE_CLIENT_SECRET": "test", "GOOGLE_PROJECT_ID": "test",
+    "APP_SECRET": "secret-de-test-suffisamment-long-pour-hs256", "DATABASE_URL": "sqlite://",
+    "APP_BASE_URL": "http://localhost", "FRONTEND_URL": "http://localhost",
+}.items():
+    os.environ.setdefault(variable, valeur)
+
+from session_manager import SessionManager
+
+UTILISATEUR = {"id": "u-1", "email": "a@example.com", "role": "user", "plan": "free"}
+
+
+def test_token_en_cache():
+    """Le deuxième appel ne repasse pas par jwt.decode"""
+    manager = SessionManager()
+    tokens = manager.create_tokens(UTILISATEUR)
+    assert manager.verify_token(tokens["access_token"])["user_id"] == "u-1"
+    assert manager.verify_token(tokens["access_token"])["user_id"] == "u-1"
+    assert manager.cache_stats == {"hits": 1, "misses": 1, "revoked": 0}
+
+    # Le type est toujours contrôlé, même servi depuis le cache
+    assert manager.verify_token(tokens["access_token"], "refresh") is None
+    assert manager.verify_token(tokens["refresh_token"], "refresh")["type"] == "refresh"
+
+    # Signature invalide : jamais mise en cache
+    falsifie = jwt.encode({"user_id": "u-1", "type": "access"}, "autre-secret", algorithm="HS256")
+    assert manager.verify_token(falsifie) is None
+    assert manager.token_cache_status()["size"] == 2
+
+
+def test_expiration_respectee():
+    """Un token expiré est refusé même s'il est en cache"""
+    manager = SessionManager()
+    manager.token_expiry = timedelta(seconds=1)
+    token = manager.create_tokens(UTILISATEUR)["access_token"]
+    assert manager.verify_token(token) is not None
+    time.sleep(1.1)
+    assert manager.verify_token(token) is None
+    assert manager.token_cache_status()["size"] == 0
+
+
+def test_revocation():
+    """Déconnexion (token) et désactivation (utilisateur) invalident le cache"""
+    manager = SessionManager()
+    premier = manager.create_tokens(UTILISATEUR)["access_token"]
+    assert manager.verify_token(premier) is not None
+    manager.revoke_token(premier)
+    assert manager.verify_token(premier) is None
+
+    second = manager.create_tokens(dict(UTILISATEUR, plan="vip"))["access_token"]
+    autre = manager.create_tokens(dict(UTILISATEUR, id="u-2"))["access_token"]
+    assert manager.verify_token(second) and manager.verify_token(autre)
+    time.sleep(0.01)
+    manager.revoke_user("u-1")
+    assert manager.verify_token(second) is None
+    assert manager.verify_token(autre) is not None
+
+
+def test_cache_borne():
+    """Le cache garde au plus token_cache_size tokens"""
+    manager = SessionManager(token_cache_size=2)
+    tokens = [manager.create_tokens(dict(UTILISATEUR, id=f"u-{i}"))["access_token"] for i in range(3)]
+    for token in tokens:
+        assert manager.verify_token(token) is not None
+    assert manager.token_cache_status()["size"] == 2
+
+
+def test_revocation_bornee():
+    """Tokens forgés ignorés ; révocations bornées à revoked_max"""
+    manager = SessionManager(token_cache_size=100, revoked_max=3)
+    for i in range(50):
+        forge = jwt.encode({"user_id": f"x{i}", "type": "access", "exp": 4102444800}, "autre-secret",
+                           algorithm="HS256")
+        manager.revoke_token(forge)
+    assert manager.token_cache_status()["revoked_tokens"] == 0
+
+    tokens = [manager.create_tokens(dict(UTILISATEUR, id=f"u-{i}"))["access_token"] for i in range(5)]
+    for token in tokens:
+        manager.revoke_token(token)
+    assert manager.token_cache_status()["revoked_tokens"] == 3
+    assert sum(manager.verify_token(token) is None for token in tokens) == 3
+
+
+if __name__ == "__main__":
+    test_token_en_cache()
+    test_expiration_respectee()
+    test_revocation()
+    test_cache_borne()
+    test_revocation_bornee()
+    print("🎉 TEST DU CACHE DE TOKENS TERMINÉ")
@@ -0,0 +1,78 @@
+"""
+🧪 TEST DU MOTEUR MONTE CARLO VECTORISÉ
+======================================
+Reproductibilité par graine, exactitude et erreur standard
+"""
+
+import simulation_monte_carlo
+from simulation_monte_carlo import MoteurMonteCarlo
+
+
+def test_graine_reproductible():
+    """Deux moteurs de même graine produisent les mêmes estimations"""
+    a = MoteurMonteCarlo(n_simulations=20000, graine=42)
+    b = MoteurMonteCarlo(n_simulations=20000, graine=42)
+    force = [20, 35, 30, 15, 0]
+    assert a.probabilites_1x2(*a.simuler_scores(force, force)) == b.probabilites_1x2(*b.simuler_scores(force, force))
+
+
+def test_probabilites_et_erreur_standard():
+    """Les estimations convergent vers la valeur exacte dans ~4 erreurs standard"""
+    moteur = MoteurMonteCarlo(n_simulations=50000, graine=7)
+
+    # P(buts restants des deux équipes > 1.5) avec poids [0.6, 0.3, 0.1] : exact = 1 - 0.36 - 0.36 = 0.28
+    totaux = moteur.simuler_totaux_finaux(0, [0.6, 0.3, 0.1])
+    resultat = moteur.probabilite_total(totaux, 1.5, plus_de=True)
+    assert resultat['simulations'] == 50000
+    assert 0 < resultat['erreur_standard'] < 0.01
+    assert abs(resultat['probabilite'] - 0.28) < 4 * resultat['erreur_standard']
+
+    for p, simulation in zip([0.5, 1 / 1.8], moteur.bernoulli([0.5, 1 / 1.8])):
+        assert abs(simulation['probabilite'] - p) < 4 * simulation['erreur_standard'] + 1e-9
+
+
+def test_repli_sans_numpy():
+    """Sans NumPy : volume historique et un seul tirage binomial par option"""
+    ancien = simulation_monte_carlo.NUMPY_DISPONIBLE
+    simulation_monte_carlo.NUMPY_DISPONIBLE = False
+    try:
+        moteur = MoteurMonteCarlo(n_simulations=100000, graine=3)
+        assert moteur.n_simulations == simulation_monte_carlo.SIMULATIONS_MAX_SANS_NUMPY == 1000
+        tirages = []
+        original = moteur._rng.random
+        moteur._rng.random = lambda: tirages.append(1) or original()
+        probabilites = [0.0, 0.002, 0.3, 0.5, 0.995, 1.0]
+        simulations = moteur.bernoulli(probabilites)
+    finally:
+        simulation_monte_carlo.NUMPY_DISPONIBLE = ancien
+    # Quelques tirages pour les issues rares, aucun pour les autres (gauss)
+    assert len(tirages) < 50
+    assert simulations[0]['probabilite'] == 0.0 and simulations[-1]['probabilite'] == 1.0
+    for p, simulation in zip(probabilites, simulations):
+        assert simulation['simulations'] == 1000
+        assert abs(simulation['probabilite'] - p) < 4 * simulation['erreur_standard'] + 0.005
+
+
+def test_systeme_alternatifs_un_seul_tirage():
+    """Le système alternatif réutilise le même échantillon pour toutes les options"""
+    from app import SystemePredictionParisAlternatifs
+
+    paris = [
+        {'nom': 'Plus de 2.5 buts', 'cote': 1.9},
+        {'nom': 'Moins de 3.5 buts', 'cote': 1.7},
+    ]
+    systeme = SystemePredictionParisAlternatifs("A", "B", "Ligue", paris, "Football", 1, 0, 40)
+    analyses = [systeme._analyse_totaux({'pari': p}) for p in paris]
+    totaux = systeme._totaux_simules
+    assert totaux is not None
+    systeme._analyse_totaux({'pari': paris[0]})
+    assert systeme._totaux_simules is totaux
+    assert all(0 <= a['probabilite'] <= 100 for a in analyses)
+
+
+if __name__ == "__main__":
+    test_graine_reproductible()
+    test_probabilites_et_erreur_standard()
+    test_repli_sans_numpy()
+    test_systeme_alternatifs_un_seul_tirage()
+    print("🎉 TEST MONTE CARLO TERMINÉ")
@@ -0,0 +1,77 @@
+"""
+🧪 TEST DU CACHE UTILISATEURS ET QUOTAS
+======================================
+Utilisateur servi sans requête SQL, invalidation et compteur du jour
+"""
+
+from sqlalchemy import event
+
+from conftest import application_sqlite
+from models import db, User
+from user_cache import UserCache, user_cache
+
+
+def _peupler():
+    db.session.add(User(username="alice", password="x", is_approved=False, subscription_plan="free"))
+    db.session.commit()
+
+
+def _compter_selects(requetes):
+    def before(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            requetes.append(statement)
+    event.listen(db.engine, "before_cursor_execute", before)
+    return before
+
+
+def test_utilisateur_en_cache():
+    """Deuxième requête servie sans SELECT ; une modification ORM invalide l'entrée"""
+    cache = UserCache(ttl=60)
+    with application_sqlite("users.db", _peupler) as app:
+        with app.app_context():
+            user_id = cache.get(db, User, 1).id
+        requetes = []
+        with app.app_context():
+            listener = _compter_selects(requetes)
+            try:
+                user = cache.get(db, User, user_id)
+                assert user.username == "alice" and not user.can_view_predictions()
+                assert user in db.session
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+        assert requetes == [] and cache.stats["hits"] == 1
+
+        # Modification par une route : l'entrée en cache est invalidée au flush (cache global)
+        with app.app_context():
+            user = user_cache.get(db, User, user_id)
+            user.is_approved = True
+            db.session.commit()
+        with app.app_context():
+            assert user_cache.get(db, User, user_id).is_approved
+            user_cache.invalidate(User, user_id)
+        assert user_cache.stats["invalidations"] >= 1
+
+
+def test_compteur_quotidien():
+    """Le compteur est incrémenté en mémoire et recompté en base après l'intervalle"""
+    cache = UserCache(usage_sync_seconds=3600)
+    comptages = []
+
+    def loader():
+        comptages.append(1)
+        return 2
+
+    assert cache.daily_usage(User, 1, loader) == 2
+    cache.record_usage(User, 1)
+    assert cache.daily_usage(User, 1, loader) == 3
+    assert len(comptages) == 1
+
+    cache.usage_sync_seconds = 0
+    assert cache.daily_usage(User, 1, loader) == 2
+    assert len(comptages) == 2
+
+
+if __name__ == "__main__":
+    test_utilisateur_en_cache()
+    test_compteur_quotidien()
+    print("🎉 TEST DU CACHE UTILISATEURS TERMINÉ")
@@ -0,0 +1,173 @@
+"""
+👤 CACHE UTILISATEURS ET QUOTAS - ORACXPRED MÉTAPHORE
+====================================================
+Garde en mémoire, par processus, la ligne utilisateur (TTL court) et le
+compteur de prédictions du jour, pour sortir l'authentification et la
+vérification de quota du chemin critique de la base.
+
+- Utilisateur : colonnes mises en cache, rattachées à la session de la
+  requête sans requête SQL (merge load=False) ; invalidé à chaque
+  modification ORM de l'utilisateur (flush) et par les routes admin
+- Quota : compteur journalier incrémenté en mémoire, recompté en base au
+  changement de jour et toutes les USAGE_SYNC_SECONDS (prédictions faites
+  par les autres workers)
+
+Les autres workers gunicorn voient une modification au plus tard après
+USER_CACHE_TTL_SECONDS.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+# Intervalle de recomptage en base du compteur de prédictions du jour
+USAGE_SYNC_SECONDS = float(os.getenv("USAGE_SYNC_SECONDS", "60"))
+
+
+class UserCache:
+    """Lignes utilisateurs et compteurs de quota, en mémoire du processus"""
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_entries=USER_CACHE_SIZE, usage_sync_seconds=USAGE_SYNC_SECONDS):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.usage_sync_seconds = usage_sync_seconds
+        self._lock = threading.Lock()
+        self._users = OrderedDict()  # (modèle, id) -> (expiration, colonnes)
+        self._usage = {}  # (modèle, id) -> [jour, compteur, dernier recomptage]
+        self._models = set()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "usage_syncs": 0}
+
+    @staticmethod
+    def _key(model, user_id):
+        return (model, str(user_id))
+
+    def get(self, db, model, user_id):
+        """
+        Utilisateur `user_id`, rattaché à la session courante
+
+        Args:
+            db: instance SQLAlchemy propriétaire du modèle
+            model: classe User (models ou models_oauth)
+            user_id: clé primaire
+
+        Returns:
+            instance du modèle, ou None si l'utilisateur n'existe pas
+        """
+        if user_id is None:
+            return None
+        key = self._key(model, user_id)
+        values = None
+        if self.ttl > 0:
+            with self._lock:
+                entry = self._users.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._users.move_to_end(key)
+                    self.stats["hits"] += 1
+                    values = entry[1]
+        if values is not None:
+            return self._attach(db, model, values)
+
+        self.stats["misses"] += 1
+        user = db.session.get(model, user_id)
+        if user is not None and self.ttl > 0:
+            self._store(key, user)
+        return user
+
+    def _store(self, key, user):
+        mapper = inspect(type(user))
+        values = {attr.key: getattr(user, attr.key) for attr in mapper.column_attrs}
+        with self._lock:
+            self._models.add(key[0])
+            self._users[key] = (time.monotonic() + self.ttl, values)
+            self._users.move_to_end(key)
+            while len(self._users) > self.max_entries:
+                self._users.popitem(last=False)
+
+    @staticmethod
+    def _attach(db, model, values):
+        """Reconstruit l'instance depuis les colonnes et la rattache sans requête SQL"""
+        user = inspect(model).class_manager.new_instance()
+        for name, value in values.items():
+            set_committed_value(user, name, value)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, model, user_id):
+        """Oublie la ligne en cache d'un utilisateur (plan, approbation, rôle modifiés)"""
+        with self._lock:
+            if self._users.pop(self._key(model, user_id), None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._usage.clear()
+
+    def daily_usage(self, model, user_id, loader):
+        """
+        Prédictions du jour d'un utilisateur
+
+        Args:
+            loader: fonction sans argument qui compte les prédictions du jour en base
+
+        Returns:
+            int: compteur en mémoire, recompté via `loader` au changement de
+            jour ou après USAGE_SYNC_SECONDS
+        """
+        key = self._key(model, user_id)
+        today = datetime.now(timezone.utc).date()
+        with self._lock:
+            entry = self._usage.get(key)
+            if entry is not None and entry[0] == today and time.monotonic() - entry[2] < self.usage_sync_seconds:
+                return entry[1]
+        count = loader()
+        with self._lock:
+            self._usage[key] = [today, count, time.monotonic()]
+            self.stats["usage_syncs"] += 1
+            if len(self._usage) > self.max_entries:
+                # Compteurs des jours précédents d'abord, puis les plus anciens
+                stale = [k for k, e in self._usage.items() if e[0] != today] or list(self._usage)[:len(self._usage) // 2]
+                for k in stale:
+                    self._usage.pop(k, None)
+        return count
+
+    def record_usage(self, model, user_id, amount=1):
+        """Incrémente le compteur du jour après une prédiction enregistrée"""
+        key = self._key(model, user_id)
+        today = datetime.now(timezone.utc).date()
+        with self._lock:
+            entry = self._usage.get(key)
+            if entry is not None and entry[0] == today:
+                entry[1] += amount
+
+    def status(self):
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl,
+                "users": len(self._users),
+                "usage_counters": len(self._usage),
+                **self.stats,
+            }
+
+    def _on_flush(self, session, flush_context):
+        """Toute modification ORM d'un utilisateur en cache l'invalide"""
+        if not self._models:
+            return
+        for obj in list(session.dirty) + list(session.deleted):
+            model = type(obj)
+            if model in self._models:
+                self.invalidate(model, inspect(obj).identity[0])
+
+
+# Instance globale
+user_cache = UserCache()
+event.listen(Session, "after_flush", user_cache._on_flush)